@@ -1,9 +1,19 @@
+import json
+import time
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, g, jsonify, make_response, Response, request
+from flask.logging import default_handler
 # from flask_cors import CORS
 
-from meal_max.models import kitchen_model
+from meal_max.models import kitchen_model, matchup_analytics
 from meal_max.models.battle_model import BattleModel
+from meal_max.models.tournament_model import TournamentModel
+from meal_max.utils import profiling
+from meal_max.utils.logger import setup_logging
+from meal_max.utils.metrics import CONTENT_TYPE, Counter, Histogram, render_metrics
+from meal_max.utils.migrations import apply_migrations
+from meal_max.utils.random_utils import RANDOM_RESERVOIR, start_random_reservoir
 from meal_max.utils.sql_utils import check_database_connection, check_table_exists
 
 
@@ -11,6 +21,9 @@ from meal_max.utils.sql_utils import check_database_connection, check_table_exis
 load_dotenv()
 
 app = Flask(__name__)
+# Log through the root handler set up by setup_logging instead of Flask's own stderr handler
+app.logger.removeHandler(default_handler)
+setup_logging()
 # This bypasses standard security stuff we'll talk about later
 # If you get errors that use words like cross origin or flight,
 # uncomment this
@@ -19,6 +32,20 @@ app = Flask(__name__)
 # Initialize the BattleModel
 battle_model = BattleModel()
 
+# Tournaments share the BattleModel's scoring but not its combatants
+tournament_model = TournamentModel(battle_model)
+
+# Bring the schema up to date before serving anything
+apply_migrations()
+
+# Warm the leaderboard cache so the first request doesn't have to scan the meals table
+if kitchen_model.LEADERBOARD_CACHE:
+    kitchen_model.rebuild_leaderboard_cache()
+
+# Fetch random numbers for battles in bulk, ahead of time
+if RANDOM_RESERVOIR:
+    start_random_reservoir()
+
 ####################################################
 #
 # Healthchecks
@@ -59,6 +86,151 @@ def db_check() -> Response:
         return make_response(jsonify({'error': str(e)}), 404)
 
 
+##########################################################
+#
+# Metrics
+#
+##########################################################
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests served, by method, route and status.",
+                        ["method", "route", "status"])
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time taken to serve HTTP requests.",
+                                 ["method", "route"])
+
+
+@app.before_request
+def start_request_timer() -> None:
+    """
+    Notes when the request started, for the latency histogram.
+    """
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """
+    Counts the request and records its latency under its route pattern, such as
+    /api/delete-meal/<int:meal_id>, so that every ID shares one series. Streamed bodies are
+    timed up to the point the response starts.
+
+    Returns:
+        The response, unchanged.
+    """
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+    if 'request_start' in g:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, method=request.method, route=route)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose request, database and random.org metrics in the Prometheus text format.
+
+    Returns:
+        The metrics as text/plain.
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+##########################################################
+#
+# Profiling
+#
+##########################################################
+
+
+@app.before_request
+def start_request_profile() -> None:
+    """
+    Starts profiling the request if it sent X-Profile or ?profile and PROFILING is on.
+    """
+    if request.path.startswith('/api/profiles') or not profiling.wants_profile(request.headers, request.args):
+        return
+    g.profile = profiling.start_profile()
+
+
+@app.after_request
+def finish_request_profile(response: Response) -> Response:
+    """
+    Stores the profile of a profiled request and returns its id in the X-Profile-Id header.
+    Streamed bodies are profiled up to the point the response starts.
+
+    Returns:
+        The response, with X-Profile-Id set if the request was profiled.
+    """
+    active = g.pop('profile', None)
+    if active is not None:
+        profile = profiling.stop_profile(active, request.method, request.path, response.status_code)
+        response.headers['X-Profile-Id'] = str(profile.id)
+    return response
+
+
+@app.teardown_request
+def abandon_request_profile(error=None) -> None:
+    """
+    Stops the profiler of a request that failed before its profile could be stored.
+    """
+    active = g.pop('profile', None)
+    if active is not None:
+        profiling.stop_profile(active, request.method, request.path, 500)
+
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles() -> Response:
+    """
+    Route to list the most recent request profiles, newest first.
+
+    Returns:
+        JSON response with the id, route, status and duration of each stored profile.
+    Raises:
+        404 error if profiling is disabled or the profiling token is missing.
+    """
+    if not profiling.is_authorized(request.headers, request.args):
+        return make_response(jsonify({'error': 'Profiling is disabled'}), 404)
+    profiles = [profile.to_dict() for profile in profiling.profile_store.list()]
+    return make_response(jsonify({'status': 'success', 'profiles': profiles}), 200)
+
+
+@app.route('/api/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id: int) -> Response:
+    """
+    Route to retrieve a stored request profile.
+
+    Query Parameters:
+        - format (str, optional): "text" for a pstats table (the default) or "pstats" for the
+          binary profile, loadable with pstats or snakeviz.
+        - sort (str, optional): "cumulative" (the default), "tottime" or "calls", for text.
+        - limit (int, optional): The number of functions to list, for text. Defaults to 40.
+
+    Returns:
+        The profile as text/plain or as an application/octet-stream download.
+    Raises:
+        400 error if the arguments are invalid.
+        404 error if profiling is disabled or the profile is unknown.
+    """
+    if not profiling.is_authorized(request.headers, request.args):
+        return make_response(jsonify({'error': 'Profiling is disabled'}), 404)
+    try:
+        profile = profiling.profile_store.get(profile_id)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+
+    output_format = request.args.get('format', 'text')
+    if output_format == 'pstats':
+        return Response(profile.dump(), mimetype='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.prof'})
+    if output_format != 'text':
+        return make_response(jsonify({'error': f"Invalid format: {output_format}. Must be text or pstats."}), 400)
+    try:
+        report = profile.report(request.args.get('sort', 'cumulative'), int(request.args.get('limit', '40')))
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    return Response(report, mimetype='text/plain')
+
+
 ##########################################################
 #
 # Meals
@@ -115,6 +287,51 @@ def add_meal() -> Response:
         app.logger.error("Failed to add combatant: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/create-meals', methods=['POST'])
+def add_meals() -> Response:
+    """
+    Route to add or update many meals in a single transaction.
+
+    Expected Input:
+        A JSON array of meal objects, or (with Content-Type application/x-ndjson) one meal
+        object per line. Each object has the same fields as /api/create-meal.
+
+    Query Parameters:
+        - upsert (bool, optional): If true, existing meals are updated instead of reported as errors.
+
+    Returns:
+        JSON response with a result for each meal, in input order.
+    Raises:
+        400 error if the body is not a JSON array or NDJSON.
+        500 error if there is an issue writing the meals.
+    """
+    app.logger.info('Creating meals in bulk')
+    try:
+        upsert = request.args.get('upsert', 'false').lower() == 'true'
+
+        if request.mimetype == 'application/x-ndjson':
+            meals = []
+            for line in request.stream:
+                if not line.strip():
+                    continue
+                try:
+                    meals.append(json.loads(line))
+                except ValueError:
+                    # Reported as an invalid meal in the results
+                    meals.append(None)
+        else:
+            meals = request.get_json(silent=True)
+            if not isinstance(meals, list):
+                return make_response(jsonify({'error': 'Expected a JSON array of meals or an NDJSON body'}), 400)
+
+        results = kitchen_model.create_meals(meals, upsert=upsert)
+
+        app.logger.info("Bulk meal write finished for %d meals", len(results))
+        return make_response(jsonify({'status': 'success', 'results': results}), 200)
+    except Exception as e:
+        app.logger.error("Failed to create meals: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/delete-meal/<int:meal_id>', methods=['DELETE'])
 def delete_meal(meal_id: int) -> Response:
     """
@@ -127,12 +344,12 @@ def delete_meal(meal_id: int) -> Response:
         JSON response indicating success of the operation or error message.
     """
     try:
-        app.logger.info(f"Deleting meal by ID: {meal_id}")
+        app.logger.info("Deleting meal by ID: %s", meal_id)
 
         kitchen_model.delete_meal(meal_id)
         return make_response(jsonify({'status': 'meal deleted'}), 200)
     except Exception as e:
-        app.logger.error(f"Error deleting meal: {e}")
+        app.logger.error("Error deleting meal: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-meal-by-id/<int:meal_id>', methods=['GET'])
@@ -147,12 +364,12 @@ def get_meal_by_id(meal_id: int) -> Response:
         JSON response with the meal details or error message.
     """
     try:
-        app.logger.info(f"Retrieving meal by ID: {meal_id}")
+        app.logger.info("Retrieving meal by ID: %s", meal_id)
 
         meal = kitchen_model.get_meal_by_id(meal_id)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving meal by ID: {e}")
+        app.logger.error("Error retrieving meal by ID: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-meal-by-name/<string:meal_name>', methods=['GET'])
@@ -167,7 +384,7 @@ def get_meal_by_name(meal_name: str) -> Response:
         JSON response with the meal details or error message.
     """
     try:
-        app.logger.info(f"Retrieving meal by name: {meal_name}")
+        app.logger.info("Retrieving meal by name: %s", meal_name)
 
         if not meal_name:
             return make_response(jsonify({'error': 'Meal name is required'}), 400)
@@ -175,7 +392,7 @@ def get_meal_by_name(meal_name: str) -> Response:
         meal = kitchen_model.get_meal_by_name(meal_name)
         return make_response(jsonify({'status': 'success', 'meal': meal}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving meal by name: {e}")
+        app.logger.error("Error retrieving meal by name: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -203,7 +420,7 @@ def battle() -> Response:
 
         return make_response(jsonify({'status': 'battle complete', 'winner': winner}), 200)
     except Exception as e:
-        app.logger.error(f"Battle error: {e}")
+        app.logger.error("Battle error: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/clear-combatants', methods=['POST'])
@@ -276,6 +493,70 @@ def prep_combatant() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+############################################################
+#
+# Tournaments
+#
+############################################################
+
+
+@app.route('/api/tournaments', methods=['POST'])
+def start_tournament() -> Response:
+    """
+    Route to start a tournament between many meals. The tournament runs in the background.
+
+    Expected JSON Input:
+        - meal_ids (list[int]): The ids of the entrants, in seeding order.
+        - format (str): 'single_elimination', 'round_robin' or 'swiss'.
+        - rounds (int, optional): The number of rounds, for Swiss tournaments only.
+
+    Returns:
+        JSON response with the tournament id to poll.
+    Raises:
+        400 error if the input is invalid.
+        500 error if there is an issue starting the tournament.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        meal_ids = data.get('meal_ids')
+        fmt = data.get('format')
+        num_rounds = data.get('rounds')
+
+        if (not isinstance(meal_ids, list) or not all(isinstance(meal_id, int) for meal_id in meal_ids)
+                or (num_rounds is not None and not isinstance(num_rounds, int))):
+            return make_response(jsonify({'error': 'meal_ids must be a list of ints and rounds an int'}), 400)
+
+        app.logger.info("Starting %s tournament with %d meals", fmt, len(meal_ids))
+        try:
+            tournament = tournament_model.start_tournament(meal_ids, fmt, num_rounds)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'started', 'tournament_id': tournament.id}), 202)
+    except Exception as e:
+        app.logger.error("Failed to start tournament: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/tournaments/<int:tournament_id>', methods=['GET'])
+def get_tournament(tournament_id: int) -> Response:
+    """
+    Route to poll the progress and results of a tournament.
+
+    Path Parameter:
+        - tournament_id (int): The id returned when the tournament was started.
+
+    Returns:
+        JSON response with the rounds played so far, the standings and, once finished, the champion.
+    Raises:
+        404 error if there is no such tournament.
+    """
+    try:
+        tournament = tournament_model.get_tournament(tournament_id)
+        return make_response(jsonify({'status': 'success', 'tournament': tournament.to_dict()}), 200)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+
+
 ############################################################
 #
 # Leaderboard
@@ -290,24 +571,73 @@ def get_leaderboard() -> Response:
 
     Query Parameters:
         - sort (str): The field to sort by ('wins', 'battles', or 'win_pct'). Default is 'wins'.
+        - limit (int, optional): The page size. Returns the whole leaderboard if omitted.
+        - after (str, optional): The next_cursor from the previous page.
+        - fields (str, optional): A comma-separated list of the fields to return for each meal.
 
     Returns:
-        JSON response with a sorted leaderboard of meals.
+        JSON response with a sorted leaderboard of meals and the cursor for the next page.
     Raises:
+        400 error if the paging parameters are invalid.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         sort_by = request.args.get('sort', 'wins')  # Default sort by wins
         app.logger.info("Generating leaderboard sorted by %s", sort_by)
 
-        leaderboard_data = kitchen_model.get_leaderboard(sort_by)
+        try:
+            limit = request.args.get('limit')
+            if limit is not None and not limit.isdigit():
+                raise ValueError(f"Invalid limit: {limit}. Must be a positive integer.")
+            limit = int(limit) if limit is not None else None
+            leaderboard_data, next_cursor = kitchen_model.get_leaderboard_page(
+                sort_by, limit=limit, after=request.args.get('after'), fields=request.args.get('fields'))
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
 
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data, 'next_cursor': next_cursor}), 200)
     except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
+        app.logger.error("Error generating leaderboard: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@app.route('/api/matchups', methods=['GET'])
+def get_matchups() -> Response:
+    """
+    Route to get the win probability of every pairing of meals.
+
+    Query Parameters:
+        - method (str, optional): 'exact' (default) or 'monte_carlo'.
+        - trials (int, optional): Battles to simulate per pairing for 'monte_carlo'. Default is 1000.
+        - seed (int, optional): A seed for repeatable 'monte_carlo' estimates.
+        - meal_ids (str, optional): A comma-separated list of meal ids to restrict the matrix to.
+
+    Returns:
+        JSON response with the meal ids and the matrix, where probabilities[i][j] is the chance
+        that meal i wins when it battles meal j as the first combatant.
+    Raises:
+        400 error if the parameters are invalid.
+        500 error if there is an issue computing the matrix.
+    """
+    try:
+        try:
+            method = request.args.get('method', 'exact')
+            trials = int(request.args.get('trials', '1000'))
+            seed = request.args.get('seed')
+            seed = int(seed) if seed is not None else None
+            meal_ids = request.args.get('meal_ids')
+            meal_ids = [int(meal_id) for meal_id in meal_ids.split(',')] if meal_ids else None
+
+            app.logger.info("Computing %s matchup matrix", method)
+            matrix = matchup_analytics.get_matchup_matrix(method, trials, seed)
+            data = matrix.to_dict(meal_ids)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        return make_response(jsonify({'status': 'success', 'matchups': data}), 200)
+    except Exception as e:
+        app.logger.error("Error computing matchups: %s", e)
+        return make_response(jsonify({'error': str(e)}), 500)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
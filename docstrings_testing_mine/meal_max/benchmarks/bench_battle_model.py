@@ -0,0 +1,24 @@
+"""
+Benchmarks for battles between meals from seeded catalogs, with random.org stubbed out.
+
+Run them with benchmarks/run_benchmarks.sh, which also compares against the saved baseline.
+"""
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import get_meal_by_id
+
+
+def test_battle(benchmark, meal_db, pick_meal_ids, stub_random):
+    """100 battles, each recording the result for both meals."""
+    meals = [get_meal_by_id(meal_id) for meal_id in pick_meal_ids(200)]
+    pairs = [(meals[i], meals[i + 1]) for i in range(0, len(meals), 2) if meals[i].id != meals[i + 1].id]
+    battle_model = BattleModel()
+
+    def run_battles():
+        for meal_1, meal_2 in pairs:
+            battle_model.clear_combatants()
+            battle_model.prep_combatant(meal_1)
+            battle_model.prep_combatant(meal_2)
+            battle_model.battle()
+
+    benchmark(run_battles)
+    assert stub_random.call_count >= len(pairs)
@@ -0,0 +1,63 @@
+"""
+Benchmarks for reading meals and the leaderboard at 1k, 100k and 1M meals.
+
+Run them with benchmarks/run_benchmarks.sh, which also compares against the saved baseline.
+"""
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import get_leaderboard, get_leaderboard_page, get_meal_by_id
+
+
+##################################################
+# Leaderboard
+##################################################
+
+@pytest.mark.parametrize("sort_by", ["wins", "win_pct"])
+def test_get_leaderboard(benchmark, meal_db, sort_by, mocker):
+    """The whole leaderboard, read from the database."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", False)
+    leaderboard = benchmark(get_leaderboard, sort_by)
+    assert leaderboard
+
+@pytest.mark.parametrize("sort_by", ["wins", "win_pct"])
+def test_get_leaderboard_top_10(benchmark, meal_db, sort_by, mocker):
+    """The first page of 10, read from the database through the partial indexes."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", False)
+    leaderboard = benchmark(get_leaderboard, sort_by, 10)
+    assert len(leaderboard) == 10
+
+def test_get_leaderboard_deep_page(benchmark, meal_db, mocker):
+    """A page of 10 from the middle of the leaderboard, reached with a keyset cursor."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", False)
+    _, cursor = get_leaderboard_page("wins", meal_db // 2)
+    leaderboard = benchmark(get_leaderboard, "wins", 10, cursor)
+    assert len(leaderboard) == 10
+
+@pytest.mark.parametrize("sort_by", ["wins", "win_pct"])
+def test_get_leaderboard_cached(benchmark, meal_db, sort_by, mocker):
+    """The whole leaderboard, served from the in-process cache."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", True)
+    kitchen_model.rebuild_leaderboard_cache()
+    leaderboard = benchmark(get_leaderboard, sort_by)
+    assert leaderboard
+
+def test_rebuild_leaderboard_cache(benchmark, meal_db):
+    """Loading the leaderboard cache from the database, as on the first cached read."""
+    benchmark(kitchen_model.rebuild_leaderboard_cache)
+    assert kitchen_model.leaderboard_cache.loaded
+
+
+##################################################
+# Meals
+##################################################
+
+def test_get_meal_by_id(benchmark, meal_db, pick_meal_ids):
+    """Looking up 100 meals by id."""
+    meal_ids = pick_meal_ids(100)
+
+    def get_meals():
+        for meal_id in meal_ids:
+            get_meal_by_id(meal_id)
+
+    benchmark(get_meals)
@@ -0,0 +1,122 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.logger import parse_level, setup_logging
+from meal_max.utils.migrations import apply_migrations
+
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(__file__), "..", "sql", "migrations")
+
+# The number of meals in each seeded database, as "1000,100000"
+DB_SIZES = [int(size) for size in os.getenv("BENCH_DB_SIZES", "1000,100000,1000000").split(",")]
+# Logging is kept out of the timings unless asked for
+BENCH_LOG_LEVEL = os.getenv("BENCH_LOG_LEVEL", "WARNING")
+# Seeds the meal data and the stubbed random numbers, so every run measures the same work
+BENCH_SEED = int(os.getenv("BENCH_SEED", "411"))
+
+CUISINES = ("Italian", "Mexican", "Japanese", "Indian", "French", "Thai", "Ethiopian", "Greek")
+DIFFICULTIES = ("LOW", "MED", "HIGH")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_logging():
+    """Sets the log level for the benchmark session and restores the usual one afterwards."""
+    setup_logging(level=parse_level(BENCH_LOG_LEVEL), force=True)
+    yield
+    setup_logging(force=True)
+
+
+def generate_meals(num_meals: int, seed: int = BENCH_SEED):
+    """Yields (meal, cuisine, price, difficulty, battles, wins, deleted) rows for a seeded catalog.
+
+    About 1 in 20 meals is deleted and 1 in 10 has never battled, so the leaderboard's filters
+    have something to skip.
+
+    """
+    rng = random.Random(seed)
+    for i in range(1, num_meals + 1):
+        battles = 0 if rng.random() < 0.1 else rng.randint(1, 500)
+        yield (
+            f"Meal {i}",
+            rng.choice(CUISINES),
+            round(rng.uniform(5, 60), 2),
+            rng.choice(DIFFICULTIES),
+            battles,
+            rng.randint(0, battles),
+            rng.random() < 0.05,
+        )
+
+
+def seed_database(path: str, num_meals: int) -> None:
+    """Creates a migrated meals database at path holding num_meals seeded meals."""
+    previous_path = sql_utils.DB_PATH
+    sql_utils.DB_PATH = path
+    try:
+        apply_migrations(MIGRATIONS_PATH)
+    finally:
+        sql_utils.close_connection_pool()
+        sql_utils.DB_PATH = previous_path
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("""
+            INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, deleted)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, generate_meals(num_meals))
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+@pytest.fixture(scope="session")
+def seeded_databases(tmp_path_factory):
+    """Builds each seeded database once per session, the first time a benchmark asks for it."""
+    directory = tmp_path_factory.mktemp("bench_db")
+    paths = {}
+
+    def get(num_meals: int) -> str:
+        if num_meals not in paths:
+            path = str(directory / f"meal_max_{num_meals}.db")
+            seed_database(path, num_meals)
+            paths[num_meals] = path
+        return paths[num_meals]
+
+    return get
+
+
+@pytest.fixture(params=DB_SIZES, ids=lambda size: f"{size}_meals")
+def meal_db(request, seeded_databases, mocker):
+    """Points sql_utils at a seeded database and yields its number of meals."""
+    num_meals = request.param
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", seeded_databases(num_meals))
+    sql_utils.close_connection_pool()
+    kitchen_model.leaderboard_cache.invalidate()
+    yield num_meals
+    sql_utils.close_connection_pool()
+    kitchen_model.leaderboard_cache.invalidate()
+
+
+@pytest.fixture
+def pick_meal_ids(meal_db):
+    """Returns a function that makes seeded picks from the ids of the meals that aren't deleted."""
+    conn = sqlite3.connect(sql_utils.DB_PATH)
+    ids = [row[0] for row in conn.execute("SELECT id FROM meals WHERE deleted = false")]
+    conn.close()
+    rng = random.Random(BENCH_SEED)
+
+    def pick(count: int) -> list:
+        return [rng.choice(ids) for _ in range(count)]
+
+    return pick
+
+
+@pytest.fixture
+def stub_random(mocker):
+    """Replaces random.org with a seeded generator for the battle model."""
+    rng = random.Random(BENCH_SEED)
+    return mocker.patch("meal_max.models.battle_model.get_random",
+                        side_effect=lambda: round(rng.random(), 2))
@@ -0,0 +1,357 @@
+"""
+Load-test the meal_max API with a realistic mix of requests and report throughput and latency.
+
+By default the app is started in-process on a free port, with a fresh database in a temporary
+directory and random.org replaced by a seeded local stand-in (meal_max/utils/random_org_stub.py),
+so a run needs no network and measures only this service. --random-org-latency and
+--random-org-error-rate make the stand-in slow or flaky. Pass --url to load-test a server that is
+already running instead; its random.org calls are then whatever that server is configured to make.
+
+Each worker thread keeps one HTTP connection open and repeatedly picks a scenario by weight:
+
+    create       POST /api/create-meal with a new meal
+    battle       POST /api/clear-combatants, POST /api/prep-combatant twice, GET /api/battle
+    leaderboard  GET /api/leaderboard for the top 10 by wins or win percentage
+    get_meal     GET /api/get-meal-by-name for a known meal
+
+Combatants are shared by the whole server, so battle flows take turns through a client-side
+lock; interleaving them would fail by design rather than under load. Everything else runs
+fully concurrently.
+
+Usage:
+    python loadtest.py
+    python loadtest.py --concurrency 16 --duration 60 --mix create=1,battle=1,leaderboard=8
+    python loadtest.py --url http://localhost:5000 --json results.json
+
+The exit status is 1 if the overall error rate is above --max-error-rate.
+"""
+import argparse
+from collections import defaultdict
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CUISINES = ("Italian", "Mexican", "Japanese", "Indian", "French", "Thai", "Ethiopian", "Greek")
+DIFFICULTIES = ("LOW", "MED", "HIGH")
+
+DEFAULT_MIX = "create=1,battle=2,leaderboard=4,get_meal=3"
+
+
+##################################################
+# Results
+##################################################
+
+class Results:
+    """Latencies and errors for each endpoint, recorded by one worker."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def merge(self, other: "Results") -> None:
+        for name, latencies in other.latencies.items():
+            self.latencies[name].extend(latencies)
+        for name, errors in other.errors.items():
+            self.errors[name] += errors
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of values that are already sorted."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results: Results, elapsed: float) -> dict:
+    """Turns merged results into throughput, error rates and latency percentiles in milliseconds."""
+
+    def stats(latencies: List[float], errors: int) -> dict:
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': errors / len(latencies) if latencies else 0.0,
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+        }
+
+    endpoints = {name: stats(latencies, results.errors[name]) for name, latencies in sorted(results.latencies.items())}
+    total = stats(list(itertools.chain.from_iterable(results.latencies.values())), sum(results.errors.values()))
+    return {'elapsed_seconds': elapsed, 'total': total, 'endpoints': endpoints}
+
+
+def print_summary(summary: dict) -> None:
+    print(f"\n{'endpoint':<28}{'requests':>10}{'errors':>8}{'error %':>9}{'req/s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(summary['endpoints'].items()) + [("total", summary['total'])]
+    for name, row in rows:
+        print(f"{name:<28}{row['requests']:>10}{row['errors']:>8}{row['error_rate'] * 100:>8.2f}%"
+              f"{row['throughput']:>10.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+    print(f"\n{summary['total']['requests']} requests in {summary['elapsed_seconds']:.1f} seconds")
+
+
+##################################################
+# Client
+##################################################
+
+class Client:
+    """Makes requests on one kept-alive connection and records how each one went."""
+
+    def __init__(self, base_url: str, results: Results):
+        self.base_url = base_url.rstrip("/")
+        self.results = results
+        self.session = requests.Session()
+
+    def call(self, name: str, method: str, path: str, expect: tuple = (200,), **kwargs) -> Optional[requests.Response]:
+        """Makes a request, recording it under name. Returns the response, or None if it failed."""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            ok = response.status_code in expect
+        except requests.RequestException:
+            response, ok = None, False
+        self.results.record(name, time.perf_counter() - start, ok)
+        return response if ok else None
+
+
+class LoadContext:
+    """State shared by every worker: the known meals and the lock battle flows take turns on."""
+
+    def __init__(self, run_id: str, meals: List[str]):
+        self.run_id = run_id
+        self.meals = meals
+        self.battle_lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_meal_name(self) -> str:
+        with self._lock:
+            return f"Load {self.run_id} meal {next(self._counter)}"
+
+    def add_meal(self, name: str) -> None:
+        with self._lock:
+            self.meals.append(name)
+
+    def pick_meals(self, rng: random.Random, count: int) -> List[str]:
+        with self._lock:
+            return rng.sample(self.meals, count)
+
+
+def random_meal(name: str, rng: random.Random) -> dict:
+    return {
+        'meal': name,
+        'cuisine': rng.choice(CUISINES),
+        'price': round(rng.uniform(5, 60), 2),
+        'difficulty': rng.choice(DIFFICULTIES),
+    }
+
+
+##################################################
+# Scenarios
+##################################################
+
+def create(client: Client, context: LoadContext, rng: random.Random) -> None:
+    name = context.next_meal_name()
+    if client.call("create-meal", "POST", "/api/create-meal", expect=(201,), json=random_meal(name, rng)):
+        context.add_meal(name)
+
+def battle(client: Client, context: LoadContext, rng: random.Random) -> None:
+    meal_1, meal_2 = context.pick_meals(rng, 2)
+    with context.battle_lock:
+        client.call("clear-combatants", "POST", "/api/clear-combatants")
+        for meal in (meal_1, meal_2):
+            if not client.call("prep-combatant", "POST", "/api/prep-combatant", json={'meal': meal}):
+                return
+        client.call("battle", "GET", "/api/battle")
+
+def leaderboard(client: Client, context: LoadContext, rng: random.Random) -> None:
+    sort_by = rng.choice(("wins", "win_pct"))
+    client.call("leaderboard", "GET", f"/api/leaderboard?sort={sort_by}&limit=10")
+
+def get_meal(client: Client, context: LoadContext, rng: random.Random) -> None:
+    (meal,) = context.pick_meals(rng, 1)
+    client.call("get-meal-by-name", "GET", f"/api/get-meal-by-name/{quote(meal, safe='')}")
+
+
+SCENARIOS: Dict[str, Callable[[Client, LoadContext, random.Random], None]] = {
+    'create': create,
+    'battle': battle,
+    'leaderboard': leaderboard,
+    'get_meal': get_meal,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parses scenario weights written as "name=weight,name=weight"."""
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}. Must be one of {', '.join(SCENARIOS)}.")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+        if mix[name] < 0:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+    if not any(mix.values()):
+        raise ValueError("At least one scenario needs a positive weight.")
+    return mix
+
+
+##################################################
+# Running
+##################################################
+
+def seed_catalog(base_url: str, run_id: str, size: int, rng: random.Random) -> List[str]:
+    """Creates the meals the scenarios battle and look up, in one bulk request."""
+    meals = [random_meal(f"Load {run_id} seed {i}", rng) for i in range(1, size + 1)]
+    session = requests.Session()
+    response = session.post(f"{base_url}/api/create-meals", json=meals, timeout=120)
+    response.raise_for_status()
+    failed = [result for result in response.json()['results'] if result.get('status') == 'error']
+    if failed:
+        raise RuntimeError(f"Could not seed {len(failed)} meals: {failed[0]}")
+    session.post(f"{base_url}/api/clear-combatants", timeout=30).raise_for_status()
+    return [meal['meal'] for meal in meals]
+
+
+def run_load(base_url: str, mix: Dict[str, float], concurrency: int, duration: float, catalog_size: int,
+             seed: int) -> dict:
+    """Seeds the catalog, runs concurrency workers for duration seconds and summarizes the results."""
+    rng = random.Random(seed)
+    run_id = f"{seed}-{rng.randrange(16 ** 6):06x}"
+    context = LoadContext(run_id, seed_catalog(base_url, run_id, catalog_size, rng))
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    worker_results = [Results() for _ in range(concurrency)]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def worker(index: int) -> None:
+        worker_rng = random.Random(seed + index + 1)
+        client = Client(base_url, worker_results[index])
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[worker_rng.choices(names, weights)[0]]
+            scenario(client, context, worker_rng)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    results = Results()
+    for result in worker_results:
+        results.merge(result)
+    return summarize(results, elapsed)
+
+
+def start_local_server(seed: int, log_level: str, random_org_latency: float, random_org_error_rate: float):
+    """Starts the app in a background thread on a free port, against a fresh temporary database.
+
+    random.org is replaced by a seeded meal_max.utils.random_org_stub server with the given
+    latency and error rate. The settings in .env are used, except for the database paths, the log
+    level and the random.org URL. Returns the app server and the random.org server.
+
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(HERE, ".env"))
+    directory = tempfile.mkdtemp(prefix="meal_max_loadtest_")
+    os.environ["DB_PATH"] = os.path.join(directory, "meal_max.db")
+    os.environ["SQL_MIGRATIONS_PATH"] = os.path.join(HERE, "sql", "migrations")
+    os.environ["LOG_LEVEL"] = log_level
+
+    # Imported after the environment is set, since the modules read it at import time
+    from meal_max.utils.random_org_stub import start_server
+
+    random_org = start_server(seed=seed, latency=random_org_latency, error_rate=random_org_error_rate)
+    os.environ["RANDOM_ORG_BASE_URL"] = f"http://127.0.0.1:{random_org.server_port}"
+    from werkzeug.serving import make_server
+    import app
+
+    # werkzeug logs every request at INFO unless its logger has a level of its own
+    logging.getLogger("werkzeug").setLevel(log_level)
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, random_org
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: start one in-process)")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of worker threads")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--catalog-size", type=int, default=200, help="meals to create before the run")
+    parser.add_argument("--seed", type=int, default=411, help="seed for the scenario picks and the random.org stub")
+    parser.add_argument("--log-level", default="WARNING", help="log level of the in-process server")
+    parser.add_argument("--random-org-latency", type=float, default=0.0,
+                        help="seconds the random.org stand-in waits before each answer")
+    parser.add_argument("--random-org-error-rate", type=float, default=0.0,
+                        help="share of requests the random.org stand-in fails")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="fail if more requests than this fail")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.concurrency < 1 or args.duration <= 0 or args.catalog_size < 2:
+        print("error: --concurrency and --duration must be positive and --catalog-size at least 2", file=sys.stderr)
+        return 2
+
+    servers = []
+    base_url = args.url
+    if base_url is None:
+        try:
+            servers = start_local_server(args.seed, args.log_level, args.random_org_latency, args.random_org_error_rate)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        base_url = f"http://127.0.0.1:{servers[0].server_port}"
+
+    print(f"Load testing {base_url} with {args.concurrency} workers for {args.duration:g} seconds...")
+    try:
+        summary = run_load(base_url.rstrip("/"), mix, args.concurrency, args.duration, args.catalog_size, args.seed)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'url': base_url, 'concurrency': args.concurrency, 'mix': mix, **summary}, f, indent=2)
+
+    return 1 if summary['total']['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+from dataclasses import dataclass
+import logging
+import sqlite3
+from typing import Iterable, Optional
+
+import numpy as np
+
+from meal_max.models.battle_model import DIFFICULTY_MODIFIER
+from meal_max.models.kitchen_model import Meal
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Difficulty codes index into DIFFICULTY_MODIFIERS
+DIFFICULTY_CODES = ("HIGH", "MED", "LOW")
+DIFFICULTY_MODIFIERS = np.array([DIFFICULTY_MODIFIER[difficulty] for difficulty in DIFFICULTY_CODES], dtype=np.float64)
+
+# random.org's decimal fractions: 0.00, 0.01, ..., 0.99, each equally likely
+RANDOM_ORG_VALUES = np.array([float(f"{k / 100:.2f}") for k in range(100)])
+
+
+@dataclass
+class MealColumns:
+    """Meals stored column by column, for scoring many meals at once.
+
+    Attributes:
+        ids: The meal ids.
+        price: The meal prices.
+        cuisine_length: The number of characters in each meal's cuisine.
+        difficulty_code: Each meal's index into DIFFICULTY_CODES.
+
+    """
+    ids: np.ndarray
+    price: np.ndarray
+    cuisine_length: np.ndarray
+    difficulty_code: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_meals(cls, meals: Iterable[Meal]) -> "MealColumns":
+        """Builds the columns from Meal objects.
+
+        Args:
+            meals: The meals.
+
+        Returns:
+            MealColumns: The meals as columns, in the same order.
+
+        """
+        meals = list(meals)
+        return cls(
+            ids=np.array([meal.id for meal in meals], dtype=np.int64),
+            price=np.array([meal.price for meal in meals], dtype=np.float64),
+            cuisine_length=np.array([len(meal.cuisine) for meal in meals], dtype=np.int64),
+            difficulty_code=encode_difficulty([meal.difficulty for meal in meals]),
+        )
+
+
+def encode_difficulty(difficulties: Iterable[str]) -> np.ndarray:
+    """Turns difficulty names into difficulty codes.
+
+    Args:
+        difficulties: "HIGH", "MED" or "LOW" for each meal.
+
+    Returns:
+        np.ndarray: The codes. Raises a ValueError for an unknown difficulty.
+
+    """
+    codes = {difficulty: code for code, difficulty in enumerate(DIFFICULTY_CODES)}
+    try:
+        return np.array([codes[difficulty] for difficulty in difficulties], dtype=np.int8)
+    except KeyError as e:
+        raise ValueError(f"Invalid difficulty level: {e.args[0]}. Must be 'LOW', 'MED', or 'HIGH'.")
+
+
+def load_meal_columns() -> MealColumns:
+    """Reads every non-deleted meal from the database as columns.
+
+    Returns:
+        MealColumns: The meals, ordered by id.
+
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, price, length(cuisine), difficulty
+                FROM meals WHERE deleted = false
+                ORDER BY id
+            """)
+            rows = cursor.fetchall()
+
+        logger.info("Loaded %d meals for batch scoring", len(rows))
+        if not rows:
+            return MealColumns(np.empty(0, np.int64), np.empty(0), np.empty(0, np.int64), np.empty(0, np.int8))
+
+        ids, price, cuisine_length, difficulty = zip(*rows)
+        return MealColumns(
+            ids=np.array(ids, dtype=np.int64),
+            price=np.array(price, dtype=np.float64),
+            cuisine_length=np.array(cuisine_length, dtype=np.int64),
+            difficulty_code=encode_difficulty(difficulty),
+        )
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def battle_scores(price: np.ndarray, cuisine_length: np.ndarray, difficulty_code: np.ndarray) -> np.ndarray:
+    """Computes the battle score of many meals at once, exactly as BattleModel.get_battle_score does.
+
+    Args:
+        price: The meal prices.
+        cuisine_length: The number of characters in each meal's cuisine.
+        difficulty_code: Each meal's index into DIFFICULTY_CODES.
+
+    Returns:
+        np.ndarray: The battle scores.
+
+    """
+    return price * cuisine_length - DIFFICULTY_MODIFIERS[difficulty_code]
+
+
+def draw_random_numbers(rng: np.random.Generator, shape, random_values: np.ndarray = RANDOM_ORG_VALUES) -> np.ndarray:
+    """Draws random numbers the way random_utils gets them from random.org, for simulated battles.
+
+    Args:
+        rng: The generator to draw from.
+        shape: The shape of the array to draw.
+        random_values: The equally likely values of a draw.
+
+    Returns:
+        np.ndarray: The random numbers.
+
+    """
+    return random_values[rng.integers(0, len(random_values), shape)]
+
+
+def battle_outcomes(scores: np.ndarray, meal_1: np.ndarray, meal_2: np.ndarray,
+                    random_numbers: np.ndarray) -> np.ndarray:
+    """Decides many battles at once, exactly as BattleModel.fight does.
+
+    Args:
+        scores: The battle score of every meal.
+        meal_1: For each battle, the index of the first meal into scores.
+        meal_2: For each battle, the index of the second meal into scores.
+        random_numbers: For each battle, a random number between 0 and 1.
+
+    Returns:
+        np.ndarray: For each battle, True if the first meal wins.
+
+    """
+    delta = np.abs(scores[meal_1] - scores[meal_2]) / 100
+    return delta > random_numbers
+
+
+@dataclass
+class SimulationResult:
+    """The outcome of a batch of simulated battles.
+
+    Attributes:
+        meal_1_wins: For each battle, True if the first meal won.
+        battles: The number of battles each meal fought, by index into the columns.
+        wins: The number of battles each meal won, by index into the columns.
+
+    """
+    meal_1_wins: np.ndarray
+    battles: np.ndarray
+    wins: np.ndarray
+
+    def win_pct(self) -> np.ndarray:
+        """Returns each meal's share of battles won, or 0 for meals that didn't fight.
+
+        Returns:
+            np.ndarray: The win fractions.
+
+        """
+        return np.divide(self.wins, self.battles, out=np.zeros(len(self.wins)), where=self.battles > 0)
+
+
+def simulate_battles(columns: MealColumns, meal_1: np.ndarray, meal_2: np.ndarray,
+                     random_numbers: Optional[np.ndarray] = None,
+                     rng: Optional[np.random.Generator] = None) -> SimulationResult:
+    """Simulates a batch of battles between meals without recording anything.
+
+    Simulations need far more random numbers than random.org can supply, so unless random numbers
+    are given they come from a local generator, which can be seeded for repeatable what-ifs. They
+    are drawn from the same two-decimal values random.org returns.
+
+    Args:
+        columns: The meals.
+        meal_1: For each battle, the index of the first meal into columns.
+        meal_2: For each battle, the index of the second meal into columns.
+        random_numbers: For each battle, a random number between 0 and 1.
+        rng: The generator to draw random numbers from if none are given.
+
+    Returns:
+        SimulationResult: Who won each battle and each meal's totals. Raises a ValueError if the
+        pairings don't line up.
+
+    """
+    meal_1 = np.asarray(meal_1)
+    meal_2 = np.asarray(meal_2)
+    if meal_1.shape != meal_2.shape:
+        raise ValueError("meal_1 and meal_2 must have the same length.")
+    if random_numbers is None:
+        rng = rng if rng is not None else np.random.default_rng()
+        random_numbers = draw_random_numbers(rng, meal_1.shape)
+    elif np.shape(random_numbers) != meal_1.shape:
+        raise ValueError("random_numbers must have one entry per battle.")
+
+    scores = battle_scores(columns.price, columns.cuisine_length, columns.difficulty_code)
+    meal_1_wins = battle_outcomes(scores, meal_1, meal_2, random_numbers)
+
+    winners = np.where(meal_1_wins, meal_1, meal_2)
+    size = len(columns)
+    battles = np.bincount(meal_1, minlength=size) + np.bincount(meal_2, minlength=size)
+    wins = np.bincount(winners, minlength=size)
+
+    logger.info("Simulated %d battles between %d meals", len(meal_1), size)
+    return SimulationResult(meal_1_wins=meal_1_wins, battles=battles, wins=wins)
+
+
+def round_robin_pairings(num_meals: int) -> tuple:
+    """Returns every pair of meals once, for simulating a full round robin.
+
+    Args:
+        num_meals: The number of meals.
+
+    Returns:
+        tuple: (meal_1, meal_2) index arrays with num_meals * (num_meals - 1) / 2 battles.
+
+    """
+    return np.triu_indices(num_meals, k=1)
@@ -1,13 +1,19 @@
 import logging
-from typing import List
+from typing import List, Tuple
 
 from meal_max.models.kitchen_model import Meal, update_meal_stats
-from meal_max.utils.logger import configure_logger
+from meal_max.utils.logger import configure_logger, get_loop_logger
 from meal_max.utils.random_utils import get_random
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
+# Per-battle details are sampled and rate limited so tournaments don't flood the log
+loop_logger = get_loop_logger(__name__)
+
+
+# Subtracted from a meal's battle score; harder meals are penalized less
+DIFFICULTY_MODIFIER = {"HIGH": 1, "MED": 2, "LOW": 3}
 
 class BattleModel:
     """Represents a model for meal battles between combatants."""
@@ -44,28 +50,50 @@ class BattleModel:
         combatant_1 = self.combatants[0]
         combatant_2 = self.combatants[1]
 
+        winner, loser = self.fight(combatant_1, combatant_2)
+
+        # Update stats for both combatants
+        update_meal_stats(winner.id, 'win')
+        update_meal_stats(loser.id, 'loss')
+
+        # Remove the losing combatant from combatants
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    def fight(self, combatant_1: Meal, combatant_2: Meal) -> Tuple[Meal, Meal]:
+        """Decides the winner of a battle between two meals, without recording it.
+
+        Args:
+            combatant_1: The first meal.
+            combatant_2: The second meal.
+
+        Returns:
+            Tuple[Meal, Meal]: The winner and the loser.
+
+        """
         # Log the start of the battle
-        logger.info("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
+        loop_logger.info("Battle started between %s and %s", combatant_1.meal, combatant_2.meal)
 
         # Get battle scores for both combatants
         score_1 = self.get_battle_score(combatant_1)
         score_2 = self.get_battle_score(combatant_2)
 
         # Log the scores for both combatants
-        logger.info("Score for %s: %.3f", combatant_1.meal, score_1)
-        logger.info("Score for %s: %.3f", combatant_2.meal, score_2)
+        loop_logger.info("Score for %s: %.3f", combatant_1.meal, score_1)
+        loop_logger.info("Score for %s: %.3f", combatant_2.meal, score_2)
 
         # Compute the delta and normalize between 0 and 1
         delta = abs(score_1 - score_2) / 100
 
         # Log the delta and normalized delta
-        logger.info("Delta between scores: %.3f", delta)
+        loop_logger.info("Delta between scores: %.3f", delta)
 
         # Get random number from random.org
         random_number = get_random()
 
         # Log the random number
-        logger.info("Random number from random.org: %.3f", random_number)
+        loop_logger.info("Random number from random.org: %.3f", random_number)
 
         # Determine the winner based on the normalized delta
         if delta > random_number:
@@ -76,16 +104,9 @@ class BattleModel:
             loser = combatant_1
 
         # Log the winner
-        logger.info("The winner is: %s", winner.meal)
+        loop_logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
-
-        # Remove the losing combatant from combatants
-        self.combatants.remove(loser)
-
-        return winner.meal
+        return winner, loser
 
     def clear_combatants(self):
         """Initializes the BattleModel with an empty list of combatants.
@@ -111,17 +132,15 @@ class BattleModel:
         
         """
 
-        difficulty_modifier = {"HIGH": 1, "MED": 2, "LOW": 3}
-
         # Log the calculation process
-        logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
+        loop_logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
                     combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
 
         # Calculate score
-        score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
+        score = (combatant.price * len(combatant.cuisine)) - DIFFICULTY_MODIFIER[combatant.difficulty]
 
         # Log the calculated score
-        logger.info("Battle score for %s: %.3f", combatant.meal, score)
+        loop_logger.info("Battle score for %s: %.3f", combatant.meal, score)
 
         return score
 
@@ -156,5 +175,6 @@ class BattleModel:
 
         self.combatants.append(combatant_data)
 
-        # Log the current state of combatants
-        logger.info("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
+        # Log the current state of combatants, without building the list when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Current combatants list: %s", [combatant.meal for combatant in self.combatants])
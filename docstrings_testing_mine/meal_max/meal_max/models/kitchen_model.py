@@ -1,8 +1,13 @@
 from dataclasses import dataclass
+import json
 import logging
+import os
 import sqlite3
-from typing import Any
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
 
+from meal_max.models.leaderboard_cache import LeaderboardCache
+from meal_max.utils.pagination import decode_cursor, encode_cursor, parse_fields
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
@@ -11,6 +16,34 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Serve the leaderboard from memory instead of scanning the meals table on every read
+LEADERBOARD_CACHE = os.getenv("LEADERBOARD_CACHE", "false").lower() == "true"
+
+leaderboard_cache = LeaderboardCache()
+
+# Bumped whenever meals are added, changed or removed, so derived data such as the
+# matchup matrix knows when it is stale
+_catalog_version = 0
+_catalog_version_lock = threading.Lock()
+
+
+def get_catalog_version() -> int:
+
+    """ This function returns a number that changes whenever the set of meals or their details change.
+
+    Returns:
+        An int. Equal values mean the meals haven't changed in this process.
+
+    """
+
+    return _catalog_version
+
+def _bump_catalog_version() -> None:
+    global _catalog_version
+    with _catalog_version_lock:
+        _catalog_version += 1
+
+
 @dataclass
 class Meal:
     id: int
@@ -65,6 +98,7 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
                 VALUES (?, ?, ?, ?)
             """, (meal, cuisine, price, difficulty))
             conn.commit()
+            _bump_catalog_version()
 
             logger.info("Meal successfully added to the database: %s", meal)
 
@@ -77,6 +111,125 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
         raise e
 
 
+def create_meals(meals: Iterable[Any], upsert: bool=False) -> List[dict[str, Any]]:
+
+    """ This function adds many meals to the database in a single transaction.
+
+    Each meal is validated like create_meal. The valid ones are written with one executemany, and
+    a meal that fails validation or already exists is reported in its result instead of aborting
+    the others. In upsert mode an existing meal has its cuisine, price and difficulty replaced and
+    is restored if it had been deleted; its battle stats are kept.
+
+    Args:
+        meals: Dicts with meal, cuisine, price and difficulty keys.
+        upsert: A bool that represents whether existing meals should be updated rather than reported as errors.
+
+    Returns:
+        A list with one result per input, in order: {"meal": name, "status": "created" | "updated" | "error"},
+        plus an "error" message for errors.
+
+    """
+
+    results: List[dict[str, Any]] = []
+    rows: List[tuple] = []
+    for item in meals:
+        try:
+            rows.append(_validate_meal_item(item))
+            results.append({'meal': rows[-1][0], 'status': None})
+        except ValueError as e:
+            name = item.get('meal') if isinstance(item, dict) else None
+            results.append({'meal': name, 'status': 'error', 'error': str(e)})
+
+    if not rows:
+        return results
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock up front so the existence check can't go stale
+            cursor.execute("BEGIN IMMEDIATE")
+
+            cursor.execute("""
+                SELECT meal FROM meals WHERE meal IN (SELECT value FROM json_each(?))
+            """, (json.dumps([row[0] for row in rows]),))
+            existing = {row[0] for row in cursor.fetchall()}
+
+            to_write = []
+            pending = iter(rows)
+            for result in results:
+                if result['status'] is not None:
+                    continue
+                row = next(pending)
+                if row[0] in existing:
+                    if upsert:
+                        result['status'] = 'updated'
+                        to_write.append(row)
+                    else:
+                        result['status'] = 'error'
+                        result['error'] = f"Meal with name '{row[0]}' already exists"
+                else:
+                    # Later copies of the same meal in this batch count as updates
+                    existing.add(row[0])
+                    result['status'] = 'created'
+                    to_write.append(row)
+
+            if upsert:
+                cursor.executemany("""
+                    INSERT INTO meals (meal, cuisine, price, difficulty)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(meal) DO UPDATE SET
+                        cuisine = excluded.cuisine,
+                        price = excluded.price,
+                        difficulty = excluded.difficulty,
+                        deleted = FALSE
+                """, to_write)
+            else:
+                cursor.executemany("""
+                    INSERT INTO meals (meal, cuisine, price, difficulty)
+                    VALUES (?, ?, ?, ?)
+                """, to_write)
+            conn.commit()
+
+        if to_write:
+            _bump_catalog_version()
+
+        created = sum(1 for result in results if result['status'] == 'created')
+        updated = sum(1 for result in results if result['status'] == 'updated')
+        logger.info("Bulk meal write: %d created, %d updated, %d failed", created, updated, len(results) - created - updated)
+
+        # Updated meals may be on the leaderboard with their old details
+        if updated and leaderboard_cache.loaded:
+            leaderboard_cache.invalidate()
+
+        return results
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def _validate_meal_item(item: Any) -> tuple:
+
+    """ This helper checks one input to create_meals and returns it as a (meal, cuisine, price, difficulty) row. """
+
+    if not isinstance(item, dict):
+        raise ValueError("Each meal must be a JSON object")
+    meal = item.get('meal')
+    cuisine = item.get('cuisine')
+    price = item.get('price')
+    difficulty = item.get('difficulty')
+
+    if not isinstance(meal, str) or not meal:
+        raise ValueError(f"Invalid meal name: {meal}.")
+    if not isinstance(cuisine, str) or not cuisine:
+        raise ValueError(f"Invalid cuisine: {cuisine}.")
+    if isinstance(price, bool) or not isinstance(price, (int, float)) or price <= 0:
+        raise ValueError(f"Invalid price: {price}. Price must be a positive number.")
+    if difficulty not in ['LOW', 'MED', 'HIGH']:
+        raise ValueError(f"Invalid difficulty level: {difficulty}. Must be 'LOW', 'MED', or 'HIGH'.")
+    return meal, cuisine, price, difficulty
+
+
 def delete_meal(meal_id: int) -> None:
 
     """ This function attempts to delete a meal based on a meal id.
@@ -104,65 +257,143 @@ def delete_meal(meal_id: int) -> None:
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
             conn.commit()
+            _bump_catalog_version()
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
+        if leaderboard_cache.loaded:
+            leaderboard_cache.discard(meal_id)
+
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+LEADERBOARD_FIELDS = ('id', 'meal', 'cuisine', 'price', 'difficulty', 'battles', 'wins', 'win_pct')
+
+
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None, after: Optional[str]=None,
+                    fields: Optional[List[str]]=None) -> List[dict[str, Any]]:
 
     """ This is a getter function that gets the dictionary that represents the leaderboard of meals.
 
     Args:
         sort_by: A string that represents the value the elements in the dictionary are to be soerted by, "wins."
+        limit: The maximum number of meals to return. Returns every meal if None.
+        after: A cursor from get_leaderboard_page; only meals ranked after it are returned.
+        fields: The fields to include for each meal. Includes every field if None.
 
     Returns:
         A dictionary that represents the leaderboard, sorted by wins.
 
     """
 
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+    leaderboard, _ = get_leaderboard_page(sort_by, limit, after, fields)
+    return leaderboard
+
+def get_leaderboard_page(sort_by: str="wins", limit: Optional[int]=None, after: Optional[str]=None,
+                         fields: Optional[List[str]]=None) -> Tuple[List[dict[str, Any]], Optional[str]]:
+
+    """ This function gets one page of the leaderboard using a keyset cursor instead of OFFSET.
+
+    Args:
+        sort_by: "wins" or "win_pct". Ties are broken by meal id when paging.
+        limit: The maximum number of meals on the page. Returns every remaining meal if None.
+        after: The next_cursor returned with the previous page, or None for the first page.
+        fields: The fields to include for each meal, as a list or comma-separated string. Includes every field if None.
+
+    Returns:
+        A (leaderboard, next_cursor) tuple. next_cursor is None on the last page. Raises a ValueError for invalid arguments.
+
     """
 
-    if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
-    elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
-    else:
+    if sort_by not in ("wins", "win_pct"):
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+        raise ValueError(f"Invalid limit: {limit}. Must be a positive integer.")
+
+    fields = parse_fields(fields, LEADERBOARD_FIELDS)
+    paginate = limit is not None or after is not None
+    after_key = _decode_leaderboard_cursor(after, sort_by) if after is not None else None
+    # Fetch one extra row to find out whether there is another page
+    fetch_limit = limit + 1 if limit is not None else None
+
+    if LEADERBOARD_CACHE:
+        if not leaderboard_cache.loaded:
+            rebuild_leaderboard_cache()
+        rows = leaderboard_cache.top(sort_by, limit=fetch_limit, after=after_key, raw=True)
+        logger.info("Leaderboard retrieved from cache")
+    else:
+        rows = _query_leaderboard(sort_by, fields, paginate, after_key, fetch_limit)
+        logger.info("Leaderboard retrieved successfully")
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([sort_by, last[sort_by], last['id']])
+
+    leaderboard = []
+    for row in rows:
+        meal = {field: row[field] for field in fields}
+        if 'win_pct' in meal:
+            meal['win_pct'] = round(meal['win_pct'] * 100, 1)  # Convert to percentage
+        leaderboard.append(meal)
+
+    return leaderboard, next_cursor
+
+def _query_leaderboard(sort_by: str, fields: List[str], paginate: bool, after_key: Optional[tuple],
+                       fetch_limit: Optional[int]) -> List[dict[str, Any]]:
+
+    """ This helper runs the leaderboard query and returns raw rows keyed by column, with win_pct as a fraction. """
+
+    columns = list(fields)
+    if paginate:
+        # The cursor needs the sort key of the last row even if it wasn't requested
+        columns += [column for column in (sort_by, 'id') if column not in columns]
+
+    # win_pct is a generated column, and the WHERE clause matches the partial
+    # leaderboard indexes from sql/migrations/0002_leaderboard_indexes.sql
+    query = f"""
+        SELECT {', '.join(columns)}
+        FROM meals WHERE deleted = false AND battles > 0
+    """
+    params: List[Any] = []
+
+    if after_key is not None:
+        query += f" AND ({sort_by} < ? OR ({sort_by} = ? AND id > ?))"
+        params += [after_key[0], after_key[0], after_key[1]]
+
+    query += f" ORDER BY {sort_by} DESC"
+    if paginate:
+        query += ", id ASC"
+    if fetch_limit is not None:
+        query += " LIMIT ?"
+        params.append(fetch_limit)
 
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
 
-        leaderboard = []
-        for row in rows:
-            meal = {
-                'id': row[0],
-                'meal': row[1],
-                'cuisine': row[2],
-                'price': row[3],
-                'difficulty': row[4],
-                'battles': row[5],
-                'wins': row[6],
-                'win_pct': round(row[7] * 100, 1)  # Convert to percentage
-            }
-            leaderboard.append(meal)
-
-        logger.info("Leaderboard retrieved successfully")
-        return leaderboard
+        return [dict(zip(columns, row)) for row in rows]
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _decode_leaderboard_cursor(after: str, sort_by: str) -> tuple:
+
+    """ This helper turns a leaderboard cursor back into a (sort value, id) key, checking it belongs to the same sort. """
+
+    values = decode_cursor(after)
+    if (len(values) != 3 or values[0] != sort_by
+            or isinstance(values[1], bool) or not isinstance(values[1], (int, float))
+            or isinstance(values[2], bool) or not isinstance(values[2], int)):
+        raise ValueError(f"Invalid cursor: {after}")
+    return values[1], values[2]
+
 def get_meal_by_id(meal_id: int) -> Meal:
 
     """ This is a getter function that gets a meal using a meal_id.
@@ -261,8 +492,111 @@ def update_meal_stats(meal_id: int, result: str) -> None:
             else:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
+            row = None
+            if leaderboard_cache.loaded:
+                # Read the new stats back inside the same transaction
+                cursor.execute("""
+                    SELECT id, meal, cuisine, price, difficulty, battles, wins
+                    FROM meals WHERE id = ?
+                """, (meal_id,))
+                row = cursor.fetchone()
+
             conn.commit()
 
+        if row is not None:
+            leaderboard_cache.upsert(row)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def record_battle_results(results: Iterable[Tuple[int, int]]) -> None:
+
+    """ This function updates the stats of every meal in a set of battles in a single transaction.
+
+    Args:
+        results: (winner_id, loser_id) pairs, one per battle. A meal may appear in many battles.
+
+    Returns:
+        Nothing. Raises a ValueError, and updates nothing, if any meal is missing or deleted.
+
+    """
+
+    # Fold the battles into one (battles, wins) increment per meal
+    increments: dict[int, List[int]] = {}
+    for winner_id, loser_id in results:
+        increments.setdefault(winner_id, [0, 0])
+        increments.setdefault(loser_id, [0, 0])
+        increments[winner_id][0] += 1
+        increments[winner_id][1] += 1
+        increments[loser_id][0] += 1
+
+    if not increments:
+        return
+
+    meal_ids = json.dumps(list(increments))
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            cursor.execute("SELECT id, deleted FROM meals WHERE id IN (SELECT value FROM json_each(?))", (meal_ids,))
+            deleted_by_id = dict(cursor.fetchall())
+            for meal_id in increments:
+                if meal_id not in deleted_by_id:
+                    logger.info("Meal with ID %s not found", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} not found")
+                if deleted_by_id[meal_id]:
+                    logger.info("Meal with ID %s has been deleted", meal_id)
+                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
+            cursor.executemany(
+                "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?",
+                [(battles, wins, meal_id) for meal_id, (battles, wins) in increments.items()]
+            )
+
+            rows = []
+            if leaderboard_cache.loaded:
+                # Read the new stats back inside the same transaction
+                cursor.execute("""
+                    SELECT id, meal, cuisine, price, difficulty, battles, wins
+                    FROM meals WHERE id IN (SELECT value FROM json_each(?))
+                """, (meal_ids,))
+                rows = cursor.fetchall()
+
+            conn.commit()
+            logger.info("Recorded results for %d meals", len(increments))
+
+        for row in rows:
+            leaderboard_cache.upsert(row)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def rebuild_leaderboard_cache() -> None:
+
+    """ This function reloads the in-process leaderboard cache from the database.
+
+    Args:
+        None.
+
+    Returns:
+        Nothing. If the database can't be read, it raises an error and leaves the cache unloaded.
+
+    """
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, meal, cuisine, price, difficulty, battles, wins
+                FROM meals WHERE deleted = false AND battles > 0
+            """)
+            leaderboard_cache.load(cursor.fetchall())
+
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
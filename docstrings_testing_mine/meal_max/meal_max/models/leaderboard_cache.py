@@ -0,0 +1,177 @@
+from bisect import bisect_left, bisect_right, insort
+import logging
+import threading
+from typing import Any, Iterable, List, Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class LeaderboardCache:
+    """An in-process copy of the leaderboard, kept sorted by wins and by win percentage.
+
+    The cache holds every non-deleted meal that has fought at least one battle. It is
+    updated one meal at a time as stats change, so reading the top k meals is O(k) and
+    never touches SQLite. The cache only sees changes made through this process.
+
+    """
+
+    def __init__(self):
+        """Initializes an empty, unloaded cache.
+
+        Args:
+            self
+
+        Returns:
+            Nothing. The cache must be loaded before it can serve reads.
+
+        """
+        self._lock = threading.Lock()
+        self._meals: dict[int, dict[str, Any]] = {}
+        # Sort keys: highest first, ties broken by id
+        self._by_wins: List[tuple] = []
+        self._by_win_pct: List[tuple] = []
+        self.loaded = False
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        """Replaces the contents of the cache with the given meals.
+
+        Args:
+            rows: (id, meal, cuisine, price, difficulty, battles, wins) tuples.
+
+        Returns:
+            None. Cached meals with more battles than their row are kept, since they were
+            upserted after the rows were read.
+
+        """
+        meals = {}
+        for row in rows:
+            meal = self._to_meal(row)
+            meals[meal['id']] = meal
+        with self._lock:
+            for meal_id, old in self._meals.items():
+                new = meals.get(meal_id)
+                if new is None or old['battles'] > new['battles']:
+                    meals[meal_id] = old
+            self._meals = meals
+            self._by_wins = sorted(self._wins_key(meal) for meal in self._meals.values())
+            self._by_win_pct = sorted(self._win_pct_key(meal) for meal in self._meals.values())
+            self.loaded = True
+        logger.info("Leaderboard cache loaded with %d meals", len(self._meals))
+
+    def invalidate(self) -> None:
+        """Empties the cache and marks it as unloaded.
+
+        Returns:
+            None.
+
+        """
+        with self._lock:
+            self._meals.clear()
+            self._by_wins = []
+            self._by_win_pct = []
+            self.loaded = False
+
+    def upsert(self, row: tuple) -> None:
+        """Adds a meal to the cache or moves it to its new rank.
+
+        Args:
+            row: An (id, meal, cuisine, price, difficulty, battles, wins) tuple read after the update.
+
+        Returns:
+            None. Rows older than the cached copy are ignored, since battles only ever go up,
+            and so is every row while the cache is unloaded.
+
+        """
+        meal = self._to_meal(row)
+        with self._lock:
+            if not self.loaded:
+                return
+            old = self._meals.get(meal['id'])
+            if old is not None:
+                if old['battles'] > meal['battles']:
+                    return
+                self._remove_keys(old)
+            if meal['battles'] > 0:
+                self._meals[meal['id']] = meal
+                insort(self._by_wins, self._wins_key(meal))
+                insort(self._by_win_pct, self._win_pct_key(meal))
+            else:
+                self._meals.pop(meal['id'], None)
+
+    def discard(self, meal_id: int) -> None:
+        """Removes a meal from the cache, if it is there.
+
+        Args:
+            meal_id: The id of the meal to remove.
+
+        Returns:
+            None. Does nothing while the cache is unloaded.
+
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+            old = self._meals.pop(meal_id, None)
+            if old is not None:
+                self._remove_keys(old)
+
+    def top(self, sort_by: str = "wins", limit: Optional[int] = None, after: Optional[tuple] = None,
+            raw: bool = False) -> List[dict[str, Any]]:
+        """Returns the leaderboard in the same shape as kitchen_model.get_leaderboard.
+
+        Args:
+            sort_by: "wins" or "win_pct".
+            limit: The number of meals to return. Returns every meal if None.
+            after: A (sort value, id) key; only meals ranked after it are returned.
+            raw: If True, win_pct is returned as a fraction rather than a rounded percentage.
+
+        Returns:
+            A list of meal dicts, best first. Raises a ValueError for an unknown sort_by.
+
+        """
+        if sort_by not in ("wins", "win_pct"):
+            raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+
+        with self._lock:
+            # load() and invalidate() swap in new lists, so pick one only while holding the lock
+            keys = self._by_win_pct if sort_by == "win_pct" else self._by_wins
+            start = 0 if after is None else bisect_right(keys, (-after[0], after[1]))
+            end = len(keys) if limit is None else start + limit
+            return [self._to_entry(self._meals[key[1]], raw) for key in keys[start:end]]
+
+    def _remove_keys(self, meal: dict[str, Any]) -> None:
+        for keys, key in ((self._by_wins, self._wins_key(meal)), (self._by_win_pct, self._win_pct_key(meal))):
+            index = bisect_left(keys, key)
+            del keys[index]
+
+    @staticmethod
+    def _to_meal(row: tuple) -> dict[str, Any]:
+        return {
+            'id': row[0],
+            'meal': row[1],
+            'cuisine': row[2],
+            'price': row[3],
+            'difficulty': row[4],
+            'battles': row[5],
+            'wins': row[6],
+        }
+
+    @staticmethod
+    def _to_entry(meal: dict[str, Any], raw: bool = False) -> dict[str, Any]:
+        entry = dict(meal)
+        entry['win_pct'] = meal['wins'] * 1.0 / meal['battles']
+        if not raw:
+            entry['win_pct'] = round(entry['win_pct'] * 100, 1)  # Convert to percentage
+        return entry
+
+    @staticmethod
+    def _wins_key(meal: dict[str, Any]) -> tuple:
+        return (-meal['wins'], meal['id'])
+
+    @staticmethod
+    def _win_pct_key(meal: dict[str, Any]) -> tuple:
+        return (-(meal['wins'] * 1.0 / meal['battles']), meal['id'])
@@ -0,0 +1,216 @@
+from dataclasses import dataclass
+import logging
+import os
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+
+from meal_max.models.batch_scoring import (
+    RANDOM_ORG_VALUES,
+    MealColumns,
+    battle_scores,
+    draw_random_numbers,
+    load_meal_columns
+)
+from meal_max.models.kitchen_model import get_catalog_version
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+METHODS = ("exact", "monte_carlo")
+
+# The matrix has one entry per pair of meals, so its size is capped
+MATCHUP_MAX_MEALS = int(os.getenv("MATCHUP_MAX_MEALS", "2000"))
+# The most battles a single Monte Carlo estimate may simulate
+MATCHUP_MAX_SIMULATED_BATTLES = int(os.getenv("MATCHUP_MAX_SIMULATED_BATTLES", "50000000"))
+
+
+@dataclass
+class MatchupMatrix:
+    """Win probabilities for every pairing of meals.
+
+    probabilities[i, j] is the chance that meal i wins when it is the first combatant and meal j is
+    the second. A battle is won by the first combatant when the score delta / 100 beats the random
+    draw, so under the current rules the matrix is symmetric: the first combatant's chance depends
+    only on how far apart the scores are, not on which meal scores higher.
+
+    Attributes:
+        ids: The meal ids, in matrix order.
+        probabilities: The win probability matrix, with NaN on the diagonal.
+        method: "exact" or "monte_carlo".
+        trials: The battles simulated per pairing, for Monte Carlo estimates.
+        catalog_version: The catalog version the matrix was computed from.
+
+    """
+    ids: np.ndarray
+    probabilities: np.ndarray
+    method: str
+    trials: Optional[int]
+    catalog_version: int
+
+    def to_dict(self, meal_ids: Optional[List[int]] = None) -> dict[str, Any]:
+        """Returns the matrix, or the rows and columns for some meals, as a JSON-serializable dict.
+
+        Args:
+            meal_ids: The meals to include, in order. Includes every meal if None.
+
+        Returns:
+            dict[str, Any]: The meal ids and the matrix, with None on the diagonal. Raises a
+            ValueError if a meal isn't in the matrix.
+
+        """
+        if meal_ids is None:
+            index = np.arange(len(self.ids))
+        else:
+            positions = {meal_id: position for position, meal_id in enumerate(self.ids.tolist())}
+            missing = [meal_id for meal_id in meal_ids if meal_id not in positions]
+            if missing:
+                raise ValueError(f"Meals not found: {', '.join(map(str, missing))}")
+            index = np.array([positions[meal_id] for meal_id in meal_ids], dtype=np.int64)
+
+        sub = self.probabilities[np.ix_(index, index)]
+        return {
+            'meal_ids': self.ids[index].tolist(),
+            'method': self.method,
+            'trials': self.trials,
+            'probabilities': [[None if np.isnan(p) else round(float(p), 4) for p in row] for row in sub],
+        }
+
+
+def exact_win_probabilities(scores: np.ndarray, random_values: np.ndarray = RANDOM_ORG_VALUES) -> np.ndarray:
+    """Computes the first combatant's win probability for every pairing, without simulation.
+
+    Args:
+        scores: The battle score of every meal.
+        random_values: The equally likely values of the random draw.
+
+    Returns:
+        np.ndarray: The probability matrix, with NaN on the diagonal.
+
+    """
+    delta = np.abs(scores[:, None] - scores[None, :]) / 100
+    # The first combatant wins when delta > draw, so count the draws strictly below delta
+    sorted_values = np.sort(random_values)
+    probabilities = np.searchsorted(sorted_values, delta, side="left") / len(sorted_values)
+    np.fill_diagonal(probabilities, np.nan)
+    return probabilities
+
+
+def monte_carlo_win_probabilities(scores: np.ndarray, trials: int, rng: Optional[np.random.Generator] = None,
+                                  random_values: np.ndarray = RANDOM_ORG_VALUES, chunk_size: int = 1_000_000) -> np.ndarray:
+    """Estimates the first combatant's win probability for every pairing by simulating battles.
+
+    Each distinct pairing is simulated trials times, a chunk at a time, with draws from the same
+    values random.org returns.
+
+    Args:
+        scores: The battle score of every meal.
+        trials: The number of battles to simulate per pairing.
+        rng: The random generator. Seed it for repeatable estimates.
+        random_values: The equally likely values of the random draw.
+        chunk_size: The most battles to simulate in one vectorized step.
+
+    Returns:
+        np.ndarray: The estimated probability matrix, with NaN on the diagonal.
+
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    meal_1, meal_2 = np.triu_indices(len(scores), k=1)
+    delta = np.abs(scores[meal_1] - scores[meal_2]) / 100
+
+    wins = np.zeros(len(delta), dtype=np.int64)
+    pairs_per_chunk = max(1, chunk_size // trials)
+    for start in range(0, len(delta), pairs_per_chunk):
+        chunk = delta[start:start + pairs_per_chunk]
+        draws = draw_random_numbers(rng, (len(chunk), trials), random_values)
+        wins[start:start + len(chunk)] = np.count_nonzero(chunk[:, None] > draws, axis=1)
+
+    probabilities = np.full((len(scores), len(scores)), np.nan)
+    probabilities[meal_1, meal_2] = wins / trials
+    probabilities[meal_2, meal_1] = wins / trials
+    return probabilities
+
+
+# The last matrix, keyed by (catalog version, method, trials, seed)
+_cache: Optional[tuple] = None
+_cache_lock = threading.Lock()
+
+
+def get_matchup_matrix(method: str = "exact", trials: int = 1000, seed: Optional[int] = None) -> MatchupMatrix:
+    """Returns the win probability matrix for all active meals, computing it only when needed.
+
+    The last matrix is cached and reused until meals are created, updated or deleted.
+
+    Args:
+        method: "exact" to compute the probabilities, or "monte_carlo" to estimate them by simulation.
+        trials: The battles to simulate per pairing, for Monte Carlo estimates.
+        seed: A seed for repeatable Monte Carlo estimates. Unseeded estimates are never cached.
+
+    Returns:
+        MatchupMatrix: The matrix. Raises a ValueError for invalid arguments or too many meals.
+
+    """
+    global _cache
+    if method not in METHODS:
+        raise ValueError(f"Invalid method: {method}. Must be one of {', '.join(METHODS)}.")
+    if method == "monte_carlo" and trials < 1:
+        raise ValueError(f"Invalid trials: {trials}. Must be a positive integer.")
+    cacheable = method == "exact" or seed is not None
+    version = get_catalog_version()
+    key = (version, method, trials, seed) if method == "monte_carlo" else (version, method)
+
+    with _cache_lock:
+        cached = _cache
+    if cacheable and cached is not None and cached[0] == key:
+        logger.info("Matchup matrix served from cache")
+        return cached[1]
+
+    columns = load_meal_columns()
+    matrix = compute_matchup_matrix(columns, method, trials, seed, version)
+    if cacheable:
+        with _cache_lock:
+            _cache = (key, matrix)
+    return matrix
+
+
+def compute_matchup_matrix(columns: MealColumns, method: str = "exact", trials: int = 1000,
+                           seed: Optional[int] = None, catalog_version: int = 0) -> MatchupMatrix:
+    """Computes the win probability matrix for the given meals.
+
+    Args:
+        columns: The meals.
+        method: "exact" or "monte_carlo".
+        trials: The battles to simulate per pairing, for Monte Carlo estimates.
+        seed: A seed for the Monte Carlo generator.
+        catalog_version: The catalog version the meals were read at.
+
+    Returns:
+        MatchupMatrix: The matrix. Raises a ValueError if there are too many meals or battles.
+
+    """
+    num_meals = len(columns)
+    if num_meals > MATCHUP_MAX_MEALS:
+        raise ValueError(f"Too many meals for a matchup matrix: {num_meals} (the limit is {MATCHUP_MAX_MEALS}).")
+
+    scores = battle_scores(columns.price, columns.cuisine_length, columns.difficulty_code)
+    if method == "exact":
+        probabilities = exact_win_probabilities(scores)
+    else:
+        battles = num_meals * (num_meals - 1) // 2 * trials
+        if battles > MATCHUP_MAX_SIMULATED_BATTLES:
+            raise ValueError(f"Too many battles to simulate: {battles} (the limit is {MATCHUP_MAX_SIMULATED_BATTLES}). "
+                             "Use fewer trials or the exact method.")
+        probabilities = monte_carlo_win_probabilities(scores, trials, np.random.default_rng(seed))
+
+    logger.info("Computed %s matchup matrix for %d meals", method, num_meals)
+    return MatchupMatrix(
+        ids=columns.ids,
+        probabilities=probabilities,
+        method=method,
+        trials=trials if method == "monte_carlo" else None,
+        catalog_version=catalog_version,
+    )
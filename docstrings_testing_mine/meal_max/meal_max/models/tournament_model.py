@@ -0,0 +1,314 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal, get_meal_by_id, record_battle_results
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+FORMATS = ("single_elimination", "round_robin", "swiss")
+
+# How many finished tournaments to keep for polling
+MAX_FINISHED_TOURNAMENTS = 100
+
+
+@dataclass
+class Tournament:
+    """The state of one tournament, as seen by anyone polling it.
+
+    Attributes:
+        id: The tournament id.
+        format: "single_elimination", "round_robin" or "swiss".
+        meals: The entrants, in seeding order.
+        num_rounds: The number of rounds that will be played.
+        status: "pending", "running", "completed" or "failed".
+        rounds: For each round played, its matches as {"meal_1", "meal_2", "winner"} dicts of meal ids.
+            A bye has meal_2 and winner set to None.
+        wins: Wins per meal id, with a bye counting as a win in Swiss.
+        losses: Losses per meal id.
+        error: Why the tournament failed, if it did.
+
+    """
+    id: int
+    format: str
+    meals: List[Meal]
+    num_rounds: int
+    status: str = "pending"
+    rounds: List[List[dict[str, Any]]] = field(default_factory=list)
+    wins: dict[int, int] = field(default_factory=dict)
+    losses: dict[int, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def standings(self) -> List[dict[str, Any]]:
+        """Returns the entrants ranked by wins, then fewest losses, then seeding.
+
+        Returns:
+            List[dict[str, Any]]: {"id", "meal", "wins", "losses"} for each entrant.
+
+        """
+        seeds = {meal.id: seed for seed, meal in enumerate(self.meals)}
+        ranked = sorted(self.meals, key=lambda meal: (-self.wins[meal.id], self.losses[meal.id], seeds[meal.id]))
+        return [
+            {'id': meal.id, 'meal': meal.meal, 'wins': self.wins[meal.id], 'losses': self.losses[meal.id]}
+            for meal in ranked
+        ]
+
+    def champion(self) -> Optional[dict[str, Any]]:
+        """Returns the winner of a completed tournament, or None if it isn't finished.
+
+        Returns:
+            Optional[dict[str, Any]]: The top entry of the standings.
+
+        """
+        if self.status != "completed":
+            return None
+        return self.standings()[0]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the tournament as a JSON-serializable dict.
+
+        Returns:
+            dict[str, Any]: The tournament's progress, standings and champion.
+
+        """
+        return {
+            'id': self.id,
+            'format': self.format,
+            'status': self.status,
+            'rounds_played': len(self.rounds),
+            'num_rounds': self.num_rounds,
+            'rounds': self.rounds,
+            'standings': self.standings(),
+            'champion': self.champion(),
+            'error': self.error,
+        }
+
+
+class TournamentModel:
+    """Runs tournaments between many meals in the background.
+
+    Each round's battles are decided with BattleModel's scoring and the random source, and the
+    stats for the whole round are written in a single transaction.
+
+    """
+
+    def __init__(self, battle_model: Optional[BattleModel] = None):
+        """Initializes the TournamentModel with no tournaments.
+
+        Args:
+            battle_model: The BattleModel whose scoring decides each battle.
+
+        Returns:
+            Nothing.
+
+        """
+        self.battle_model = battle_model or BattleModel()
+        self._tournaments: "OrderedDict[int, Tournament]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start_tournament(self, meal_ids: List[int], fmt: str, num_rounds: Optional[int] = None,
+                         background: bool = True) -> Tournament:
+        """Validates the entrants and starts a tournament.
+
+        Args:
+            meal_ids: The ids of the entrants, in seeding order. At least two, with no repeats.
+            fmt: "single_elimination", "round_robin" or "swiss".
+            num_rounds: The number of Swiss rounds. Defaults to enough rounds to separate the field.
+            background: Whether to run the tournament on a background thread.
+
+        Returns:
+            Tournament: The new tournament. Raises a ValueError for invalid arguments or meals.
+
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Invalid tournament format: {fmt}. Must be one of {', '.join(FORMATS)}.")
+        if len(meal_ids) < 2:
+            raise ValueError("A tournament needs at least two meals.")
+        if len(set(meal_ids)) != len(meal_ids):
+            raise ValueError("A meal can only enter a tournament once.")
+        if num_rounds is not None and (fmt != "swiss" or num_rounds < 1):
+            raise ValueError("num_rounds can only be set, to a positive number, for Swiss tournaments.")
+
+        meals = [get_meal_by_id(meal_id) for meal_id in meal_ids]
+        if fmt == "single_elimination":
+            num_rounds = math.ceil(math.log2(len(meals)))
+        elif fmt == "round_robin":
+            num_rounds = len(meals) - 1 if len(meals) % 2 == 0 else len(meals)
+        elif num_rounds is None:
+            num_rounds = math.ceil(math.log2(len(meals)))
+
+        with self._lock:
+            tournament = Tournament(
+                id=next(self._ids),
+                format=fmt,
+                meals=meals,
+                num_rounds=num_rounds,
+                wins={meal.id: 0 for meal in meals},
+                losses={meal.id: 0 for meal in meals},
+            )
+            self._tournaments[tournament.id] = tournament
+            self._evict_finished()
+
+        logger.info("Starting %s tournament %d with %d meals", fmt, tournament.id, len(meals))
+        if background:
+            threading.Thread(target=self.run_tournament, args=(tournament,),
+                             name=f"tournament-{tournament.id}", daemon=True).start()
+        else:
+            self.run_tournament(tournament)
+        return tournament
+
+    def get_tournament(self, tournament_id: int) -> Tournament:
+        """Retrieves a tournament by id.
+
+        Args:
+            tournament_id: The id returned when the tournament was started.
+
+        Returns:
+            Tournament: The tournament. Raises a ValueError if there is no such tournament.
+
+        """
+        with self._lock:
+            tournament = self._tournaments.get(tournament_id)
+        if tournament is None:
+            raise ValueError(f"Tournament with ID {tournament_id} not found")
+        return tournament
+
+    def run_tournament(self, tournament: Tournament) -> None:
+        """Plays every round of a tournament, recording stats once per round.
+
+        Args:
+            tournament: A pending tournament.
+
+        Returns:
+            Nothing. Errors are recorded on the tournament, which is marked as failed.
+
+        """
+        tournament.status = "running"
+        start = time.monotonic()
+        try:
+            if tournament.format == "single_elimination":
+                self._run_single_elimination(tournament)
+            elif tournament.format == "round_robin":
+                self._run_round_robin(tournament)
+            else:
+                self._run_swiss(tournament)
+            tournament.status = "completed"
+            battles = sum(1 for matches in tournament.rounds for match in matches if match['meal_2'] is not None)
+            logger.info("Tournament %d completed: %d battles over %d rounds in %.3f seconds",
+                        tournament.id, battles, len(tournament.rounds), time.monotonic() - start)
+        except Exception as e:
+            logger.error("Tournament %d failed: %s", tournament.id, str(e))
+            tournament.error = str(e)
+            tournament.status = "failed"
+
+    ##################################################
+    # Formats
+    ##################################################
+
+    def _run_single_elimination(self, tournament: Tournament) -> None:
+        # Standard bracket order for a field padded to a power of two: seed i meets seed
+        # size - 1 - i in round 1 and the top two seeds can only meet in the final
+        size = 2 ** tournament.num_rounds
+        order = [0]
+        while len(order) < size:
+            order = [seed for top in order for seed in (top, 2 * len(order) - 1 - top)]
+        # The padding seeds are empty slots, so the top seeds get byes in round 1 only
+        bracket = [tournament.meals[seed] if seed < len(tournament.meals) else None for seed in order]
+
+        while len(bracket) > 1:
+            slots = [(bracket[i], bracket[i + 1]) for i in range(0, len(bracket), 2)]
+            pairings = [(meal_1, meal_2) for meal_1, meal_2 in slots if meal_2 is not None]
+            byes = [meal_1 for meal_1, meal_2 in slots if meal_2 is None]
+            winners = iter(self._play_round(tournament, pairings, byes, bye_is_win=False))
+            bracket = [next(winners) if meal_2 is not None else meal_1 for meal_1, meal_2 in slots]
+
+    def _run_round_robin(self, tournament: Tournament) -> None:
+        # Circle method: fix the first seat and rotate the rest, with None as the bye seat
+        seats: List[Optional[Meal]] = list(tournament.meals)
+        if len(seats) % 2:
+            seats.append(None)
+        half = len(seats) // 2
+        for _ in range(tournament.num_rounds):
+            pairings = []
+            bye = None
+            for i in range(half):
+                meal_1, meal_2 = seats[i], seats[-1 - i]
+                if meal_1 is None or meal_2 is None:
+                    bye = meal_1 or meal_2
+                else:
+                    pairings.append((meal_1, meal_2))
+            self._play_round(tournament, pairings, [bye] if bye is not None else [], bye_is_win=False)
+            seats = [seats[0], seats[-1]] + seats[1:-1]
+
+    def _run_swiss(self, tournament: Tournament) -> None:
+        seeds = {meal.id: seed for seed, meal in enumerate(tournament.meals)}
+        played = set()
+        had_bye = set()
+        for _ in range(tournament.num_rounds):
+            ranked = sorted(tournament.meals, key=lambda meal: (-tournament.wins[meal.id], seeds[meal.id]))
+
+            bye = None
+            if len(ranked) % 2:
+                # The lowest-ranked meal that hasn't had a bye sits out
+                bye = next((meal for meal in reversed(ranked) if meal.id not in had_bye), ranked[-1])
+                had_bye.add(bye.id)
+                ranked.remove(bye)
+
+            pairings = self._swiss_pairings(ranked, played)
+            for meal_1, meal_2 in pairings:
+                played.add(frozenset((meal_1.id, meal_2.id)))
+            self._play_round(tournament, pairings, [bye] if bye is not None else [])
+
+    @staticmethod
+    def _swiss_pairings(ranked: List[Meal], played: set) -> List[Tuple[Meal, Meal]]:
+        # Pair each meal with the next-ranked one it hasn't met; allow a rematch only if unavoidable
+        remaining = list(ranked)
+        pairings = []
+        while remaining:
+            meal_1 = remaining.pop(0)
+            opponent = next((meal for meal in remaining if frozenset((meal_1.id, meal.id)) not in played), remaining[0])
+            remaining.remove(opponent)
+            pairings.append((meal_1, opponent))
+        return pairings
+
+    def _play_round(self, tournament: Tournament, pairings: List[Tuple[Meal, Meal]], byes: List[Meal],
+                    bye_is_win: bool = True) -> List[Meal]:
+        matches = []
+        results = []
+        winners = []
+        for meal_1, meal_2 in pairings:
+            winner, loser = self.battle_model.fight(meal_1, meal_2)
+            matches.append({'meal_1': meal_1.id, 'meal_2': meal_2.id, 'winner': winner.id})
+            results.append((winner.id, loser.id))
+            winners.append(winner)
+
+        # One transaction for the whole round
+        record_battle_results(results)
+
+        for winner_id, loser_id in results:
+            tournament.wins[winner_id] += 1
+            tournament.losses[loser_id] += 1
+        for bye in byes:
+            matches.append({'meal_1': bye.id, 'meal_2': None, 'winner': None})
+            if bye_is_win:
+                tournament.wins[bye.id] += 1
+        tournament.rounds.append(matches)
+        logger.info("Tournament %d finished round %d of %d", tournament.id, len(tournament.rounds), tournament.num_rounds)
+        return winners
+
+    def _evict_finished(self) -> None:
+        finished = [tournament_id for tournament_id, tournament in self._tournaments.items()
+                    if tournament.status in ("completed", "failed")]
+        for tournament_id in finished[:max(0, len(finished) - MAX_FINISHED_TOURNAMENTS)]:
+            del self._tournaments[tournament_id]
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from meal_max.models.batch_scoring import (
+    MealColumns,
+    battle_outcomes,
+    battle_scores,
+    encode_difficulty,
+    round_robin_pairings,
+    simulate_battles
+)
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+
+
+@pytest.fixture
+def sample_meals():
+    """Fixture providing meals of every difficulty."""
+    return [
+        Meal(id=1, meal="Meal 1", cuisine="Italian", price=15.0, difficulty="HIGH"),
+        Meal(id=2, meal="Meal 2", cuisine="Mexican", price=10.0, difficulty="MED"),
+        Meal(id=3, meal="Meal 3", cuisine="Thai", price=12.5, difficulty="LOW"),
+    ]
+
+
+##################################################
+# Scoring Test Cases
+##################################################
+
+def test_battle_scores_match_battle_model(sample_meals):
+    """Test that batch scores are identical to BattleModel.get_battle_score."""
+    columns = MealColumns.from_meals(sample_meals)
+
+    scores = battle_scores(columns.price, columns.cuisine_length, columns.difficulty_code)
+
+    expected = [BattleModel().get_battle_score(meal) for meal in sample_meals]
+    assert scores.tolist() == expected
+
+def test_encode_difficulty_invalid():
+    """Test error for an unknown difficulty."""
+    with pytest.raises(ValueError, match="Invalid difficulty level: EASY"):
+        encode_difficulty(["HIGH", "EASY"])
+
+def test_battle_outcomes_match_battle_model(sample_meals, mocker):
+    """Test that batch outcomes agree with BattleModel.fight for the same random numbers."""
+    columns = MealColumns.from_meals(sample_meals)
+    scores = battle_scores(columns.price, columns.cuisine_length, columns.difficulty_code)
+    meal_1, meal_2 = round_robin_pairings(len(sample_meals))
+    random_numbers = np.array([0.05, 0.5, 0.95])
+
+    outcomes = battle_outcomes(scores, meal_1, meal_2, random_numbers)
+
+    mocker.patch("meal_max.models.battle_model.get_random", side_effect=random_numbers.tolist())
+    battle_model = BattleModel()
+    for i, j, meal_1_won in zip(meal_1, meal_2, outcomes):
+        winner, _ = battle_model.fight(sample_meals[i], sample_meals[j])
+        assert (winner is sample_meals[i]) == meal_1_won
+
+
+##################################################
+# Simulation Test Cases
+##################################################
+
+def test_simulate_battles_totals(sample_meals):
+    """Test the per-meal battle and win totals."""
+    columns = MealColumns.from_meals(sample_meals)
+    meal_1, meal_2 = round_robin_pairings(3)
+
+    # A random number of 1 means the second meal always wins
+    result = simulate_battles(columns, meal_1, meal_2, random_numbers=np.ones(3))
+
+    assert result.battles.tolist() == [2, 2, 2]
+    assert result.wins.tolist() == [0, 1, 2]
+    assert result.win_pct().tolist() == [0.0, 0.5, 1.0]
+
+def test_simulate_battles_is_repeatable_with_seed(sample_meals):
+    """Test that a seeded generator gives the same simulation twice."""
+    columns = MealColumns.from_meals(sample_meals)
+    meal_1 = np.zeros(1000, dtype=np.int64)
+    meal_2 = np.ones(1000, dtype=np.int64)
+
+    first = simulate_battles(columns, meal_1, meal_2, rng=np.random.default_rng(7))
+    second = simulate_battles(columns, meal_1, meal_2, rng=np.random.default_rng(7))
+
+    assert np.array_equal(first.meal_1_wins, second.meal_1_wins)
+
+def test_simulate_battles_mismatched_pairings(sample_meals):
+    """Test error when the pairing arrays don't line up."""
+    columns = MealColumns.from_meals(sample_meals)
+    with pytest.raises(ValueError, match="same length"):
+        simulate_battles(columns, np.array([0, 1]), np.array([2]))
+    with pytest.raises(ValueError, match="one entry per battle"):
+        simulate_battles(columns, np.array([0]), np.array([2]), random_numbers=np.ones(2))
@@ -50,6 +50,18 @@ def test_prep_combatant_exceeds_limit(battle_model, sample_meal_1, sample_meal_2
         battle_model.prep_combatant(sample_meal_1)
 
 
+def test_prep_combatant_skips_disabled_logging(battle_model, sample_meal_1, mocker):
+    """Test that the combatants list isn't built for logging when INFO is disabled."""
+    mocker.patch("meal_max.models.battle_model.logger.isEnabledFor", return_value=False)
+    mock_info = mocker.patch("meal_max.models.battle_model.logger.info")
+
+    battle_model.prep_combatant(sample_meal_1)
+
+    messages = [call.args[0] for call in mock_info.call_args_list]
+    assert "Current combatants list: %s" not in messages
+    assert len(battle_model.combatants) == 1
+
+
 def test_clear_combatants(battle_model, sample_meal_1):
     """Test clearing all combatants from the battle model."""
     battle_model.prep_combatant(sample_meal_1)
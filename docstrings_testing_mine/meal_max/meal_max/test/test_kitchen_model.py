@@ -6,13 +6,19 @@ import sqlite3
 
 import pytest 
 
+from meal_max.models.leaderboard_cache import LeaderboardCache
+from meal_max.utils.pagination import decode_cursor, encode_cursor
 from meal_max.models.kitchen_model import (
     Meal,
     create_meal,
+    create_meals,
     delete_meal,
     get_leaderboard,
+    get_leaderboard_page,
     get_meal_by_id,
     get_meal_by_name,
+    rebuild_leaderboard_cache,
+    record_battle_results,
     update_meal_stats
 )
 
@@ -92,6 +98,51 @@ def test_create_meal_invalid_difficulty():
     with pytest.raises(ValueError, match="Invalid difficulty level: IMPOSSIBLE. Must be 'LOW', 'MED', or 'HIGH'."):
         create_meal(meal='Meal 1', cuisine='Cuisine 1', price=5.00, difficulty='IMPOSSIBLE')
 
+def test_create_meals(mock_cursor):
+    """Test creating several meals with one executemany, reporting each one."""
+
+    mock_cursor.fetchall.return_value = [('Meal B',)]
+
+    results = create_meals([
+        {'meal': 'Meal A', 'cuisine': 'Cuisine A', 'price': 10.0, 'difficulty': 'LOW'},
+        {'meal': 'Meal B', 'cuisine': 'Cuisine B', 'price': 12.0, 'difficulty': 'MED'},
+        {'meal': 'Meal C', 'cuisine': 'Cuisine C', 'price': -1, 'difficulty': 'HIGH'},
+        {'meal': 'Meal D', 'cuisine': 'Cuisine D', 'price': 8.5, 'difficulty': 'HIGH'},
+    ])
+
+    assert [result['status'] for result in results] == ['created', 'error', 'error', 'created']
+    assert results[1]['error'] == "Meal with name 'Meal B' already exists"
+    assert "Invalid price: -1" in results[2]['error']
+
+    mock_cursor.execute.assert_any_call("BEGIN IMMEDIATE")
+    query, rows = mock_cursor.executemany.call_args[0]
+    assert normalize_whitespace(query) == "INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, ?, ?, ?)"
+    assert rows == [('Meal A', 'Cuisine A', 10.0, 'LOW'), ('Meal D', 'Cuisine D', 8.5, 'HIGH')]
+
+def test_create_meals_upsert(mock_cursor):
+    """Test that upsert mode updates existing meals instead of reporting them."""
+
+    mock_cursor.fetchall.return_value = [('Meal B',)]
+
+    results = create_meals([
+        {'meal': 'Meal A', 'cuisine': 'Cuisine A', 'price': 10.0, 'difficulty': 'LOW'},
+        {'meal': 'Meal B', 'cuisine': 'Cuisine B', 'price': 12.0, 'difficulty': 'MED'},
+    ], upsert=True)
+
+    assert [result['status'] for result in results] == ['created', 'updated']
+
+    query, rows = mock_cursor.executemany.call_args[0]
+    assert "ON CONFLICT(meal) DO UPDATE SET" in query
+    assert len(rows) == 2
+
+def test_create_meals_all_invalid(mock_cursor):
+    """Test that a batch with nothing valid never touches the database."""
+
+    results = create_meals([None, {'meal': 'Meal A', 'cuisine': 'Cuisine A', 'price': 10.0, 'difficulty': 'EASY'}])
+
+    assert [result['status'] for result in results] == ['error', 'error']
+    mock_cursor.execute.assert_not_called()
+
 def test_delete_meal(mock_cursor):
     """Test soft deleting a meal from the catalog by meal ID."""
 
@@ -169,7 +220,7 @@ def test_get_leaderboard(mock_cursor):
 
     # Ensure the SQL query was executed correctly
     expected_query = normalize_whitespace("""
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct 
+        SELECT id, meal, cuisine, price, difficulty, battles, wins, win_pct
         FROM meals 
         WHERE deleted = false AND battles > 0 ORDER BY wins DESC
     """)
@@ -323,4 +374,131 @@ def test_update_meal_stats_deleted_meal(mock_cursor):
 
     # Ensure that no SQL query for updating meal stats was executed
     mock_cursor.execute.assert_called_once_with("SELECT deleted FROM meals WHERE id = ?", (1,))
-    
\ No newline at end of file
+    
+def test_get_leaderboard_from_cache(mock_cursor, mocker):
+    """Test that the leaderboard is built once and then served from the cache."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", True)
+    mocker.patch("meal_max.models.kitchen_model.leaderboard_cache", LeaderboardCache())
+
+    mock_cursor.fetchall.return_value = [
+        (1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 3, 1),
+        (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 2, 2),
+    ]
+
+    assert [meal['id'] for meal in get_leaderboard("wins")] == [2, 1]
+    assert [meal['id'] for meal in get_leaderboard("win_pct")] == [2, 1]
+
+    # Only the cache rebuild touched the database
+    assert mock_cursor.execute.call_count == 1
+
+def test_update_meal_stats_updates_cache(mock_cursor, mocker):
+    """Test that update_meal_stats moves the meal in a loaded cache."""
+    cache = LeaderboardCache()
+    cache.load([(1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 1, 1), (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 1, 0)])
+    mocker.patch("meal_max.models.kitchen_model.leaderboard_cache", cache)
+
+    mock_cursor.fetchone.side_effect = [[False], (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 3, 2)]
+
+    update_meal_stats(2, 'win')
+
+    assert [meal['id'] for meal in cache.top("wins")] == [2, 1]
+
+def test_rebuild_leaderboard_cache_racing_update(mock_cursor, mocker):
+    """Test that an update committed after a rebuild read its rows is not undone by the rebuild."""
+    cache = LeaderboardCache()
+    cache.load([(1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 1, 1), (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 1, 0)])
+    mocker.patch("meal_max.models.kitchen_model.leaderboard_cache", cache)
+    snapshot = [(1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 1, 1), (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 1, 0)]
+
+    def update_then_return_snapshot():
+        # Meal 2 wins twice between the rebuild's read and its load
+        mock_cursor.fetchone.side_effect = [[False], (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 3, 2)]
+        update_meal_stats(2, 'win')
+        return snapshot
+
+    mock_cursor.fetchall.side_effect = update_then_return_snapshot
+
+    rebuild_leaderboard_cache()
+
+    assert [(meal['id'], meal['battles']) for meal in cache.top("wins")] == [(2, 3), (1, 1)]
+
+def test_get_leaderboard_page(mock_cursor):
+    """Test that a page uses a keyset condition and returns a cursor for the next page."""
+    mock_cursor.fetchall.return_value = [
+        ('Meal 2', 8, 2),
+        ('Meal 5', 8, 5),
+        ('Meal 1', 7, 1),
+    ]
+
+    after = encode_cursor(["wins", 9, 4])
+    leaderboard, next_cursor = get_leaderboard_page("wins", limit=2, after=after, fields="meal")
+
+    assert leaderboard == [{'meal': 'Meal 2'}, {'meal': 'Meal 5'}]
+    assert decode_cursor(next_cursor) == ["wins", 8, 5]
+
+    expected_query = normalize_whitespace("""
+        SELECT meal, wins, id FROM meals WHERE deleted = false AND battles > 0
+        AND (wins < ? OR (wins = ? AND id > ?))
+        ORDER BY wins DESC, id ASC LIMIT ?
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [9, 9, 4, 3]
+
+def test_get_leaderboard_page_last_page(mock_cursor):
+    """Test that the last page has no next cursor."""
+    mock_cursor.fetchall.return_value = [(1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 4, 3, 0.75)]
+
+    _, next_cursor = get_leaderboard_page("win_pct", limit=2)
+
+    assert next_cursor is None
+
+def test_get_leaderboard_page_invalid_arguments(mock_cursor):
+    """Test errors for bad limits, fields and cursors."""
+    with pytest.raises(ValueError, match="Invalid limit"):
+        get_leaderboard_page("wins", limit=0)
+    with pytest.raises(ValueError, match="Invalid fields: calories"):
+        get_leaderboard_page("wins", fields=["meal", "calories"])
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_leaderboard_page("wins", after="not a cursor")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        # Cursors from one sort order can't be used with another
+        get_leaderboard_page("win_pct", after=encode_cursor(["wins", 3, 1]))
+
+    mock_cursor.execute.assert_not_called()
+
+def test_get_leaderboard_page_from_cache(mock_cursor, mocker):
+    """Test paging through the cached leaderboard."""
+    cache = LeaderboardCache()
+    cache.load([(i, f'Meal {i}', 'Cuisine', 5.00, 'LOW', 10, i % 3) for i in range(1, 6)])
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", True)
+    mocker.patch("meal_max.models.kitchen_model.leaderboard_cache", cache)
+
+    pages = []
+    after = None
+    while True:
+        page, after = get_leaderboard_page("win_pct", limit=2, after=after, fields=["id"])
+        pages.append([meal['id'] for meal in page])
+        if after is None:
+            break
+
+    assert pages == [[2, 5], [1, 4], [3]]
+    mock_cursor.execute.assert_not_called()
+
+def test_record_battle_results(mock_cursor):
+    """Test that a round of battles is written as one increment per meal."""
+    mock_cursor.fetchall.return_value = [(1, False), (2, False), (3, False)]
+
+    record_battle_results([(1, 2), (1, 3), (3, 2)])
+
+    query, params = mock_cursor.executemany.call_args[0]
+    assert normalize_whitespace(query) == "UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ?"
+    assert sorted(params, key=lambda row: row[2]) == [(2, 2, 1), (2, 0, 2), (2, 1, 3)]
+
+def test_record_battle_results_deleted_meal(mock_cursor):
+    """Test that a deleted meal aborts the whole round."""
+    mock_cursor.fetchall.return_value = [(1, False), (2, True)]
+
+    with pytest.raises(ValueError, match="Meal with ID 2 has been deleted"):
+        record_battle_results([(1, 2)])
+
+    mock_cursor.executemany.assert_not_called()
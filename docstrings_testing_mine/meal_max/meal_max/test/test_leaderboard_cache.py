@@ -0,0 +1,106 @@
+import pytest
+
+from meal_max.models.leaderboard_cache import LeaderboardCache
+
+
+@pytest.fixture
+def cache():
+    """Fixture providing a cache loaded with three meals."""
+    cache = LeaderboardCache()
+    cache.load([
+        (1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 3, 3),
+        (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 4, 2),
+        (3, 'Meal 3', 'Cuisine 3', 15.00, 'HIGH', 10, 4),
+    ])
+    return cache
+
+
+##################################################
+# Leaderboard Cache Test Cases
+##################################################
+
+def test_top_by_wins(cache):
+    """Test reading the leaderboard sorted by wins."""
+    assert [meal['id'] for meal in cache.top("wins")] == [3, 1, 2]
+
+def test_top_by_win_pct(cache):
+    """Test reading the leaderboard sorted by win percentage."""
+    leaderboard = cache.top("win_pct")
+    assert [meal['id'] for meal in leaderboard] == [1, 2, 3]
+    assert leaderboard[0] == {'id': 1, 'meal': 'Meal 1', 'cuisine': 'Cuisine 1', 'price': 5.0,
+                              'difficulty': 'LOW', 'battles': 3, 'wins': 3, 'win_pct': 100.0}
+
+def test_top_limit(cache):
+    """Test reading only the top k meals."""
+    assert [meal['id'] for meal in cache.top("wins", limit=2)] == [3, 1]
+
+def test_top_after(cache):
+    """Test resuming the leaderboard after a (sort value, id) key."""
+    assert [meal['id'] for meal in cache.top("wins", after=(4, 3))] == [1, 2]
+    assert [meal['id'] for meal in cache.top("wins", limit=1, after=(2, 1))] == [2]
+
+def test_top_invalid_sort_by(cache):
+    """Test error when sorting by an unknown field."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter: price"):
+        cache.top("price")
+
+def test_top_racing_invalidate(cache):
+    """Test that a read which waits for the lock while the cache is emptied sees the empty cache."""
+    lock = cache._lock
+
+    class InvalidateFirst:
+        # Lets invalidate() win the race for the lock against top()
+        def __enter__(self):
+            cache._lock = lock
+            cache.invalidate()
+            return lock.__enter__()
+
+        def __exit__(self, *exc_info):
+            return lock.__exit__(*exc_info)
+
+    cache._lock = InvalidateFirst()
+    assert cache.top("wins") == []
+
+def test_upsert_moves_meal(cache):
+    """Test that updated stats move a meal to its new rank."""
+    cache.upsert((2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 8, 6))
+    assert [meal['id'] for meal in cache.top("wins")] == [2, 3, 1]
+
+def test_upsert_adds_first_battle(cache):
+    """Test that a meal joins the leaderboard after its first battle."""
+    cache.upsert((4, 'Meal 4', 'Cuisine 4', 20.00, 'LOW', 1, 1))
+    assert [meal['id'] for meal in cache.top("win_pct")] == [1, 4, 2, 3]
+
+def test_upsert_ignores_stale_rows(cache):
+    """Test that an older row never overwrites newer stats."""
+    cache.upsert((3, 'Meal 3', 'Cuisine 3', 15.00, 'HIGH', 9, 0))
+    assert cache.top("wins")[0]['wins'] == 4
+
+def test_discard(cache):
+    """Test that deleted meals leave the leaderboard."""
+    cache.discard(3)
+    cache.discard(99)
+    assert [meal['id'] for meal in cache.top("wins")] == [1, 2]
+
+def test_unloaded_cache_ignores_changes():
+    """Test that changes arriving while the cache is unloaded don't leave partial contents."""
+    cache = LeaderboardCache()
+    cache.upsert((1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 3, 3))
+    cache.discard(1)
+
+    assert not cache.loaded
+    cache.load([])
+    assert cache.top("wins") == []
+
+def test_load_keeps_newer_meals(cache):
+    """Test that a reload from rows read before an upsert keeps the upserted stats."""
+    cache.upsert((2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 8, 6))
+    cache.upsert((4, 'Meal 4', 'Cuisine 4', 20.00, 'LOW', 1, 1))
+
+    cache.load([
+        (1, 'Meal 1', 'Cuisine 1', 5.00, 'LOW', 4, 3),
+        (2, 'Meal 2', 'Cuisine 2', 10.00, 'MED', 4, 2),
+        (3, 'Meal 3', 'Cuisine 3', 15.00, 'HIGH', 10, 4),
+    ])
+
+    assert [(meal['id'], meal['battles']) for meal in cache.top("wins")] == [(2, 8), (3, 10), (1, 4), (4, 1)]
@@ -0,0 +1,264 @@
+import json
+import sys
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from meal_max.utils import logger as logger_module
+from meal_max.utils.logger import (
+    JsonFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+    TextFormatter,
+    configure_logger,
+    get_log_level,
+    get_loop_logger,
+    parse_level,
+    parse_level_overrides,
+    setup_logging,
+    stop_log_listener
+)
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch):
+    """Fixture that lets setup_logging run again, then puts the process's logging back."""
+    root = logging.getLogger()
+    root_level = root.level
+    original_handler = logger_module._handler
+    root.removeHandler(original_handler)
+    monkeypatch.setattr(logger_module, "_configured", False)
+    monkeypatch.setattr(logger_module, "_handler", None)
+    monkeypatch.setattr(logger_module, "_listener", None)
+    yield
+    stop_log_listener()
+    root.removeHandler(logger_module._handler)
+    root.addHandler(original_handler)
+    root.setLevel(root_level)
+
+
+def our_handlers():
+    return [handler for handler in logging.getLogger().handlers if handler is logger_module._handler]
+
+
+##################################################
+# Level Parsing Test Cases
+##################################################
+
+
+@pytest.mark.parametrize("name, level", [
+    ("WARNING", logging.WARNING),
+    ("info", logging.INFO),
+    (" error ", logging.ERROR),
+    ("LOUD", None),
+])
+def test_parse_level(name, level):
+    """Test turning level names into levels."""
+    assert parse_level(name) == level
+
+
+def test_get_log_level_falls_back_to_debug(monkeypatch):
+    """Test that an unknown LOG_LEVEL means DEBUG."""
+    monkeypatch.setattr(logger_module, "LOG_LEVEL", "LOUD")
+    assert get_log_level() == logging.DEBUG
+
+
+def test_parse_level_overrides():
+    """Test parsing per-logger levels, skipping entries that don't parse."""
+    overrides = parse_level_overrides("werkzeug=WARNING, meal_max.models=debug,broken,other=LOUD,")
+    assert overrides == {"werkzeug": logging.WARNING, "meal_max.models": logging.DEBUG}
+
+
+##################################################
+# Setup Test Cases
+##################################################
+
+
+def test_setup_logging_is_idempotent(fresh_logging):
+    """Test that repeated setup and configure_logger calls leave one handler in place."""
+    setup_logging()
+    setup_logging()
+    test_logger = logging.getLogger("meal_max.test.idempotent")
+    configure_logger(test_logger)
+    configure_logger(test_logger)
+
+    assert len(our_handlers()) == 1
+    assert test_logger.handlers == []
+
+
+def test_setup_logging_force_replaces_handler(fresh_logging):
+    """Test that forcing setup swaps the handler instead of adding another."""
+    setup_logging()
+    first_handler = logger_module._handler
+    setup_logging(force=True)
+
+    assert logger_module._handler is not first_handler
+    assert first_handler not in logging.getLogger().handlers
+    assert len(our_handlers()) == 1
+
+
+def test_setup_logging_level_overrides(fresh_logging):
+    """Test that overridden loggers ignore the root level."""
+    setup_logging(level=logging.WARNING, overrides={"meal_max.test.noisy": logging.DEBUG})
+
+    assert logging.getLogger("meal_max.test.noisy").isEnabledFor(logging.DEBUG)
+    assert not logging.getLogger("meal_max.test.quiet").isEnabledFor(logging.INFO)
+
+
+def test_each_record_written_once(monkeypatch, fresh_logging, capsys):
+    """Test that a record is written once however many times logging was configured."""
+    monkeypatch.setattr(logger_module, "LOG_ASYNC", False)
+    test_logger = logging.getLogger("meal_max.test.once")
+    for _ in range(3):
+        configure_logger(test_logger)
+
+    test_logger.info("Only once")
+
+    assert capsys.readouterr().err.count("Only once") == 1
+
+
+##################################################
+# Output Test Cases
+##################################################
+
+
+def test_json_output(monkeypatch, fresh_logging, capsys):
+    """Test writing records as JSON lines, with extra fields."""
+    monkeypatch.setattr(logger_module, "LOG_ASYNC", False)
+    setup_logging(fmt="json")
+
+    logging.getLogger("meal_max.test.json").warning("Meal %s deleted", "Pasta", extra={'meal_id': 3})
+
+    entry = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert entry['level'] == "WARNING"
+    assert entry['logger'] == "meal_max.test.json"
+    assert entry['message'] == "Meal Pasta deleted"
+    assert entry['meal_id'] == 3
+    assert "time" in entry
+
+
+def test_json_formatter_includes_traceback():
+    """Test that exceptions are formatted into the JSON entry."""
+    try:
+        raise ValueError("Boom")
+    except ValueError:
+        record = logging.LogRecord("meal_max.test", logging.ERROR, __file__, 1, "Failed", (), None)
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: Boom" in entry['exc_info']
+
+
+def test_async_handler_writes_on_listener_thread(monkeypatch, fresh_logging, capsys):
+    """Test that records go through the queue and reach stderr once the listener is stopped."""
+    monkeypatch.setattr(logger_module, "LOG_ASYNC", True)
+    setup_logging(fmt="text")
+    assert isinstance(logger_module._handler, QueueHandler)
+
+    logging.getLogger("meal_max.test.async").info("Queued %s", "message")
+    stop_log_listener()
+
+    assert "meal_max.test.async - INFO - Queued message" in capsys.readouterr().err
+
+
+##################################################
+# Loop Logging Test Cases
+##################################################
+
+
+def make_record(msg, level=logging.INFO, name="meal_max.test.loop"):
+    return logging.LogRecord(name, level, __file__, 1, msg, (), None)
+
+
+def test_sampling_filter():
+    """Test letting through one in every N records per message template."""
+    sampling = SamplingFilter(3)
+
+    passed = [sampling.filter(make_record("Battle %d")) for _ in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+    # Each template is counted on its own
+    assert sampling.filter(make_record("Score %d"))
+
+
+def test_sampling_filter_reports_suppressed():
+    """Test that a sampled record carries the number of records dropped before it."""
+    sampling = SamplingFilter(3)
+    records = [make_record("Battle %d") for _ in range(4)]
+    for record in records:
+        sampling.filter(record)
+
+    assert not hasattr(records[0], "suppressed")
+    assert records[3].suppressed == 2
+
+
+def test_rate_limit_filter():
+    """Test letting through at most N records per template per second."""
+    now = [100.0]
+    rate_limit = RateLimitFilter(2, clock=lambda: now[0])
+
+    passed = [rate_limit.filter(make_record("Battle %d")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    now[0] += 1.0
+    record = make_record("Battle %d")
+    assert rate_limit.filter(record)
+    assert record.suppressed == 3
+
+
+def test_sampling_and_rate_limit_add_suppressed():
+    """Test that with both filters on, a record counts every record dropped by either of them."""
+    now = [100.0]
+    sampling = SamplingFilter(2)
+    rate_limit = RateLimitFilter(1, clock=lambda: now[0])
+    # Like a logger, stop at the first filter that drops the record
+    records = [make_record("Battle %d") for _ in range(7)]
+    passed = []
+    for index, record in enumerate(records):
+        if index == 5:
+            now[0] += 1.0
+        passed.append(sampling.filter(record) and rate_limit.filter(record))
+
+    assert passed == [True, False, False, False, False, False, True]
+    assert records[6].suppressed == 5
+
+
+def test_text_formatter_shows_suppressed():
+    """Test that the text format notes how many records were dropped before this one."""
+    formatter = TextFormatter("%(levelname)s - %(message)s")
+    record = make_record("Battle %d")
+    record.args = (7,)
+    assert formatter.format(record) == "INFO - Battle 7"
+
+    record.suppressed = 4
+    assert formatter.format(record) == "INFO - Battle 7 (4 suppressed)"
+
+
+def test_filters_never_drop_warnings():
+    """Test that warnings and errors always pass."""
+    sampling = SamplingFilter(100)
+    rate_limit = RateLimitFilter(1, clock=lambda: 0.0)
+    for _ in range(5):
+        assert sampling.filter(make_record("Failed %d", logging.WARNING))
+        assert rate_limit.filter(make_record("Failed %d", logging.ERROR))
+
+
+@pytest.mark.parametrize("filter_class", [SamplingFilter, RateLimitFilter])
+def test_filters_reject_invalid_rates(filter_class):
+    """Test that rates must be positive."""
+    with pytest.raises(ValueError):
+        filter_class(0)
+
+
+def test_get_loop_logger(monkeypatch):
+    """Test that the loop logger is a filtered child logger, set up once."""
+    monkeypatch.setattr(logger_module, "LOG_LOOP_SAMPLE_RATE", 5)
+    monkeypatch.setattr(logger_module, "LOG_LOOP_RATE_LIMIT", 20)
+
+    loop_logger = get_loop_logger("meal_max.test.looping")
+    get_loop_logger("meal_max.test.looping")
+
+    assert loop_logger.name == "meal_max.test.looping.loop"
+    assert [type(f) for f in loop_logger.filters] == [SamplingFilter, RateLimitFilter]
+    assert loop_logger.filters[0].rate == 5
+    assert loop_logger.filters[1].max_per_second == 20
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from meal_max.models import matchup_analytics
+from meal_max.models.batch_scoring import MealColumns, simulate_battles
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.matchup_analytics import (
+    RANDOM_ORG_VALUES,
+    compute_matchup_matrix,
+    exact_win_probabilities,
+    get_matchup_matrix,
+    monte_carlo_win_probabilities
+)
+
+
+@pytest.fixture
+def columns():
+    """Fixture providing three meals whose scores are 103, 68 and 31."""
+    return MealColumns.from_meals([
+        Meal(id=1, meal="Meal 1", cuisine="Italian", price=15.0, difficulty="MED"),
+        Meal(id=2, meal="Meal 2", cuisine="Mexican", price=10.0, difficulty="MED"),
+        Meal(id=4, meal="Meal 4", cuisine="Thai", price=8.5, difficulty="LOW"),
+    ])
+
+@pytest.fixture(autouse=True)
+def clear_cache(mocker):
+    """Start every test with an empty matrix cache."""
+    mocker.patch("meal_max.models.matchup_analytics._cache", None)
+
+
+##################################################
+# Probability Test Cases
+##################################################
+
+def test_exact_win_probabilities(columns):
+    """Test the exact probabilities against every possible random.org draw."""
+    matrix = compute_matchup_matrix(columns)
+
+    # Deltas are 0.35, 0.72 and 0.37; meal 1 wins on the 35 draws 0.00..0.34, and so on
+    assert matrix.to_dict()['probabilities'] == [
+        [None, 0.35, 0.72],
+        [0.35, None, 0.37],
+        [0.72, 0.37, None],
+    ]
+
+def test_exact_win_probabilities_match_battle_model(columns, mocker):
+    """Test that the exact probability is the share of random.org draws BattleModel.fight gives to meal 1."""
+    meals = [Meal(id=1, meal="Meal 1", cuisine="Italian", price=15.0, difficulty="MED"),
+             Meal(id=2, meal="Meal 2", cuisine="Mexican", price=10.0, difficulty="MED")]
+    mocker.patch("meal_max.models.battle_model.get_random", side_effect=RANDOM_ORG_VALUES.tolist())
+
+    battle_model = BattleModel()
+    wins = sum(battle_model.fight(meals[0], meals[1])[0] is meals[0] for _ in RANDOM_ORG_VALUES)
+
+    scores = np.array([battle_model.get_battle_score(meal) for meal in meals])
+    assert exact_win_probabilities(scores)[0, 1] == wins / len(RANDOM_ORG_VALUES)
+
+def test_monte_carlo_converges_to_exact(columns):
+    """Test that a large Monte Carlo estimate is close to the exact answer."""
+    scores = np.array([103.0, 68.0, 31.0])
+
+    estimate = monte_carlo_win_probabilities(scores, trials=20000, rng=np.random.default_rng(3), chunk_size=5000)
+
+    exact = exact_win_probabilities(scores)
+    off_diagonal = ~np.eye(3, dtype=bool)
+    assert np.allclose(estimate[off_diagonal], exact[off_diagonal], atol=0.02)
+
+def test_simulate_battles_agrees_with_exact():
+    """Test that simulated battles draw like random.org, for a delta between two-decimal values."""
+    columns = MealColumns.from_meals([
+        Meal(id=1, meal="Meal 1", cuisine="Italian", price=14.5, difficulty="LOW"),
+        Meal(id=2, meal="Meal 2", cuisine="Thai", price=10.0, difficulty="LOW"),
+    ])
+    meal_1 = np.zeros(1_000_000, dtype=np.int64)
+    meal_2 = np.ones(1_000_000, dtype=np.int64)
+
+    result = simulate_battles(columns, meal_1, meal_2, rng=np.random.default_rng(5))
+
+    # The delta is 0.615: meal 1 wins on the 62 draws 0.00..0.61, not on a continuous 61.5%
+    exact = compute_matchup_matrix(columns).probabilities[0, 1]
+    assert exact == 0.62
+    assert abs(result.meal_1_wins.mean() - exact) < 0.002
+
+def test_to_dict_subset(columns):
+    """Test restricting the matrix to some meals, and error for unknown meals."""
+    matrix = compute_matchup_matrix(columns)
+
+    assert matrix.to_dict([4, 1]) == {
+        'meal_ids': [4, 1], 'method': 'exact', 'trials': None, 'probabilities': [[None, 0.72], [0.72, None]]
+    }
+    with pytest.raises(ValueError, match="Meals not found: 3"):
+        matrix.to_dict([1, 3])
+
+
+##################################################
+# Cache Test Cases
+##################################################
+
+def test_matrix_cached_until_catalog_changes(columns, mocker):
+    """Test that the matrix is reused until the catalog version changes."""
+    mock_load = mocker.patch("meal_max.models.matchup_analytics.load_meal_columns", return_value=columns)
+    mock_version = mocker.patch("meal_max.models.matchup_analytics.get_catalog_version", return_value=1)
+
+    first = get_matchup_matrix()
+    assert get_matchup_matrix() is first
+    assert mock_load.call_count == 1
+
+    mock_version.return_value = 2
+    assert get_matchup_matrix() is not first
+    assert mock_load.call_count == 2
+
+def test_unseeded_monte_carlo_not_cached(columns, mocker):
+    """Test that only repeatable estimates are cached."""
+    mock_load = mocker.patch("meal_max.models.matchup_analytics.load_meal_columns", return_value=columns)
+    mocker.patch("meal_max.models.matchup_analytics.get_catalog_version", return_value=1)
+
+    get_matchup_matrix("monte_carlo", trials=10)
+    get_matchup_matrix("monte_carlo", trials=10)
+    seeded = get_matchup_matrix("monte_carlo", trials=10, seed=1)
+    assert get_matchup_matrix("monte_carlo", trials=10, seed=1) is seeded
+    assert get_matchup_matrix("monte_carlo", trials=10, seed=2) is not seeded
+    assert mock_load.call_count == 4
+
+def test_create_and_delete_meal_bump_catalog_version(mocker):
+    """Test that changes to the meals invalidate cached matrices."""
+    from meal_max.models import kitchen_model
+    mock_conn = mocker.MagicMock()
+    mock_conn.cursor.return_value.fetchone.return_value = [False]
+    mocker.patch("meal_max.models.kitchen_model.get_db_connection").return_value.__enter__.return_value = mock_conn
+
+    version = kitchen_model.get_catalog_version()
+    kitchen_model.create_meal("Meal 1", "Italian", 10.0, "LOW")
+    kitchen_model.delete_meal(1)
+    assert kitchen_model.get_catalog_version() == version + 2
+
+
+##################################################
+# Limit Test Cases
+##################################################
+
+def test_invalid_arguments(columns, mocker):
+    """Test errors for bad methods, trials and oversized requests."""
+    with pytest.raises(ValueError, match="Invalid method"):
+        get_matchup_matrix("guess")
+    with pytest.raises(ValueError, match="Invalid trials"):
+        get_matchup_matrix("monte_carlo", trials=0)
+
+    mocker.patch("meal_max.models.matchup_analytics.MATCHUP_MAX_MEALS", 2)
+    with pytest.raises(ValueError, match="Too many meals"):
+        compute_matchup_matrix(columns)
+
+    mocker.patch("meal_max.models.matchup_analytics.MATCHUP_MAX_MEALS", 10)
+    mocker.patch("meal_max.models.matchup_analytics.MATCHUP_MAX_SIMULATED_BATTLES", 100)
+    with pytest.raises(ValueError, match="Too many battles to simulate"):
+        compute_matchup_matrix(columns, "monte_carlo", trials=50)
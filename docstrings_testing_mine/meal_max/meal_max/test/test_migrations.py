@@ -0,0 +1,94 @@
+import os
+import sqlite3
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations, list_migrations
+
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "sql", "migrations")
+
+# The schema created by the old create_meal_table.sql, before migrations existed
+LEGACY_SCHEMA = """
+    CREATE TABLE meals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal TEXT NOT NULL UNIQUE,
+        cuisine TEXT NOT NULL,
+        price REAL NOT NULL,
+        difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+        battles INTEGER DEFAULT 0,
+        wins INTEGER DEFAULT 0,
+        deleted BOOLEAN DEFAULT FALSE
+    );
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    """Point sql_utils at a fresh database file and reset the shared pool."""
+    path = str(tmp_path / "meal_max.db")
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    yield path
+    sql_utils.close_connection_pool()
+
+
+##################################################
+# Migration Test Cases
+##################################################
+
+def test_list_migrations_in_order():
+    """Test that migrations are listed by version."""
+    versions = [version for version, _ in list_migrations(MIGRATIONS_PATH)]
+    assert versions == sorted(versions)
+    assert versions[0] == 1
+
+def test_apply_migrations_to_new_database(db_path):
+    """Test migrating an empty database to the latest version."""
+    latest = list_migrations(MIGRATIONS_PATH)[-1][0]
+    assert apply_migrations(MIGRATIONS_PATH) == latest
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version;").fetchone()[0] == latest
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_meals_leaderboard_wins", "idx_meals_leaderboard_win_pct"} <= indexes
+    conn.close()
+
+def test_apply_migrations_is_idempotent(db_path):
+    """Test that running the migrations twice changes nothing the second time."""
+    first = apply_migrations(MIGRATIONS_PATH)
+    assert apply_migrations(MIGRATIONS_PATH) == first
+
+def test_apply_migrations_keeps_existing_data(db_path):
+    """Test upgrading a database created before migrations existed."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES ('Sushi', 'Japanese', 15.0, 'HIGH', 4, 3)")
+    conn.commit()
+    conn.close()
+
+    apply_migrations(MIGRATIONS_PATH)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT meal, battles, wins, win_pct FROM meals").fetchall() == [('Sushi', 4, 3, 0.75)]
+    conn.close()
+
+@pytest.mark.parametrize("sort_by, index", [("wins", "idx_meals_leaderboard_wins"), ("win_pct", "idx_meals_leaderboard_win_pct")])
+def test_leaderboard_uses_index(db_path, sort_by, index, mocker):
+    """Test that the leaderboard query reads the partial index instead of sorting."""
+    mocker.patch("meal_max.models.kitchen_model.LEADERBOARD_CACHE", False)
+    apply_migrations(MIGRATIONS_PATH)
+
+    captured = []
+    with sql_utils.get_db_connection() as conn:
+        conn.set_trace_callback(captured.append)
+    kitchen_model.get_leaderboard(sort_by)
+    with sql_utils.get_db_connection() as conn:
+        conn.set_trace_callback(None)
+        query = next(statement for statement in captured if "FROM meals" in statement)
+        plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+
+    assert index in plan, f"Expected the leaderboard to use {index}, got plan: {plan}"
+    assert "TEMP B-TREE" not in plan
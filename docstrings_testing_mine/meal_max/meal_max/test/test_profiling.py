@@ -0,0 +1,111 @@
+import marshal
+
+import pytest
+
+from meal_max.utils import profiling
+from meal_max.utils.profiling import ProfileStore, is_authorized, start_profile, stop_profile, wants_profile
+
+
+@pytest.fixture
+def profiling_on(monkeypatch):
+    """Fixture that turns profiling on with a fresh store and no token."""
+    monkeypatch.setattr(profiling, "PROFILING", True)
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    monkeypatch.setattr(profiling, "profile_store", ProfileStore(3))
+
+
+def busy_work():
+    return sum(i * i for i in range(10000))
+
+
+##################################################
+# Trigger Test Cases
+##################################################
+
+
+@pytest.mark.parametrize("headers, args, expected", [
+    ({"X-Profile": "1"}, {}, True),
+    ({}, {"profile": "true"}, True),
+    ({"X-Profile": "0"}, {}, False),
+    ({}, {}, False),
+])
+def test_wants_profile(profiling_on, headers, args, expected):
+    """Test that requests opt in with a header or a query flag."""
+    assert wants_profile(headers, args) is expected
+
+
+def test_wants_profile_disabled(monkeypatch):
+    """Test that nothing is profiled unless PROFILING is on."""
+    monkeypatch.setattr(profiling, "PROFILING", False)
+    assert not wants_profile({"X-Profile": "1"}, {})
+    assert not is_authorized({}, {})
+
+
+def test_token_required(profiling_on, monkeypatch):
+    """Test that a configured token must be sent to profile or read profiles."""
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "s3cret")
+
+    assert not wants_profile({"X-Profile": "1"}, {})
+    assert wants_profile({"X-Profile": "s3cret"}, {})
+    assert not is_authorized({}, {})
+    assert is_authorized({}, {"profile": "s3cret"})
+
+
+##################################################
+# Profile Test Cases
+##################################################
+
+
+def test_profile_request(profiling_on):
+    """Test profiling a block of work and storing the result."""
+    active = start_profile()
+    busy_work()
+    profile = stop_profile(active, "POST", "/api/battle", 200)
+
+    assert profiling.profile_store.get(profile.id) is profile
+    assert profile.to_dict()['path'] == "/api/battle"
+    assert profile.duration > 0
+    assert "busy_work" in profile.report(sort="tottime", limit=10)
+    # The dump loads as pstats data: a dict keyed by (file, line, function)
+    assert any(key[2] == "busy_work" for key in marshal.loads(profile.dump()))
+
+
+def test_only_one_profile_at_a_time(profiling_on):
+    """Test that a second request isn't profiled while another one is."""
+    active = start_profile()
+    try:
+        assert start_profile() is None
+    finally:
+        stop_profile(active, "GET", "/api/leaderboard", 200)
+
+    # The profiler is free again
+    stop_profile(start_profile(), "GET", "/api/leaderboard", 200)
+
+
+def test_report_rejects_invalid_arguments(profiling_on):
+    """Test error for an unknown sort key or a bad limit."""
+    profile = stop_profile(start_profile(), "GET", "/api/leaderboard", 200)
+    with pytest.raises(ValueError, match="Invalid sort"):
+        profile.report(sort="name")
+    with pytest.raises(ValueError, match="Invalid limit"):
+        profile.report(limit=0)
+
+
+##################################################
+# Store Test Cases
+##################################################
+
+
+def test_store_keeps_recent_profiles(profiling_on):
+    """Test that the store drops the oldest profiles and lists the newest first."""
+    ids = [stop_profile(start_profile(), "GET", f"/api/meal/{i}", 200).id for i in range(5)]
+
+    assert [profile.id for profile in profiling.profile_store.list()] == ids[:1:-1]
+    with pytest.raises(ValueError, match=f"Profile with ID {ids[0]} not found"):
+        profiling.profile_store.get(ids[0])
+
+
+def test_store_rejects_invalid_capacity():
+    """Test error when creating a store that holds nothing."""
+    with pytest.raises(ValueError, match="Invalid profile history"):
+        ProfileStore(0)
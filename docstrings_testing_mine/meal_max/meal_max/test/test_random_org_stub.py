@@ -0,0 +1,106 @@
+import pytest
+
+from meal_max.utils import random_org_stub, random_utils
+from meal_max.utils.random_org_stub import create_app, start_server
+
+
+def fractions(client, query="num=5&dec=2&col=1&format=plain&rnd=new"):
+    return client.get(f"/decimal-fractions/?{query}")
+
+def test_decimal_fractions_format():
+    response = fractions(create_app(seed=1).test_client(), "num=50&dec=2&col=1&format=plain&rnd=new")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 50
+    for line in lines:
+        assert len(line) == 4 and line.startswith("0.")
+        assert 0 <= float(line) < 1
+
+def test_integers_in_range():
+    client = create_app(seed=1).test_client()
+    response = client.get("/integers/?num=200&min=-3&max=3&col=1&base=10&format=plain&rnd=new")
+
+    assert response.status_code == 200
+    values = [int(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(values) == 200
+    assert set(values) == set(range(-3, 4))
+
+def test_columns_are_tab_separated():
+    response = fractions(create_app(seed=1).test_client(), "num=5&dec=1&col=2")
+
+    rows = response.get_data(as_text=True).splitlines()
+    assert [len(row.split("\t")) for row in rows] == [2, 2, 1]
+
+def test_same_seed_same_numbers():
+    first = fractions(create_app(seed=42).test_client()).get_data()
+    second = fractions(create_app(seed=42).test_client()).get_data()
+    other = fractions(create_app(seed=43).test_client()).get_data()
+
+    assert first == second
+    assert first != other
+
+@pytest.mark.parametrize("path", [
+    "/decimal-fractions/?dec=2",
+    "/decimal-fractions/?num=0&dec=2",
+    "/decimal-fractions/?num=10001&dec=2",
+    "/decimal-fractions/?num=1&dec=abc",
+    "/decimal-fractions/?num=1&dec=2&format=html",
+    "/integers/?num=1&min=5&max=1",
+    "/integers/?num=1&min=1&max=10&base=16",
+    "/integers/?num=1&min=1&max=1000000001",
+])
+def test_invalid_arguments(path):
+    response = create_app(seed=1).test_client().get(path)
+
+    assert response.status_code == 400
+    assert response.get_data(as_text=True).startswith("Error: ")
+
+def test_injected_errors():
+    client = create_app(seed=1, error_rate=1).test_client()
+
+    response = fractions(client)
+    assert response.status_code == 503
+    assert response.get_data(as_text=True).startswith("Error: ")
+
+def test_injected_errors_keep_the_numbers_repeatable():
+    # Failed requests don't draw from the generator, so what is served stays the same
+    client = create_app(seed=42, error_rate=0.5).test_client()
+    served = [r.get_data() for r in (fractions(client) for _ in range(20)) if r.status_code == 200]
+
+    expected_client = create_app(seed=42).test_client()
+    assert 0 < len(served) < 20
+    assert served == [fractions(expected_client).get_data() for _ in served]
+
+def test_injected_latency(mocker):
+    mock_sleep = mocker.patch("meal_max.utils.random_org_stub.time.sleep")
+
+    fractions(create_app(seed=1, latency=0.25).test_client())
+    mock_sleep.assert_called_once_with(0.25)
+
+def test_create_app_invalid_settings():
+    with pytest.raises(ValueError, match="Invalid latency"):
+        create_app(latency=-1)
+    with pytest.raises(ValueError, match="Invalid error rate"):
+        create_app(error_rate=1.5)
+
+def test_main_seeds_like_create_app(mocker):
+    mocker.patch("sys.argv", ["random_org_stub", "--seed", "42"])
+    mock_make_server = mocker.patch("meal_max.utils.random_org_stub.make_server")
+
+    random_org_stub.main()
+
+    served = fractions(mock_make_server.call_args[0][2].test_client()).get_data()
+    assert served == fractions(create_app(seed=42).test_client()).get_data()
+
+def test_random_utils_against_stub(mocker):
+    server = start_server(seed=42)
+    try:
+        mocker.patch("meal_max.utils.random_utils.RANDOM_ORG_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+        numbers = random_utils.fetch_random_numbers(10)
+    finally:
+        server.shutdown()
+
+    expected = fractions(create_app(seed=42).test_client(), "num=10&dec=2&col=1&format=plain&rnd=new")
+    assert numbers == [float(line) for line in expected.get_data(as_text=True).split()]
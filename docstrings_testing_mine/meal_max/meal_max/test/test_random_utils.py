@@ -1,7 +1,21 @@
+from contextlib import nullcontext
+import time
+
 import pytest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from requests.exceptions import Timeout, RequestException
-from meal_max.utils.random_utils import get_random
+from meal_max.utils import random_utils
+from meal_max.utils.random_utils import RandomReservoir, fetch_random_numbers, get_random, make_local_source
+
+
+def wait_for(condition, timeout=2.0):
+    # Polls until the refill thread has caught up
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
 
 @patch("requests.get")
 def test_get_random_success(mock_get):
@@ -32,3 +46,107 @@ def test_get_random_request_failure(mock_get):
 
     with pytest.raises(RuntimeError, match="Request to random.org failed: Network error"):
         get_random()
+
+@patch("requests.get")
+def test_fetch_random_numbers(mock_get):
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.text = "0.12\n0.5\n0.99\n"
+
+    assert fetch_random_numbers(3) == [0.12, 0.5, 0.99]
+    assert "num=3" in mock_get.call_args[0][0]
+
+def test_reservoir_pops_prefetched_numbers():
+    fetch = Mock(return_value=[0.1, 0.2, 0.3, 0.4])
+    reservoir = RandomReservoir(capacity=4, low_water=2, fetch=fetch)
+    reservoir.start()
+    try:
+        assert wait_for(lambda: len(reservoir) == 4)
+        assert reservoir.get() == 0.1
+        assert reservoir.get() == 0.2
+        fetch.assert_called_once_with(4)
+    finally:
+        reservoir.stop(timeout=1)
+
+def test_reservoir_refills_below_low_water():
+    fetch = Mock(side_effect=lambda num: [0.5] * num)
+    reservoir = RandomReservoir(capacity=4, low_water=2, fetch=fetch)
+    reservoir.start()
+    try:
+        assert wait_for(lambda: len(reservoir) == 4)
+        for _ in range(3):
+            reservoir.get()
+        # Only the missing numbers are fetched
+        assert wait_for(lambda: fetch.call_count == 2)
+        fetch.assert_called_with(3)
+        assert wait_for(lambda: len(reservoir) == 4)
+    finally:
+        reservoir.stop(timeout=1)
+
+def test_reservoir_empty_uses_fallback():
+    fetch = Mock(side_effect=RuntimeError("Request to random.org failed: down"))
+    reservoir = RandomReservoir(capacity=4, low_water=2, fetch=fetch, fallback=make_local_source("prng", "42"))
+
+    expected = make_local_source("prng", "42")
+    assert [reservoir.get() for _ in range(3)] == [expected() for _ in range(3)]
+    fetch.assert_not_called()
+
+def test_reservoir_empty_without_fallback_fetches_directly():
+    fetch = Mock(return_value=[0.67])
+    reservoir = RandomReservoir(capacity=4, low_water=2, fetch=fetch)
+
+    assert reservoir.get() == 0.67
+    fetch.assert_called_once_with(1)
+
+def test_reservoir_invalid_sizes():
+    with pytest.raises(ValueError, match="Invalid reservoir capacity"):
+        RandomReservoir(capacity=0)
+    with pytest.raises(ValueError, match="Invalid low-water mark"):
+        RandomReservoir(capacity=10, low_water=11)
+
+def test_make_local_source():
+    assert make_local_source("none") is None
+    assert 0 <= make_local_source("secrets")() < 1
+    with pytest.raises(ValueError, match="Invalid random fallback"):
+        make_local_source("dice")
+
+def test_get_random_uses_reservoir(mocker):
+    reservoir = Mock()
+    reservoir.get.return_value = 0.42
+    mocker.patch("meal_max.utils.random_utils._reservoir", reservoir)
+    mock_get = mocker.patch("requests.get")
+
+    assert get_random() == 0.42
+    mock_get.assert_not_called()
+
+def test_start_random_reservoir_uses_current_fetch(mocker):
+    fetch = Mock(return_value=[0.5] * 4)
+    mocker.patch("meal_max.utils.random_utils.fetch_random_numbers", fetch)
+    mocker.patch("meal_max.utils.random_utils._reservoir", None)
+    mocker.patch("meal_max.utils.random_utils.RANDOM_RESERVOIR_SIZE", 4)
+    mocker.patch("meal_max.utils.random_utils.RANDOM_RESERVOIR_LOW_WATER", 2)
+
+    reservoir = random_utils.start_random_reservoir()
+    try:
+        assert wait_for(lambda: len(reservoir) == 4)
+        fetch.assert_called_once_with(4)
+    finally:
+        random_utils.stop_random_reservoir()
+
+@pytest.mark.parametrize("side_effect, text, outcome", [
+    (None, "0.42", "success"),
+    (None, "not a number", "invalid"),
+    (Timeout, None, "timeout"),
+    (RequestException("Network error"), None, "error"),
+])
+def test_fetch_random_numbers_is_metered(side_effect, text, outcome):
+    """Test that every request to random.org is counted by outcome and timed."""
+    before = random_utils.RANDOM_ORG_REQUESTS.value(outcome=outcome)
+    timed = random_utils.RANDOM_ORG_SECONDS.count()
+
+    with patch("requests.get", side_effect=side_effect) as mock_get:
+        mock_get.return_value.text = text
+        with pytest.raises((ValueError, RuntimeError)) if outcome != "success" else nullcontext():
+            fetch_random_numbers(1)
+
+    assert random_utils.RANDOM_ORG_REQUESTS.value(outcome=outcome) == before + 1
+    assert random_utils.RANDOM_ORG_SECONDS.count() == timed + 1
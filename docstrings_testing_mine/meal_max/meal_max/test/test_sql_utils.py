@@ -0,0 +1,129 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.sql_utils import ConnectionPool, get_db_connection
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    """Point sql_utils at a fresh database file and reset the shared pool."""
+    path = str(tmp_path / "meal_max.db")
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    yield path
+    sql_utils.close_connection_pool()
+
+
+##################################################
+# Connection Pool Test Cases
+##################################################
+
+def test_connection_is_reused(db_path):
+    """Test that consecutive checkouts reuse the same connection."""
+    pool = ConnectionPool(db_path, max_size=2)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_2 = pool.acquire()
+    assert conn_1 is conn_2
+    pool.release(conn_2)
+    pool.close()
+
+def test_invalid_pool_size(db_path):
+    """Test error when creating a pool with no connections."""
+    with pytest.raises(ValueError, match="Invalid pool size: 0. Must be at least 1."):
+        ConnectionPool(db_path, max_size=0)
+
+def test_checkout_timeout_when_exhausted(db_path):
+    """Test that checking out from an exhausted pool times out."""
+    pool = ConnectionPool(db_path, max_size=1, checkout_timeout=0.01)
+    conn = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError, match="Timed out waiting for a database connection"):
+        pool.acquire()
+    pool.release(conn)
+    pool.close()
+
+def test_idle_connections_are_evicted(db_path):
+    """Test that connections idle past the timeout are closed instead of reused."""
+    pool = ConnectionPool(db_path, max_size=2, idle_timeout=0)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_2 = pool.acquire()
+    assert conn_1 is not conn_2
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn_1.execute("SELECT 1;")
+    pool.release(conn_2)
+    pool.close()
+
+def test_unhealthy_connection_is_replaced(db_path):
+    """Test that a connection failing the health check is replaced on checkout."""
+    pool = ConnectionPool(db_path, max_size=2)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_1.close()
+    conn_2 = pool.acquire()
+    assert conn_1 is not conn_2
+    assert conn_2.execute("SELECT 1;").fetchone() == (1,)
+    pool.release(conn_2)
+    pool.close()
+
+def test_release_rolls_back_open_transaction(db_path):
+    """Test that uncommitted work is not visible to the next user of a connection."""
+    pool = ConnectionPool(db_path, max_size=1)
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.execute("INSERT INTO meals (id) VALUES (1)")
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM meals").fetchone() == (0,)
+    pool.release(conn)
+    pool.close()
+
+def test_get_db_connection_uses_pool(db_path):
+    """Test that the context manager hands out pooled connections."""
+    with get_db_connection() as conn_1:
+        pass
+    with get_db_connection() as conn_2:
+        pass
+    assert conn_1 is conn_2
+    assert sql_utils.get_connection_pool().idle_count() == 1
+
+def test_pool_follows_db_path(db_path, tmp_path, mocker):
+    """Test that the shared pool is rebuilt when DB_PATH changes."""
+    pool_1 = sql_utils.get_connection_pool()
+    mocker.patch("meal_max.utils.sql_utils.DB_PATH", str(tmp_path / "other.db"))
+    pool_2 = sql_utils.get_connection_pool()
+    assert pool_1 is not pool_2
+    assert pool_2.db_path == str(tmp_path / "other.db")
+
+def test_queries_are_metered(db_path):
+    """Test that statements run on pooled connections are counted and timed by kind."""
+    selects = sql_utils.DB_QUERIES.value(statement="SELECT", outcome="success")
+    errors = sql_utils.DB_QUERIES.value(statement="SELECT", outcome="error")
+    opened = sql_utils.DB_CONNECTIONS_OPENED.value()
+    holds = sql_utils.DB_CHECKOUT_HOLD_SECONDS.count()
+
+    with get_db_connection() as conn:
+        conn.cursor().execute("SELECT 1;")
+        conn.execute("select 2")
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("SELECT * FROM missing_table")
+
+    assert sql_utils.DB_QUERIES.value(statement="SELECT", outcome="success") == selects + 2
+    assert sql_utils.DB_QUERIES.value(statement="SELECT", outcome="error") == errors + 1
+    assert sql_utils.DB_CONNECTIONS_OPENED.value() == opened + 1
+    assert sql_utils.DB_CHECKOUT_HOLD_SECONDS.count() == holds + 1
+
+@pytest.mark.parametrize("sql, kind", [
+    ("  SELECT 1", "SELECT"),
+    ("insert into t values (1)", "INSERT"),
+    ("COMMIT;", "COMMIT"),
+    ("VACUUM", "OTHER"),
+    ("", "OTHER"),
+])
+def test_statement_kind(sql, kind):
+    """Test labelling statements by their first keyword."""
+    assert sql_utils.statement_kind(sql) == kind
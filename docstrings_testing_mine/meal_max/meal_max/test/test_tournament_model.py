@@ -0,0 +1,139 @@
+import itertools
+import time
+
+import pytest
+
+from meal_max.models.kitchen_model import Meal
+from meal_max.models.tournament_model import TournamentModel
+
+
+@pytest.fixture
+def meals():
+    """Fixture providing nine meals."""
+    return {meal_id: Meal(id=meal_id, meal=f"Meal {meal_id}", cuisine="Cuisine", price=float(meal_id), difficulty="MED")
+            for meal_id in range(1, 10)}
+
+@pytest.fixture
+def tournament_model(meals, mocker):
+    """Fixture providing a TournamentModel with the database and random source mocked out."""
+    mocker.patch("meal_max.models.tournament_model.get_meal_by_id", side_effect=lambda meal_id: meals[meal_id])
+    # The score gaps are all below 0.99, so the second meal in every pairing wins
+    mocker.patch("meal_max.models.battle_model.get_random", return_value=0.99)
+    return TournamentModel()
+
+@pytest.fixture
+def mock_record_battle_results(mocker):
+    """Mock the per-round stats write."""
+    return mocker.patch("meal_max.models.tournament_model.record_battle_results")
+
+
+##################################################
+# Format Test Cases
+##################################################
+
+def test_single_elimination(tournament_model, mock_record_battle_results):
+    """Test the seeded knockout bracket and that each round is recorded once."""
+    tournament = tournament_model.start_tournament(list(range(1, 9)), "single_elimination", background=False)
+
+    assert tournament.status == "completed"
+    assert [len(matches) for matches in tournament.rounds] == [4, 2, 1]
+    assert tournament.champion()['id'] == 6
+    assert mock_record_battle_results.call_count == 3
+    # Seed i meets seed 9 - i, with the top two seeds in opposite halves
+    assert mock_record_battle_results.call_args_list[0][0][0] == [(8, 1), (5, 4), (7, 2), (6, 3)]
+    assert mock_record_battle_results.call_args_list[1][0][0] == [(5, 8), (6, 7)]
+
+def test_single_elimination_with_byes(tournament_model, mock_record_battle_results):
+    """Test that an odd field gives the top seeds a bye in the first round only."""
+    tournament = tournament_model.start_tournament([1, 2, 3, 4, 5], "single_elimination", background=False)
+
+    assert tournament.num_rounds == 3
+    assert tournament.rounds[0] == [
+        {'meal_1': 4, 'meal_2': 5, 'winner': 5},
+        {'meal_1': 1, 'meal_2': None, 'winner': None},
+        {'meal_1': 2, 'meal_2': None, 'winner': None},
+        {'meal_1': 3, 'meal_2': None, 'winner': None},
+    ]
+    assert all(match['meal_2'] is not None for matches in tournament.rounds[1:] for match in matches)
+    assert tournament.champion()['id'] == 3
+
+def test_single_elimination_byes_are_not_wins(tournament_model, mock_record_battle_results):
+    """Test that no meal gets more than one bye and that byes don't count in the standings."""
+    tournament = tournament_model.start_tournament(list(range(1, 10)), "single_elimination", background=False)
+
+    byes = [match['meal_1'] for matches in tournament.rounds for match in matches if match['meal_2'] is None]
+    assert sorted(byes) == [1, 2, 3, 4, 5, 6, 7]
+    assert [len(matches) for matches in tournament.rounds] == [8, 4, 2, 1]
+    assert sum(tournament.wins.values()) == sum(tournament.losses.values()) == 8
+    standings = tournament.standings()
+    assert [entry['id'] for entry in standings] == [6, 5, 9, 7, 1, 2, 3, 4, 8]
+    assert [(entry['wins'], entry['losses']) for entry in standings] == \
+        [(3, 0), (2, 1), (2, 1), (1, 1), (0, 1), (0, 1), (0, 1), (0, 1), (0, 1)]
+
+def test_round_robin(tournament_model, mock_record_battle_results):
+    """Test that every pair of meals meets exactly once."""
+    tournament = tournament_model.start_tournament([1, 2, 3, 4, 5], "round_robin", background=False)
+
+    pairs = [frozenset((match['meal_1'], match['meal_2'])) for matches in tournament.rounds
+             for match in matches if match['meal_2'] is not None]
+    assert sorted(map(sorted, pairs)) == sorted(map(sorted, itertools.combinations(range(1, 6), 2)))
+    assert tournament.num_rounds == 5
+    assert all(tournament.wins[meal_id] + tournament.losses[meal_id] == 4 for meal_id in range(1, 6))
+    assert sum(tournament.wins.values()) == 10
+
+def test_swiss(tournament_model, mock_record_battle_results):
+    """Test that Swiss rounds avoid rematches and rank the field."""
+    tournament = tournament_model.start_tournament(list(range(1, 9)), "swiss", background=False)
+
+    pairs = [frozenset((match['meal_1'], match['meal_2'])) for matches in tournament.rounds for match in matches]
+    assert len(pairs) == len(set(pairs)) == 12
+    assert [entry['wins'] for entry in tournament.standings()] == [3, 2, 2, 2, 1, 1, 1, 0]
+
+def test_swiss_rounds_and_byes(tournament_model, mock_record_battle_results):
+    """Test an explicit round count and that byes go to different meals."""
+    tournament = tournament_model.start_tournament([1, 2, 3], "swiss", num_rounds=3, background=False)
+
+    byes = [match['meal_1'] for matches in tournament.rounds for match in matches if match['meal_2'] is None]
+    assert len(byes) == len(set(byes)) == 3
+
+
+##################################################
+# Lifecycle Test Cases
+##################################################
+
+def test_tournament_failure_is_recorded(tournament_model, mock_record_battle_results):
+    """Test that an error while recording a round fails the tournament."""
+    mock_record_battle_results.side_effect = ValueError("Meal with ID 3 has been deleted")
+
+    tournament = tournament_model.start_tournament([1, 2, 3, 4], "round_robin", background=False)
+
+    assert tournament.status == "failed"
+    assert tournament.error == "Meal with ID 3 has been deleted"
+    assert tournament.champion() is None
+
+def test_background_tournament(tournament_model, mock_record_battle_results):
+    """Test running a tournament on a background thread and polling it by id."""
+    tournament = tournament_model.start_tournament([1, 2, 3, 4], "single_elimination")
+
+    for _ in range(200):
+        if tournament_model.get_tournament(tournament.id).status == "completed":
+            break
+        time.sleep(0.01)
+
+    assert tournament_model.get_tournament(tournament.id).to_dict()['champion']['id'] == 3
+
+def test_get_tournament_unknown(tournament_model):
+    """Test error when polling a tournament that doesn't exist."""
+    with pytest.raises(ValueError, match="Tournament with ID 99 not found"):
+        tournament_model.get_tournament(99)
+
+@pytest.mark.parametrize("meal_ids, fmt, num_rounds, message", [
+    ([1, 2], "ladder", None, "Invalid tournament format"),
+    ([1], "swiss", None, "at least two meals"),
+    ([1, 2, 1], "swiss", None, "only enter a tournament once"),
+    ([1, 2], "round_robin", 3, "num_rounds can only be set"),
+])
+def test_start_tournament_invalid(tournament_model, meal_ids, fmt, num_rounds, message):
+    """Test that invalid tournaments are rejected before they start."""
+    with pytest.raises(ValueError, match=message):
+        tournament_model.start_tournament(meal_ids, fmt, num_rounds, background=False)
@@ -0,0 +1,217 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import math
+import threading
+import time
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+
+# The content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, for latency histograms
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    """A named metric with optional labels, rendered in the Prometheus text format.
+
+    Attributes:
+        name: The metric name.
+        help: A one-line description.
+        labelnames: The names of the labels every sample must set.
+
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {', '.join(self.labelnames) or 'none'}, got {', '.join(labels) or 'none'}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, dict, float]]:
+        """Returns every sample as (name, labels, value)."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Returns the metric's HELP and TYPE lines and its samples."""
+        lines = [f"# HELP {self.name} {_escape_help(self.help)}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A count that only goes up, such as the number of requests served. Names end in _total."""
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+        if not self.labelnames:
+            # A metric without labels has a single series, reported even before it changes
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Adds to the count for the given labels.
+
+        Args:
+            amount: How much to add.
+            labels: A value for each label name.
+
+        Returns:
+            Nothing.
+
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Returns the count for the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> List[Tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values]
+
+
+class Gauge(Metric):
+    """A value read when the metrics are rendered, such as the number of idle connections."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, function: Callable[[], float], **kwargs):
+        super().__init__(name, help, **kwargs)
+        self.function = function
+
+    def samples(self) -> List[Tuple[str, dict, float]]:
+        return [(self.name, {}, self.function())]
+
+
+class Histogram(Metric):
+    """Counts observations, such as latencies, in cumulative buckets and tracks their sum."""
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (count in each bucket, with +Inf last, sum of observations)
+        self._values: dict[tuple, tuple] = {}
+        if not self.labelnames:
+            self._values[()] = ([0] * (len(self.buckets) + 1), 0.0)
+
+    def observe(self, value: float, **labels) -> None:
+        """Records one observation.
+
+        Args:
+            value: The observed value, such as a duration in seconds.
+            labels: A value for each label name.
+
+        Returns:
+            Nothing.
+
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observes how long the body of a with block takes, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Returns the number of observations for the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            counts, _ = self._values.get(key, ([], 0.0))
+            return sum(counts)
+
+    def samples(self) -> List[Tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, 'le': "+Inf" if bound == math.inf else repr(float(bound))}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """The metrics to render on /metrics."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> None:
+        """Adds a metric. Raises a ValueError if one with the same name is already registered."""
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"A metric named {metric.name} is already registered.")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render_metrics() -> str:
+    """Returns the process's metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics, ready to serve with CONTENT_TYPE.
+
+    """
+    return REGISTRY.render()
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
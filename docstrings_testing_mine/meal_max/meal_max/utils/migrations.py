@@ -0,0 +1,97 @@
+import logging
+import os
+import re
+import sqlite3
+from typing import List, Tuple
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# load the migrations directory from the environment with a default value
+MIGRATIONS_PATH = os.getenv("SQL_MIGRATIONS_PATH", "/app/sql/migrations")
+
+# Migrations are named <version>_<description>.sql, e.g. 0002_leaderboard_indexes.sql
+MIGRATION_FILENAME = re.compile(r"^(\d+)_\w+\.sql$")
+
+
+def list_migrations(migrations_path: str = None) -> List[Tuple[int, str]]:
+    """Lists the migration scripts in a directory, in the order they must be applied.
+
+    Args:
+        migrations_path: The directory holding the scripts. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        A list of (version, path) tuples sorted by version. Raises a ValueError if two
+        scripts share a version.
+
+    """
+    migrations_path = migrations_path or MIGRATIONS_PATH
+    migrations = {}
+    for filename in os.listdir(migrations_path):
+        match = MIGRATION_FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = os.path.join(migrations_path, filename)
+    return sorted(migrations.items())
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Returns the schema version recorded in the database.
+
+    Args:
+        conn: An open database connection.
+
+    Returns:
+        int: The version of the last migration applied, 0 for a new database.
+
+    """
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_migrations(migrations_path: str = None) -> int:
+    """Applies every migration newer than the database's schema version.
+
+    Each script runs in its own transaction together with the version bump, so a
+    failed migration leaves the database at the previous version. Tables are never
+    dropped, so existing data is kept. This mirrors sql/create_db.sh.
+
+    Args:
+        migrations_path: The directory holding the scripts. Defaults to MIGRATIONS_PATH.
+
+    Returns:
+        int: The schema version after migrating. Raises a sqlite3.Error if a migration fails.
+
+    """
+    migrations = list_migrations(migrations_path)
+
+    with get_db_connection() as conn:
+        version = get_schema_version(conn)
+        for migration_version, path in migrations:
+            if migration_version <= version:
+                continue
+
+            logger.info("Applying migration %s", os.path.basename(path))
+            with open(path) as f:
+                script = f.read()
+
+            try:
+                conn.executescript(
+                    f"BEGIN;\n{script}\n;\nPRAGMA user_version = {migration_version:d};\nCOMMIT;"
+                )
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                logger.error("Migration %s failed: %s", os.path.basename(path), str(e))
+                raise e
+            version = migration_version
+
+    logger.info("Database is at schema version %d", version)
+    return version
@@ -0,0 +1,59 @@
+import base64
+import binascii
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encodes the sort key of the last row on a page as an opaque cursor token.
+
+    Args:
+        values: The JSON-serializable values identifying the row, e.g. [sort_by, wins, id].
+
+    Returns:
+        str: A URL-safe token to pass back as the next page's 'after' parameter.
+
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """Decodes a cursor token produced by encode_cursor.
+
+    Args:
+        token: The cursor token.
+
+    Returns:
+        The list of values the token was built from. Raises a ValueError if the token is malformed.
+
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {token}")
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {token}")
+    return values
+
+
+def parse_fields(fields: Any, allowed: tuple) -> List[str]:
+    """Validates a list of requested fields, accepting a comma-separated string.
+
+    Args:
+        fields: A list of field names or a comma-separated string. None selects every allowed field.
+        allowed: The fields that may be requested, in output order.
+
+    Returns:
+        The requested fields, without duplicates. Raises a ValueError for unknown fields.
+
+    """
+    if fields is None:
+        return list(allowed)
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Invalid fields: {', '.join(unknown) or 'none requested'}. Must be chosen from {', '.join(allowed)}.")
+    return list(dict.fromkeys(fields))
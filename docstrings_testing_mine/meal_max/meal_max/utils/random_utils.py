@@ -1,15 +1,45 @@
+from collections import deque
 import logging
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Callable, List, Optional
+
 import requests
 
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.metrics import Counter, Gauge, Histogram
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# reservoir settings
+RANDOM_RESERVOIR = os.getenv("RANDOM_RESERVOIR", "false").lower() == "true"
+RANDOM_RESERVOIR_SIZE = int(os.getenv("RANDOM_RESERVOIR_SIZE", "100"))
+RANDOM_RESERVOIR_LOW_WATER = int(os.getenv("RANDOM_RESERVOIR_LOW_WATER", "25"))
+RANDOM_REFILL_RETRY = float(os.getenv("RANDOM_REFILL_RETRY", "5"))
+# local source used when the reservoir is empty: "none", "secrets" or "prng"
+RANDOM_FALLBACK = os.getenv("RANDOM_FALLBACK", "none").lower()
+RANDOM_SEED = os.getenv("RANDOM_SEED")
+
+# Where random.org is; point this at random_org_stub for offline or repeatable runs
+RANDOM_ORG_BASE_URL = os.getenv("RANDOM_ORG_BASE_URL", "https://www.random.org").rstrip("/")
+# random.org returns at most this many fractions per request
+MAX_BATCH = 10000
+
+RANDOM_ORG_REQUESTS = Counter("random_org_requests_total", "Requests made to random.org, by outcome.", ["outcome"])
+RANDOM_ORG_SECONDS = Histogram("random_org_request_duration_seconds", "Time taken by requests to random.org.")
+
+
 def get_random() -> float:
     """Fetches a random decimal number from random.org.
 
+    If the reservoir has been started, the number is popped from numbers fetched ahead of
+    time and no request is made unless the reservoir has run dry.
+
     Args:
         None.
 
@@ -19,8 +49,27 @@ def get_random() -> float:
         exception.
 
     """
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+    reservoir = _reservoir
+    if reservoir is not None:
+        return reservoir.get()
+    return fetch_random_numbers(1)[0]
+
+def fetch_random_numbers(num: int) -> List[float]:
+    """Fetches several random decimal numbers from random.org in a single request.
+
+    Args:
+        num: How many numbers to fetch, between 1 and 10000.
+
+    Returns:
+        List[float]: The random numbers, each between 0 and 1 with 2 decimal places. Raises a
+        ValueError if random.org sends back something that isn't a number and a RuntimeError
+        if the request fails.
+
+    """
+    url = f"{RANDOM_ORG_BASE_URL}/decimal-fractions/?num={num}&dec=2&col=1&format=plain&rnd=new"
 
+    start = time.perf_counter()
+    outcome = "error"
     try:
         # Log the request to random.org
         logger.info("Fetching random number from %s", url)
@@ -30,20 +79,221 @@ def get_random() -> float:
         # Check if the request was successful
         response.raise_for_status()
 
-        random_number_str = response.text.strip()
+        random_number_strs = response.text.split()
 
+        outcome = "invalid"
         try:
-            random_number = float(random_number_str)
+            random_numbers = [float(random_number_str) for random_number_str in random_number_strs]
         except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        if not random_numbers:
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        outcome = "success"
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        if len(random_numbers) == 1:
+            logger.info("Received random number: %.3f", random_numbers[0])
+        else:
+            logger.info("Received %d random numbers", len(random_numbers))
+        return random_numbers
 
     except requests.exceptions.Timeout:
+        outcome = "timeout"
         logger.error("Request to random.org timed out.")
         raise RuntimeError("Request to random.org timed out.")
 
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+    finally:
+        RANDOM_ORG_SECONDS.observe(time.perf_counter() - start)
+        RANDOM_ORG_REQUESTS.inc(outcome=outcome)
+
+def make_local_source(name: str, seed: Optional[str] = None) -> Optional[Callable[[], float]]:
+    """Builds a local random number source to use when the reservoir is empty.
+
+    Args:
+        name: "secrets" for the operating system's CSPRNG, "prng" for a seedable
+            pseudo-random generator (useful in tests), or "none" for no local source.
+        seed: The seed for "prng". Ignored by the other sources.
+
+    Returns:
+        A function returning a number between 0 and 1 with 2 decimal places, or None.
+        Raises a ValueError for an unknown name.
+
+    """
+    if name == "none":
+        return None
+    if name == "secrets":
+        return lambda: secrets.randbelow(100) / 100
+    if name == "prng":
+        rng = random.Random(seed)
+        lock = threading.Lock()
+
+        def prng_source() -> float:
+            with lock:
+                return rng.randrange(100) / 100
+
+        return prng_source
+    raise ValueError("Invalid random fallback: %s. Must be one of none, secrets, prng." % name)
+
+
+class RandomReservoir:
+    """A buffer of random numbers fetched from random.org in bulk.
+
+    A background thread tops the buffer back up to its capacity with one request whenever it
+    drops below the low-water mark, so get() is normally a non-blocking pop. If the buffer runs
+    dry, get() uses the local source if there is one and otherwise fetches a number itself.
+
+    """
+
+    def __init__(self, capacity: int = 100, low_water: int = 25,
+                 fetch: Callable[[int], List[float]] = fetch_random_numbers,
+                 fallback: Optional[Callable[[], float]] = None, retry_interval: float = 5.0):
+        """Initializes an empty reservoir. Call start() to begin filling it.
+
+        Args:
+            capacity: The number of random numbers to hold when full.
+            low_water: A refill starts when fewer than this many numbers are left.
+            fetch: Fetches the given number of random numbers.
+            fallback: Returns a single random number when the reservoir is empty, or None.
+            retry_interval: Seconds to wait before retrying a failed refill.
+
+        Returns:
+            Nothing. Raises a ValueError if the sizes are invalid.
+
+        """
+        if capacity < 1 or capacity > MAX_BATCH:
+            raise ValueError("Invalid reservoir capacity: %d. Must be between 1 and %d." % (capacity, MAX_BATCH))
+        if low_water < 0 or low_water > capacity:
+            raise ValueError("Invalid low-water mark: %d. Must be between 0 and the capacity." % low_water)
+
+        self.capacity = capacity
+        self.low_water = low_water
+        self.fetch = fetch
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+
+        self._numbers: deque = deque()
+        self._refill_needed = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts the background refill thread, which fills the reservoir straight away.
+
+        Returns:
+            None.
+
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._refill_needed.set()
+        self._thread = threading.Thread(target=self._refill_loop, name="random-reservoir", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stops the background refill thread.
+
+        Args:
+            timeout: Seconds to wait for an in-flight refill to finish.
+
+        Returns:
+            None.
+
+        """
+        self._stopped.set()
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get(self) -> float:
+        """Returns the next random number.
+
+        Returns:
+            float: A random number between 0 and 1. Raises the same errors as the fetch
+            function if the reservoir is empty, there is no local source, and fetching fails.
+
+        """
+        try:
+            # deque.popleft is atomic, so no lock is needed against the refill thread
+            number = self._numbers.popleft()
+        except IndexError:
+            self._refill_needed.set()
+            if self.fallback is not None:
+                logger.warning("Random reservoir is empty, using the local random source")
+                return self.fallback()
+            logger.warning("Random reservoir is empty, fetching a random number directly")
+            return self.fetch(1)[0]
+
+        if len(self._numbers) < self.low_water:
+            self._refill_needed.set()
+        return number
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def _refill_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._refill_needed.wait()
+            if self._stopped.is_set():
+                break
+            self._refill_needed.clear()
+
+            missing = self.capacity - len(self._numbers)
+            if missing <= 0:
+                continue
+            try:
+                self._numbers.extend(self.fetch(missing))
+                logger.info("Random reservoir refilled to %d numbers", len(self._numbers))
+            except (RuntimeError, ValueError) as e:
+                logger.error("Failed to refill random reservoir: %s", e)
+                # Try again later; get() keeps working from what's left or the fallback
+                if self._stopped.wait(self.retry_interval):
+                    break
+                self._refill_needed.set()
+
+
+_reservoir: Optional[RandomReservoir] = None
+_reservoir_lock = threading.Lock()
+
+RANDOM_RESERVOIR_NUMBERS = Gauge("random_reservoir_numbers", "Random numbers waiting in the reservoir.",
+                                 lambda: len(_reservoir) if _reservoir is not None else 0)
+
+
+def start_random_reservoir() -> RandomReservoir:
+    """Starts the process-wide reservoir that get() draws from, using the environment settings.
+
+    Returns:
+        RandomReservoir: The running reservoir. Calling this again returns the same one.
+
+    """
+    global _reservoir
+    with _reservoir_lock:
+        if _reservoir is None:
+            # fetch is looked up now rather than bound at import, so a replaced
+            # fetch_random_numbers (as in the tests) is used by the reservoir too
+            _reservoir = RandomReservoir(
+                RANDOM_RESERVOIR_SIZE,
+                RANDOM_RESERVOIR_LOW_WATER,
+                fetch=fetch_random_numbers,
+                fallback=make_local_source(RANDOM_FALLBACK, RANDOM_SEED),
+                retry_interval=RANDOM_REFILL_RETRY,
+            )
+            _reservoir.start()
+        return _reservoir
+
+def stop_random_reservoir() -> None:
+    """Stops the process-wide reservoir, if it was started. get() then fetches every number directly.
+
+    Returns:
+        None.
+
+    """
+    global _reservoir
+    with _reservoir_lock:
+        if _reservoir is not None:
+            _reservoir.stop()
+            _reservoir = None
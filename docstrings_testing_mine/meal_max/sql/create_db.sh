@@ -1,14 +1,33 @@
 #!/bin/bash
 
-# Check if the database file already exists
+# Apply every migration in $SQL_MIGRATIONS_PATH that the database hasn't seen yet.
+# The schema version is stored in PRAGMA user_version, so existing data is kept.
+MIGRATIONS_PATH="${SQL_MIGRATIONS_PATH:-/app/sql/migrations}"
+
 if [ -f "$DB_PATH" ]; then
-    echo "Recreating database at $DB_PATH."
-    # Drop and recreate the tables
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
-    echo "Database recreated successfully."
+    echo "Migrating database at $DB_PATH."
 else
     echo "Creating database at $DB_PATH."
-    # Create the database for the first time
-    sqlite3 "$DB_PATH" < /app/sql/create_meal_table.sql
-    echo "Database created successfully."
-fi
\ No newline at end of file
+fi
+
+current_version=$(sqlite3 "$DB_PATH" "PRAGMA user_version;")
+
+for migration in $(ls "$MIGRATIONS_PATH"/*.sql | sort); do
+    filename=$(basename "$migration")
+    # Migrations are named <version>_<description>.sql
+    version=$((10#${filename%%_*}))
+
+    if [ "$version" -gt "$current_version" ]; then
+        echo "Applying migration $filename..."
+        # Each migration and its version bump are committed together or not at all
+        { echo "BEGIN;"; cat "$migration"; echo ";"; echo "PRAGMA user_version = $version;"; echo "COMMIT;"; } \
+            | sqlite3 -bail "$DB_PATH"
+        if [ $? -ne 0 ]; then
+            echo "Migration $filename failed."
+            exit 1
+        fi
+        current_version=$version
+    fi
+done
+
+echo "Database is at schema version $current_version."
@@ -0,0 +1,17 @@
+-- The leaderboard only shows meals that are not deleted and have fought a battle,
+-- sorted by wins or by win percentage. win_pct is a generated column so it can be
+-- indexed, and the partial covering indexes let both sorts read the index in order
+-- instead of scanning the table and sorting in a temp B-tree.
+--
+-- SQLite only uses a partial index when the query repeats its WHERE clause, so keep
+-- "deleted = false AND battles > 0" spelled exactly as in kitchen_model.get_leaderboard.
+ALTER TABLE meals ADD COLUMN win_pct REAL
+    GENERATED ALWAYS AS (CASE WHEN battles > 0 THEN wins * 1.0 / battles END) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_wins
+    ON meals (wins DESC, id, meal, cuisine, price, difficulty, battles)
+    WHERE deleted = false AND battles > 0;
+
+CREATE INDEX IF NOT EXISTS idx_meals_leaderboard_win_pct
+    ON meals (win_pct DESC, id, meal, cuisine, price, difficulty, battles, wins)
+    WHERE deleted = false AND battles > 0;
@@ -1,8 +1,16 @@
+import io
+import json
+import time
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, g, jsonify, make_response, Response, request, stream_with_context
+from flask.logging import default_handler
 
-from music_collection.models import song_model
+from music_collection.models import song_import, song_model
 from music_collection.models.playlist_model import PlaylistModel
+from music_collection.utils import profiling
+from music_collection.utils.logger import setup_logging
+from music_collection.utils.metrics import CONTENT_TYPE, Counter, Histogram, render_metrics
 from music_collection.utils.sql_utils import check_database_connection, check_table_exists
 
 
@@ -10,6 +18,9 @@ from music_collection.utils.sql_utils import check_database_connection, check_ta
 load_dotenv()
 
 app = Flask(__name__)
+# Log through the root handler set up by setup_logging instead of Flask's own stderr handler
+app.logger.removeHandler(default_handler)
+setup_logging()
 
 playlist_model = PlaylistModel()
 
@@ -54,6 +65,151 @@ def db_check() -> Response:
         return make_response(jsonify({'error': str(e)}), 404)
 
 
+##########################################################
+#
+# Metrics
+#
+##########################################################
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests served, by method, route and status.",
+                        ["method", "route", "status"])
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time taken to serve HTTP requests.",
+                                 ["method", "route"])
+
+
+@app.before_request
+def start_request_timer() -> None:
+    """
+    Notes when the request started, for the latency histogram.
+    """
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """
+    Counts the request and records its latency under its route pattern, such as
+    /api/delete-song/<int:song_id>, so that every ID shares one series. Streamed bodies are
+    timed up to the point the response starts.
+
+    Returns:
+        The response, unchanged.
+    """
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+    if 'request_start' in g:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, method=request.method, route=route)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics() -> Response:
+    """
+    Route to expose request, database and random.org metrics in the Prometheus text format.
+
+    Returns:
+        The metrics as text/plain.
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+##########################################################
+#
+# Profiling
+#
+##########################################################
+
+
+@app.before_request
+def start_request_profile() -> None:
+    """
+    Starts profiling the request if it sent X-Profile or ?profile and PROFILING is on.
+    """
+    if request.path.startswith('/api/profiles') or not profiling.wants_profile(request.headers, request.args):
+        return
+    g.profile = profiling.start_profile()
+
+
+@app.after_request
+def finish_request_profile(response: Response) -> Response:
+    """
+    Stores the profile of a profiled request and returns its id in the X-Profile-Id header.
+    Streamed bodies are profiled up to the point the response starts.
+
+    Returns:
+        The response, with X-Profile-Id set if the request was profiled.
+    """
+    active = g.pop('profile', None)
+    if active is not None:
+        profile = profiling.stop_profile(active, request.method, request.path, response.status_code)
+        response.headers['X-Profile-Id'] = str(profile.id)
+    return response
+
+
+@app.teardown_request
+def abandon_request_profile(error=None) -> None:
+    """
+    Stops the profiler of a request that failed before its profile could be stored.
+    """
+    active = g.pop('profile', None)
+    if active is not None:
+        profiling.stop_profile(active, request.method, request.path, 500)
+
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles() -> Response:
+    """
+    Route to list the most recent request profiles, newest first.
+
+    Returns:
+        JSON response with the id, route, status and duration of each stored profile.
+    Raises:
+        404 error if profiling is disabled or the profiling token is missing.
+    """
+    if not profiling.is_authorized(request.headers, request.args):
+        return make_response(jsonify({'error': 'Profiling is disabled'}), 404)
+    profiles = [profile.to_dict() for profile in profiling.profile_store.list()]
+    return make_response(jsonify({'status': 'success', 'profiles': profiles}), 200)
+
+
+@app.route('/api/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id: int) -> Response:
+    """
+    Route to retrieve a stored request profile.
+
+    Query Parameters:
+        - format (str, optional): "text" for a pstats table (the default) or "pstats" for the
+          binary profile, loadable with pstats or snakeviz.
+        - sort (str, optional): "cumulative" (the default), "tottime" or "calls", for text.
+        - limit (int, optional): The number of functions to list, for text. Defaults to 40.
+
+    Returns:
+        The profile as text/plain or as an application/octet-stream download.
+    Raises:
+        400 error if the arguments are invalid.
+        404 error if profiling is disabled or the profile is unknown.
+    """
+    if not profiling.is_authorized(request.headers, request.args):
+        return make_response(jsonify({'error': 'Profiling is disabled'}), 404)
+    try:
+        profile = profiling.profile_store.get(profile_id)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 404)
+
+    output_format = request.args.get('format', 'text')
+    if output_format == 'pstats':
+        return Response(profile.dump(), mimetype='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.prof'})
+    if output_format != 'text':
+        return make_response(jsonify({'error': f"Invalid format: {output_format}. Must be text or pstats."}), 400)
+    try:
+        report = profile.report(request.args.get('sort', 'cumulative'), int(request.args.get('limit', '40')))
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    return Response(report, mimetype='text/plain')
+
+
 ##########################################################
 #
 # Song Management
@@ -101,6 +257,52 @@ def add_song() -> Response:
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@app.route('/api/import-songs', methods=['POST'])
+def import_songs() -> Response:
+    """
+    Route to add many songs to the catalog from a CSV or NDJSON upload.
+
+    The request body is streamed, so it can be much larger than memory.
+
+    Query Parameters:
+        - format (str, optional): 'csv' or 'ndjson'. Defaults to 'ndjson' unless the
+          Content-Type is text/csv.
+        - batch_size (int, optional): How many songs to insert per transaction. Default is 1000.
+
+    Returns:
+        JSON response with the number of songs imported and an error for each skipped row.
+    Raises:
+        400 error if the format, batch size or CSV header is invalid, or if the upload becomes
+        unreadable partway through. In that case the response also has the line it stopped at
+        and the songs imported before it, which stay in the catalog.
+        500 error if there is an issue importing the songs.
+    """
+    default_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    fmt = request.args.get('format', default_format)
+    app.logger.info('Importing songs from %s', fmt)
+    try:
+        try:
+            batch_size = int(request.args.get('batch_size', '1000'))
+            stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+            records = song_import.read_songs(stream, fmt)
+            report = song_import.import_songs(records, batch_size=batch_size)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+
+        if report.stopped_at is not None:
+            # Earlier batches are already committed, so tell the client exactly how far it got
+            app.logger.warning("Import stopped at line %d after importing %d songs", report.stopped_at, report.imported)
+            return make_response(jsonify({'status': 'partial', 'error': report.errors[-1]['error'],
+                                          'stopped_at': report.stopped_at, 'imported': report.imported,
+                                          'errors': report.errors}), 400)
+
+        app.logger.info("Imported %d songs, skipped %d rows", report.imported, len(report.errors))
+        return make_response(jsonify({'status': 'success', 'imported': report.imported, 'errors': report.errors}), 200)
+    except Exception as e:
+        app.logger.error("Failed to import songs: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+
 @app.route('/api/delete-song/<int:song_id>', methods=['DELETE'])
 def delete_song(song_id: int) -> Response:
     """
@@ -113,11 +315,11 @@ def delete_song(song_id: int) -> Response:
         JSON response indicating success of the operation or error message.
     """
     try:
-        app.logger.info(f"Deleting song by ID: {song_id}")
+        app.logger.info("Deleting song by ID: %s", song_id)
         song_model.delete_song(song_id)
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error deleting song: {e}")
+        app.logger.error("Error deleting song: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -128,23 +330,57 @@ def get_all_songs() -> Response:
 
     Query Parameter:
         - sort_by_play_count (bool, optional): If true, sort songs by play count.
+        - limit (int, optional): The page size. Returns every song if omitted.
+        - after (str, optional): The next_cursor from the previous page.
+        - fields (str, optional): A comma-separated list of the fields to return for each song.
+        - format (str, optional): 'ndjson' to stream every song as one JSON object per line.
+          limit and after are ignored when streaming.
 
     Returns:
-        JSON response with the list of songs or error message.
+        JSON response with the list of songs and the cursor for the next page, or error message.
     """
     try:
         # Extract query parameter for sorting by play count
         sort_by_play_count = request.args.get('sort_by_play_count', 'false').lower() == 'true'
 
+        if request.args.get('format') == 'ndjson':
+            app.logger.info("Streaming all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
+            try:
+                songs = song_model.iter_songs(sort_by_play_count, fields=request.args.get('fields'))
+            except ValueError as e:
+                return make_response(jsonify({'error': str(e)}), 400)
+            lines = (json.dumps(song) + '\n' for song in songs)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
         app.logger.info("Retrieving all songs from the catalog, sort_by_play_count=%s", sort_by_play_count)
-        songs = song_model.get_all_songs(sort_by_play_count=sort_by_play_count)
+        try:
+            songs, next_cursor = get_song_page(sort_by_play_count)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
 
-        return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
+        return make_response(jsonify({'status': 'success', 'songs': songs, 'next_cursor': next_cursor}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving songs: {e}")
+        app.logger.error("Error retrieving songs: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+def get_song_page(sort_by_play_count: bool) -> tuple:
+    """
+    Reads the limit, after and fields query parameters and fetches that page of the catalog.
+
+    Raises:
+        ValueError: If any of the paging parameters are invalid.
+    """
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError(f"Invalid limit: {limit} (must be a positive integer).")
+    return song_model.get_all_songs_page(
+        sort_by_play_count, limit=limit, after=request.args.get('after'), fields=request.args.get('fields'))
+
+
 @app.route('/api/get-song-from-catalog-by-id/<int:song_id>', methods=['GET'])
 def get_song_by_id(song_id: int) -> Response:
     """
@@ -157,11 +393,11 @@ def get_song_by_id(song_id: int) -> Response:
         JSON response with the song details or error message.
     """
     try:
-        app.logger.info(f"Retrieving song by ID: {song_id}")
+        app.logger.info("Retrieving song by ID: %s", song_id)
         song = song_model.get_song_by_id(song_id)
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving song by ID: {e}")
+        app.logger.error("Error retrieving song by ID: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-song-from-catalog-by-compound-key', methods=['GET'])
@@ -192,12 +428,12 @@ def get_song_by_compound_key() -> Response:
         except ValueError:
             return make_response(jsonify({'error': 'Year must be an integer'}), 400)
 
-        app.logger.info(f"Retrieving song by compound key: {artist}, {title}, {year}")
+        app.logger.info("Retrieving song by compound key: %s, %s, %s", artist, title, year)
         song = song_model.get_song_by_compound_key(artist, title, year)
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving song by compound key: {e}")
+        app.logger.error("Error retrieving song by compound key: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-random-song', methods=['GET'])
@@ -213,7 +449,7 @@ def get_random_song() -> Response:
         song = song_model.get_random_song()
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
     except Exception as e:
-        app.logger.error(f"Error retrieving a random song: {e}")
+        app.logger.error("Error retrieving a random song: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -252,11 +488,11 @@ def add_song_to_playlist() -> Response:
         # Add song to playlist
         playlist_model.add_song_to_playlist(song)
 
-        app.logger.info(f"Song added to playlist: {artist} - {title} ({year})")
+        app.logger.info("Song added to playlist: %s - %s (%s)", artist, title, year)
         return make_response(jsonify({'status': 'success', 'message': 'Song added to playlist'}), 201)
 
     except Exception as e:
-        app.logger.error(f"Error adding song to playlist: {e}")
+        app.logger.error("Error adding song to playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/remove-song-from-playlist', methods=['DELETE'])
@@ -288,11 +524,11 @@ def remove_song_by_song_id() -> Response:
         # Remove song from playlist
         playlist_model.remove_song_by_song_id(song.id)
 
-        app.logger.info(f"Song removed from playlist: {artist} - {title} ({year})")
+        app.logger.info("Song removed from playlist: %s - %s (%s)", artist, title, year)
         return make_response(jsonify({'status': 'success', 'message': 'Song removed from playlist'}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error removing song from playlist: {e}")
+        app.logger.error("Error removing song from playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/remove-song-from-playlist-by-track-number/<int:track_number>', methods=['DELETE'])
@@ -307,7 +543,7 @@ def remove_song_by_track_number(track_number: int) -> Response:
         JSON response indicating success of the removal or an error message.
     """
     try:
-        app.logger.info(f"Removing song from playlist by track number: {track_number}")
+        app.logger.info("Removing song from playlist by track number: %s", track_number)
 
         # Remove song by track number
         playlist_model.remove_song_by_track_number(track_number)
@@ -315,10 +551,10 @@ def remove_song_by_track_number(track_number: int) -> Response:
         return make_response(jsonify({'status': 'success', 'message': f'Song at track number {track_number} removed from playlist'}), 200)
 
     except ValueError as e:
-        app.logger.error(f"Error removing song by track number: {e}")
+        app.logger.error("Error removing song by track number: %s", e)
         return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
-        app.logger.error(f"Error removing song from playlist: {e}")
+        app.logger.error("Error removing song from playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/clear-playlist', methods=['POST'])
@@ -338,7 +574,7 @@ def clear_playlist() -> Response:
         return make_response(jsonify({'status': 'success', 'message': 'Playlist cleared'}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error clearing the playlist: {e}")
+        app.logger.error("Error clearing the playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -374,7 +610,7 @@ def play_current_song() -> Response:
             }
         }), 200)
     except Exception as e:
-        app.logger.error(f"Error playing current song: {e}")
+        app.logger.error("Error playing current song: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -393,7 +629,7 @@ def play_entire_playlist() -> Response:
         playlist_model.play_entire_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error playing playlist: {e}")
+        app.logger.error("Error playing playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/play-rest-of-playlist', methods=['POST'])
@@ -411,7 +647,7 @@ def play_rest_of_playlist() -> Response:
         playlist_model.play_rest_of_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error playing rest of the playlist: {e}")
+        app.logger.error("Error playing rest of the playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/rewind-playlist', methods=['POST'])
@@ -429,7 +665,7 @@ def rewind_playlist() -> Response:
         playlist_model.rewind_playlist()
         return make_response(jsonify({'status': 'success'}), 200)
     except Exception as e:
-        app.logger.error(f"Error rewinding playlist: {e}")
+        app.logger.error("Error rewinding playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-all-songs-from-playlist', methods=['GET'])
@@ -449,7 +685,7 @@ def get_all_songs_from_playlist() -> Response:
         return make_response(jsonify({'status': 'success', 'songs': songs}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving songs from playlist: {e}")
+        app.logger.error("Error retrieving songs from playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-song-from-playlist-by-track-number/<int:track_number>', methods=['GET'])
@@ -464,7 +700,7 @@ def get_song_by_track_number(track_number: int) -> Response:
         JSON response with the song details or error message.
     """
     try:
-        app.logger.info(f"Retrieving song from playlist by track number: {track_number}")
+        app.logger.info("Retrieving song from playlist by track number: %s", track_number)
 
         # Get the song by track number
         song = playlist_model.get_song_by_track_number(track_number)
@@ -472,10 +708,10 @@ def get_song_by_track_number(track_number: int) -> Response:
         return make_response(jsonify({'status': 'success', 'song': song}), 200)
 
     except ValueError as e:
-        app.logger.error(f"Error retrieving song by track number: {e}")
+        app.logger.error("Error retrieving song by track number: %s", e)
         return make_response(jsonify({'error': str(e)}), 404)
     except Exception as e:
-        app.logger.error(f"Error retrieving song from playlist: {e}")
+        app.logger.error("Error retrieving song from playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-current-song', methods=['GET'])
@@ -495,7 +731,7 @@ def get_current_song() -> Response:
         return make_response(jsonify({'status': 'success', 'current_song': current_song}), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving current song: {e}")
+        app.logger.error("Error retrieving current song: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/get-playlist-length-duration', methods=['GET'])
@@ -520,7 +756,7 @@ def get_playlist_length_and_duration() -> Response:
         }), 200)
 
     except Exception as e:
-        app.logger.error(f"Error retrieving playlist length and duration: {e}")
+        app.logger.error("Error retrieving playlist length and duration: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/go-to-track-number/<int:track_number>', methods=['POST'])
@@ -535,17 +771,17 @@ def go_to_track_number(track_number: int) -> Response:
         JSON response indicating success or an error message.
     """
     try:
-        app.logger.info(f"Going to track number: {track_number}")
+        app.logger.info("Going to track number: %s", track_number)
 
         # Set the playlist to start at the given track number
         playlist_model.go_to_track_number(track_number)
 
         return make_response(jsonify({'status': 'success', 'track_number': track_number}), 200)
     except ValueError as e:
-        app.logger.error(f"Error going to track number {track_number}: {e}")
+        app.logger.error("Error going to track number %s: %s", track_number, e)
         return make_response(jsonify({'error': str(e)}), 400)
     except Exception as e:
-        app.logger.error(f"Error going to track number: {e}")
+        app.logger.error("Error going to track number: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -574,7 +810,7 @@ def move_song_to_beginning() -> Response:
         title = data.get('title')
         year = data.get('year')
 
-        app.logger.info(f"Moving song to beginning: {artist} - {title} ({year})")
+        app.logger.info("Moving song to beginning: %s - %s (%s)", artist, title, year)
 
         # Retrieve song by compound key and move it to the beginning
         song = song_model.get_song_by_compound_key(artist, title, year)
@@ -582,7 +818,7 @@ def move_song_to_beginning() -> Response:
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}'}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to beginning: {e}")
+        app.logger.error("Error moving song to beginning: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/move-song-to-end', methods=['POST'])
@@ -605,7 +841,7 @@ def move_song_to_end() -> Response:
         title = data.get('title')
         year = data.get('year')
 
-        app.logger.info(f"Moving song to end: {artist} - {title} ({year})")
+        app.logger.info("Moving song to end: %s - %s (%s)", artist, title, year)
 
         # Retrieve song by compound key and move it to the end
         song = song_model.get_song_by_compound_key(artist, title, year)
@@ -613,7 +849,7 @@ def move_song_to_end() -> Response:
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}'}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to end: {e}")
+        app.logger.error("Error moving song to end: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/move-song-to-track-number', methods=['POST'])
@@ -638,7 +874,7 @@ def move_song_to_track_number() -> Response:
         year = data.get('year')
         track_number = data.get('track_number')
 
-        app.logger.info(f"Moving song to track number {track_number}: {artist} - {title} ({year})")
+        app.logger.info("Moving song to track number %s: %s - %s (%s)", track_number, artist, title, year)
 
         # Retrieve song by compound key and move it to the specified track number
         song = song_model.get_song_by_compound_key(artist, title, year)
@@ -646,7 +882,7 @@ def move_song_to_track_number() -> Response:
 
         return make_response(jsonify({'status': 'success', 'song': f'{artist} - {title}', 'track_number': track_number}), 200)
     except Exception as e:
-        app.logger.error(f"Error moving song to track number: {e}")
+        app.logger.error("Error moving song to track number: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 @app.route('/api/swap-songs-in-playlist', methods=['POST'])
@@ -667,7 +903,7 @@ def swap_songs_in_playlist() -> Response:
         track_number_1 = data.get('track_number_1')
         track_number_2 = data.get('track_number_2')
 
-        app.logger.info(f"Swapping songs at track numbers {track_number_1} and {track_number_2}")
+        app.logger.info("Swapping songs at track numbers %s and %s", track_number_1, track_number_2)
 
         # Retrieve songs by track numbers and swap them
         song_1 = playlist_model.get_song_by_track_number(track_number_1)
@@ -682,7 +918,7 @@ def swap_songs_in_playlist() -> Response:
             }
         }), 200)
     except Exception as e:
-        app.logger.error(f"Error swapping songs in playlist: {e}")
+        app.logger.error("Error swapping songs in playlist: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 ############################################################
@@ -696,17 +932,26 @@ def get_song_leaderboard() -> Response:
     """
     Route to get a list of all sorted by play count.
 
+    Query Parameters:
+        - limit (int, optional): The page size. Returns every song if omitted.
+        - after (str, optional): The next_cursor from the previous page.
+        - fields (str, optional): A comma-separated list of the fields to return for each song.
+
     Returns:
-        JSON response with a sorted leaderboard of songs.
+        JSON response with a sorted leaderboard of songs and the cursor for the next page.
     Raises:
+        400 error if the paging parameters are invalid.
         500 error if there is an issue generating the leaderboard.
     """
     try:
         app.logger.info("Generating song leaderboard sorted")
-        leaderboard_data = song_model.get_all_songs(sort_by_play_count=True)
-        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data}), 200)
+        try:
+            leaderboard_data, next_cursor = get_song_page(sort_by_play_count=True)
+        except ValueError as e:
+            return make_response(jsonify({'error': str(e)}), 400)
+        return make_response(jsonify({'status': 'success', 'leaderboard': leaderboard_data, 'next_cursor': next_cursor}), 200)
     except Exception as e:
-        app.logger.error(f"Error generating leaderboard: {e}")
+        app.logger.error("Error generating leaderboard: %s", e)
         return make_response(jsonify({'error': str(e)}), 500)
 
 
@@ -0,0 +1,117 @@
+"""
+Benchmarks for PlaylistModel operations on playlists of 10 to 100k tracks.
+
+Run them with benchmarks/run_benchmarks.sh, which also compares against the saved baseline.
+"""
+from music_collection.models.playlist_model import PlaylistModel
+
+
+##################################################
+# Building the playlist
+##################################################
+
+def test_add_songs_to_playlist(benchmark, playlist_songs):
+    """Adding every song to an empty playlist."""
+
+    def build():
+        playlist_model = PlaylistModel()
+        for song in playlist_songs:
+            playlist_model.add_song_to_playlist(song)
+        return playlist_model
+
+    playlist_model = benchmark(build)
+    assert playlist_model.get_playlist_length() == len(playlist_songs)
+
+def test_remove_and_add_song(benchmark, playlist, rng):
+    """Removing 100 songs by track number and adding each back to the end."""
+    size = playlist.get_playlist_length()
+    track_numbers = [rng.randint(1, size) for _ in range(100)]
+
+    def remove_and_add():
+        for track_number in track_numbers:
+            song = playlist.get_song_by_track_number(track_number)
+            playlist.remove_song_by_track_number(track_number)
+            playlist.add_song_to_playlist(song)
+
+    benchmark(remove_and_add)
+    assert playlist.get_playlist_length() == size
+
+
+##################################################
+# Reading the playlist
+##################################################
+
+def test_get_song_by_track_number(benchmark, playlist, rng):
+    """Looking up 100 songs by track number."""
+    size = playlist.get_playlist_length()
+    track_numbers = [rng.randint(1, size) for _ in range(100)]
+
+    def get_songs():
+        for track_number in track_numbers:
+            playlist.get_song_by_track_number(track_number)
+
+    benchmark(get_songs)
+
+def test_get_song_by_song_id(benchmark, playlist, rng):
+    """Looking up 100 songs by song ID."""
+    size = playlist.get_playlist_length()
+    song_ids = [rng.randint(1, size) for _ in range(100)]
+
+    def get_songs():
+        for song_id in song_ids:
+            playlist.get_song_by_song_id(song_id)
+
+    benchmark(get_songs)
+
+def test_get_playlist_duration(benchmark, playlist, playlist_songs):
+    """Totalling the duration of every song."""
+    duration = benchmark(playlist.get_playlist_duration)
+    assert duration == sum(song.duration for song in playlist_songs)
+
+
+##################################################
+# Reordering the playlist
+##################################################
+
+def test_move_song_to_track_number(benchmark, playlist, rng):
+    """Moving 100 songs to random track numbers."""
+    size = playlist.get_playlist_length()
+    moves = [(rng.randint(1, size), rng.randint(1, size)) for _ in range(100)]
+
+    def move_songs():
+        for song_id, track_number in moves:
+            playlist.move_song_to_track_number(song_id, track_number)
+
+    benchmark(move_songs)
+
+def test_move_song_to_beginning(benchmark, playlist, rng):
+    """Moving 100 songs to the beginning."""
+    size = playlist.get_playlist_length()
+    song_ids = [rng.randint(1, size) for _ in range(100)]
+
+    def move_songs():
+        for song_id in song_ids:
+            playlist.move_song_to_beginning(song_id)
+
+    benchmark(move_songs)
+
+def test_swap_songs_in_playlist(benchmark, playlist, rng):
+    """Swapping 100 pairs of songs."""
+    size = playlist.get_playlist_length()
+    pairs = [tuple(rng.sample(range(1, size + 1), 2)) for _ in range(100)]
+
+    def swap_songs():
+        for song1_id, song2_id in pairs:
+            playlist.swap_songs_in_playlist(song1_id, song2_id)
+
+    benchmark(swap_songs)
+
+
+##################################################
+# Playing the playlist
+##################################################
+
+def test_play_entire_playlist(benchmark, playlist, playlist_db):
+    """Playing every track and writing the play counts to a seeded catalog."""
+    benchmark(playlist.play_entire_playlist)
+    assert playlist.current_track_number == 1
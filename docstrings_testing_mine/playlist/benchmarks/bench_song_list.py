@@ -0,0 +1,114 @@
+"""
+Compares SongList against the plain Python list PlaylistModel used to be backed by.
+
+Each benchmark runs a burst of reorders on a playlist of the given size and reports
+the mean time per operation. The list baseline does what PlaylistModel used to do:
+scan for the song, then list.remove plus list.insert.
+
+Usage:
+    python benchmarks/bench_song_list.py [--sizes 1000 10000 100000] [--ops 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from music_collection.models.song_list import SongList  # noqa: E402
+from music_collection.models.song_model import Song  # noqa: E402
+
+
+def make_songs(size: int) -> list[Song]:
+    return [Song(i, f"Artist {i}", f"Song {i}", 2000, "Pop", 180) for i in range(1, size + 1)]
+
+
+##################################################
+# List baseline (the previous implementation)
+##################################################
+
+def list_find(playlist: list, song_id: int) -> Song:
+    return next(song for song in playlist if song.id == song_id)
+
+def list_move_to_beginning(playlist: list, song_id: int) -> None:
+    song = list_find(playlist, song_id)
+    playlist.remove(song)
+    playlist.insert(0, song)
+
+def list_move_to_track_number(playlist: list, song_id: int, index: int) -> None:
+    song = list_find(playlist, song_id)
+    playlist.remove(song)
+    playlist.insert(index, song)
+
+def list_remove_and_reinsert(playlist: list, index: int) -> None:
+    song = playlist.pop(index)
+    playlist.insert(index // 2, song)
+
+def list_get_by_track_number(playlist: list, index: int) -> Song:
+    return playlist[index]
+
+
+##################################################
+# SongList
+##################################################
+
+def tree_move_to_beginning(playlist: SongList, song_id: int) -> None:
+    playlist.move(song_id, 0)
+
+def tree_move_to_track_number(playlist: SongList, song_id: int, index: int) -> None:
+    playlist.move(song_id, index)
+
+def tree_remove_and_reinsert(playlist: SongList, index: int) -> None:
+    song = playlist.pop(index)
+    playlist.insert(index // 2, song)
+
+def tree_get_by_track_number(playlist: SongList, index: int) -> Song:
+    return playlist[index]
+
+
+def time_per_op(func, playlist, args_list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        func(playlist, *args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def run(size: int, ops: int, seed: int) -> None:
+    rng = random.Random(seed)
+    songs = make_songs(size)
+    ids = [rng.randint(1, size) for _ in range(ops)]
+    indexes = [rng.randrange(size) for _ in range(ops)]
+
+    benchmarks = [
+        ("move_song_to_beginning", list_move_to_beginning, tree_move_to_beginning,
+         [(song_id,) for song_id in ids]),
+        ("move_song_to_track_number", list_move_to_track_number, tree_move_to_track_number,
+         list(zip(ids, indexes))),
+        ("remove_and_reinsert_by_track", list_remove_and_reinsert, tree_remove_and_reinsert,
+         [(index,) for index in indexes]),
+        ("get_song_by_track_number", list_get_by_track_number, tree_get_by_track_number,
+         [(index,) for index in indexes]),
+    ]
+
+    print(f"\nplaylist size {size:,} ({ops:,} operations each)")
+    print(f"{'operation':<32}{'list (us/op)':>14}{'SongList (us/op)':>18}{'speedup':>10}")
+    for name, list_func, tree_func, args_list in benchmarks:
+        list_time = time_per_op(list_func, list(songs), args_list)
+        tree_time = time_per_op(tree_func, SongList(songs), args_list)
+        print(f"{name:<32}{list_time * 1e6:>14.2f}{tree_time * 1e6:>18.2f}{list_time / tree_time:>9.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=411)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.ops, args.seed)
+
+
+if __name__ == "__main__":
+    main()
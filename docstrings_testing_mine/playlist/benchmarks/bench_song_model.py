@@ -0,0 +1,74 @@
+"""
+Benchmarks for the song catalog at 1k, 100k and 1M songs, with random.org stubbed out.
+
+Run them with benchmarks/run_benchmarks.sh, which also compares against the saved baseline.
+"""
+import pytest
+
+from music_collection.models import song_model
+from music_collection.models.song_model import (
+    get_all_songs,
+    get_random_song,
+    load_live_song_ids,
+    update_play_count,
+    update_play_counts
+)
+
+
+##################################################
+# Reading the catalog
+##################################################
+
+@pytest.mark.parametrize("sort_by_play_count", [False, True], ids=["by_id", "by_play_count"])
+def test_get_all_songs(benchmark, song_db, sort_by_play_count):
+    """The whole catalog."""
+    songs = benchmark(get_all_songs, sort_by_play_count)
+    assert songs
+
+@pytest.mark.parametrize("sort_by_play_count", [False, True], ids=["by_id", "by_play_count"])
+def test_get_all_songs_first_page(benchmark, song_db, sort_by_play_count):
+    """The first page of 100 songs."""
+    songs = benchmark(get_all_songs, sort_by_play_count, 100)
+    assert len(songs) == 100
+
+
+##################################################
+# Random songs
+##################################################
+
+def test_load_live_song_ids(benchmark, song_db):
+    """Loading the live song IDs, as on the first random pick."""
+    benchmark(load_live_song_ids)
+    assert song_model.live_song_ids.loaded
+
+def test_get_random_song(benchmark, song_db, stub_random):
+    """100 random picks once the live song IDs are loaded."""
+    load_live_song_ids()
+
+    def get_random_songs():
+        for _ in range(100):
+            get_random_song()
+
+    benchmark(get_random_songs)
+    assert stub_random.call_count >= 100
+
+
+##################################################
+# Play counts
+##################################################
+
+def test_update_play_count(benchmark, song_db, live_song_ids, rng):
+    """Incrementing 100 play counts one song at a time."""
+    song_ids = [rng.choice(live_song_ids) for _ in range(100)]
+
+    def update_each():
+        for song_id in song_ids:
+            update_play_count(song_id)
+
+    benchmark(update_each)
+
+def test_update_play_counts(benchmark, song_db, live_song_ids, rng):
+    """Incrementing 100 play counts in one batch."""
+    song_ids = [rng.choice(live_song_ids) for _ in range(100)]
+    failures = benchmark(update_play_counts, song_ids)
+    assert failures == {}
@@ -0,0 +1,148 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+from music_collection.models import song_model
+from music_collection.models.playlist_model import PlaylistModel
+from music_collection.models.song_model import Song
+from music_collection.utils import sql_utils
+from music_collection.utils.logger import parse_level, setup_logging
+
+
+SQL_CREATE_TABLE = os.path.join(os.path.dirname(__file__), "..", "sql", "create_song_table.sql")
+
+# The number of songs in each seeded catalog, as "1000,100000"
+DB_SIZES = [int(size) for size in os.getenv("BENCH_DB_SIZES", "1000,100000,1000000").split(",")]
+# The number of tracks in each benchmarked playlist
+PLAYLIST_SIZES = [int(size) for size in os.getenv("BENCH_PLAYLIST_SIZES", "10,1000,100000").split(",")]
+# Logging is kept out of the timings unless asked for
+BENCH_LOG_LEVEL = os.getenv("BENCH_LOG_LEVEL", "WARNING")
+# Seeds the catalog and the stubbed random numbers, so every run measures the same work
+BENCH_SEED = int(os.getenv("BENCH_SEED", "411"))
+
+GENRES = ("Rock", "Pop", "Jazz", "Hip-Hop", "Classical", "Country", "Electronic", "Folk")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_logging():
+    """Sets the log level for the benchmark session and restores the usual one afterwards."""
+    setup_logging(level=parse_level(BENCH_LOG_LEVEL), force=True)
+    yield
+    setup_logging(force=True)
+
+
+def generate_songs(num_songs: int, deleted_share: float = 0.05, seed: int = BENCH_SEED):
+    """
+    Yields (artist, title, year, genre, duration, play_count, deleted) rows for a seeded catalog.
+
+    Song i always gets ID i. By default 1 in 20 songs is deleted, so reads have something to skip.
+    """
+    rng = random.Random(seed)
+    for i in range(1, num_songs + 1):
+        yield (
+            f"Artist {i % 5000}",
+            f"Song {i}",
+            rng.randint(1950, 2024),
+            rng.choice(GENRES),
+            rng.randint(90, 420),
+            rng.randint(0, 1000),
+            rng.random() < deleted_share,
+        )
+
+
+def seed_database(path: str, num_songs: int, deleted_share: float = 0.05) -> None:
+    """Creates a songs database at path holding num_songs seeded songs."""
+    conn = sqlite3.connect(path)
+    with open(SQL_CREATE_TABLE) as f:
+        conn.executescript(f.read())
+    with conn:
+        conn.executemany("""
+            INSERT INTO songs (artist, title, year, genre, duration, play_count, deleted)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, generate_songs(num_songs, deleted_share))
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+@pytest.fixture(scope="session")
+def seeded_databases(tmp_path_factory):
+    """Builds each seeded database once per session, the first time a benchmark asks for it."""
+    directory = tmp_path_factory.mktemp("bench_db")
+    paths = {}
+
+    def get(num_songs: int, deleted_share: float = 0.05) -> str:
+        key = (num_songs, deleted_share)
+        if key not in paths:
+            path = str(directory / f"song_catalog_{num_songs}_{len(paths)}.db")
+            seed_database(path, num_songs, deleted_share)
+            paths[key] = path
+        return paths[key]
+
+    return get
+
+
+def use_database(mocker, path: str) -> None:
+    """Points sql_utils at path and drops state loaded from the previous database."""
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    song_model.live_song_ids.invalidate()
+
+
+@pytest.fixture(params=DB_SIZES, ids=lambda size: f"{size}_songs")
+def song_db(request, seeded_databases, mocker):
+    """Points sql_utils at a seeded catalog and yields its number of songs."""
+    use_database(mocker, seeded_databases(request.param))
+    yield request.param
+    sql_utils.close_connection_pool()
+    song_model.live_song_ids.invalidate()
+
+
+@pytest.fixture
+def live_song_ids(song_db) -> list:
+    """The IDs of the seeded songs that aren't deleted."""
+    conn = sqlite3.connect(sql_utils.DB_PATH)
+    ids = [row[0] for row in conn.execute("SELECT id FROM songs WHERE deleted = FALSE")]
+    conn.close()
+    return ids
+
+
+@pytest.fixture(params=PLAYLIST_SIZES, ids=lambda size: f"{size}_tracks")
+def playlist_songs(request) -> list:
+    """The songs for a playlist of each benchmarked size, with IDs 1 to the size."""
+    rng = random.Random(BENCH_SEED)
+    return [Song(i, f"Artist {i % 5000}", f"Song {i}", rng.randint(1950, 2024), rng.choice(GENRES), rng.randint(90, 420))
+            for i in range(1, request.param + 1)]
+
+
+@pytest.fixture
+def playlist(playlist_songs) -> PlaylistModel:
+    """A playlist holding playlist_songs, in order."""
+    playlist_model = PlaylistModel()
+    for song in playlist_songs:
+        playlist_model.add_song_to_playlist(song)
+    return playlist_model
+
+
+@pytest.fixture
+def playlist_db(playlist_songs, seeded_databases, mocker):
+    """Points sql_utils at a seeded catalog holding every song in the playlist, with none deleted."""
+    path = seeded_databases(len(playlist_songs), deleted_share=0)
+    use_database(mocker, path)
+    yield path
+    sql_utils.close_connection_pool()
+
+
+@pytest.fixture
+def rng() -> random.Random:
+    """A seeded generator for picking songs and tracks."""
+    return random.Random(BENCH_SEED)
+
+
+@pytest.fixture
+def stub_random(mocker):
+    """Replaces random.org with a seeded generator for picking random songs."""
+    rng = random.Random(BENCH_SEED)
+    return mocker.patch("music_collection.models.song_model.get_random",
+                        side_effect=lambda num_songs: rng.randint(1, num_songs))
@@ -0,0 +1,55 @@
+#!/bin/bash
+
+# run_benchmarks.sh - Runs the pytest-benchmark suite and compares it with the saved baseline
+#
+# Usage (from the project directory):
+#   ./benchmarks/run_benchmarks.sh           Compare against benchmarks/baseline.json and fail
+#                                            if any mean is more than BENCH_FAIL_THRESHOLD slower
+#   ./benchmarks/run_benchmarks.sh --save    Run the suite and save the results as the new baseline
+#
+# Any other arguments are passed on to pytest, e.g. -k playlist.
+# BENCH_DB_SIZES, BENCH_PLAYLIST_SIZES, BENCH_SEED and BENCH_LOG_LEVEL are read by benchmarks/conftest.py.
+# Timings depend on the machine, so save a baseline on the machine you compare on.
+
+BASELINE="benchmarks/baseline.json"
+BENCH_FAIL_THRESHOLD=${BENCH_FAIL_THRESHOLD:-"25%"}
+SAVE=false
+
+# Parse command-line arguments
+PYTEST_ARGS=()
+while [ "$#" -gt 0 ]; do
+  case $1 in
+    --save) SAVE=true ;;
+    *) PYTEST_ARGS+=("$1") ;;
+  esac
+  shift
+done
+
+cd "$(dirname "$0")/.." || exit 1
+
+# The benchmark files are named bench_*.py so the regular test run doesn't collect them
+BENCH_ARGS=(-o python_files="bench_*.py" benchmarks --benchmark-sort=name)
+
+if [ "$SAVE" = true ]; then
+  echo "Saving a new baseline to $BASELINE..."
+  python -m pytest "${BENCH_ARGS[@]}" --benchmark-json="$BASELINE" "${PYTEST_ARGS[@]}" || exit 1
+  # Comparisons only use the summary stats, so drop the per-round timings
+  python - "$BASELINE" <<'PYTHON'
+import json
+import sys
+
+with open(sys.argv[1]) as f:
+    results = json.load(f)
+for bench in results["benchmarks"]:
+    bench["stats"].pop("data", None)
+with open(sys.argv[1], "w") as f:
+    json.dump(results, f, indent=2)
+PYTHON
+elif [ -f "$BASELINE" ]; then
+  echo "Comparing against $BASELINE (failing on a mean regression over $BENCH_FAIL_THRESHOLD)..."
+  python -m pytest "${BENCH_ARGS[@]}" --benchmark-compare="$BASELINE" \
+    --benchmark-compare-fail="mean:$BENCH_FAIL_THRESHOLD" "${PYTEST_ARGS[@]}"
+else
+  echo "No baseline at $BASELINE; run with --save to create one."
+  python -m pytest "${BENCH_ARGS[@]}" "${PYTEST_ARGS[@]}"
+fi
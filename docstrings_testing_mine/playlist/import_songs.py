@@ -0,0 +1,50 @@
+"""
+Bulk-load songs into the catalog database from a CSV or NDJSON file.
+
+Usage:
+    python import_songs.py songs.csv
+    python import_songs.py songs.ndjson --db-path /app/db/song_catalog.db --batch-size 5000
+    cat songs.ndjson | python import_songs.py - --format ndjson
+
+Rows that are invalid or that duplicate an existing (artist, title, year) are reported
+on stderr and skipped. The exit status is 1 if any row was skipped.
+"""
+import argparse
+import os
+import sys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load songs into the catalog.")
+    parser.add_argument("path", help="CSV or NDJSON file to import, or - for stdin")
+    parser.add_argument("--format", choices=("csv", "ndjson"),
+                        help="input format (default: from the file extension, else ndjson)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="songs per transaction")
+    parser.add_argument("--db-path", help="database to import into (default: $DB_PATH)")
+    args = parser.parse_args()
+
+    if args.db_path:
+        os.environ["DB_PATH"] = args.db_path
+
+    # Imported after DB_PATH is set, since sql_utils reads it at import time
+    from music_collection.models.song_import import import_songs, read_songs
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    try:
+        report = import_songs(read_songs(stream, fmt), batch_size=args.batch_size)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for error in report.errors:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    print(f"Imported {report.imported} songs, skipped {len(report.errors)} rows.")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Load-test the playlist API with a realistic mix of requests and report throughput and latency.
+
+By default the app is started in-process on a free port, with a fresh catalog database in a
+temporary directory and random.org replaced by a seeded local stand-in
+(music_collection/utils/random_org_stub.py), so a run needs no network and measures only this
+service. --random-org-latency and --random-org-error-rate make the stand-in slow or flaky. Pass
+--url to load-test a server that is already running instead; its random.org calls are then
+whatever that server is configured to make.
+
+Before the run the catalog is seeded through /api/import-songs and the first --playlist-size
+songs are added to the playlist. Each worker thread then keeps one HTTP connection open and
+repeatedly picks a scenario by weight:
+
+    add          POST /api/add-song-to-playlist with one of the worker's own songs, then
+                 DELETE /api/remove-song-from-playlist with its oldest once it has more than
+                 --songs-per-worker of them in the playlist
+    play         POST /api/play-current-song
+    play_all     POST /api/play-entire-playlist (not in the default mix)
+    move         POST /api/move-song-to-track-number with one of the seeded playlist songs
+    random_song  GET /api/get-random-song
+    catalog      GET /api/get-all-songs-from-catalog for a page of 100 songs
+    leaderboard  GET /api/song-leaderboard for the top 10
+
+Workers only add and remove their own songs, so the playlist changes never conflict. The current
+track number is shared by the whole server, though, and removing a song doesn't move it back, so
+add and play flows take turns through a client-side lock: a removal only ever follows an add in
+the same turn, and play never sees the playlist shorter than when it last played. Otherwise play
+would fail with "Invalid track number" by design rather than under load. Everything else runs
+fully concurrently.
+
+Usage:
+    python loadtest.py
+    python loadtest.py --concurrency 16 --duration 60 --mix add=2,play=4,move=2,random_song=1
+    python loadtest.py --url http://localhost:5000 --json results.json
+
+The exit status is 1 if the overall error rate is above --max-error-rate.
+"""
+import argparse
+from collections import defaultdict
+import itertools
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+GENRES = ("Rock", "Pop", "Jazz", "Hip-Hop", "Classical", "Country", "Electronic", "Folk")
+
+DEFAULT_MIX = "add=3,play=4,move=3,random_song=2,catalog=1,leaderboard=1"
+
+
+##################################################
+# Results
+##################################################
+
+class Results:
+    """Latencies and errors for each endpoint, recorded by one worker."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def merge(self, other: "Results") -> None:
+        for name, latencies in other.latencies.items():
+            self.latencies[name].extend(latencies)
+        for name, errors in other.errors.items():
+            self.errors[name] += errors
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of values that are already sorted."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results: Results, elapsed: float) -> dict:
+    """Turns merged results into throughput, error rates and latency percentiles in milliseconds."""
+
+    def stats(latencies: List[float], errors: int) -> dict:
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': errors / len(latencies) if latencies else 0.0,
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+        }
+
+    endpoints = {name: stats(latencies, results.errors[name]) for name, latencies in sorted(results.latencies.items())}
+    total = stats(list(itertools.chain.from_iterable(results.latencies.values())), sum(results.errors.values()))
+    return {'elapsed_seconds': elapsed, 'total': total, 'endpoints': endpoints}
+
+
+def print_summary(summary: dict) -> None:
+    print(f"\n{'endpoint':<28}{'requests':>10}{'errors':>8}{'error %':>9}{'req/s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(summary['endpoints'].items()) + [("total", summary['total'])]
+    for name, row in rows:
+        print(f"{name:<28}{row['requests']:>10}{row['errors']:>8}{row['error_rate'] * 100:>8.2f}%"
+              f"{row['throughput']:>10.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+    print(f"\n{summary['total']['requests']} requests in {summary['elapsed_seconds']:.1f} seconds")
+
+
+##################################################
+# Client
+##################################################
+
+class Client:
+    """Makes requests on one kept-alive connection and records how each one went."""
+
+    def __init__(self, base_url: str, results: Results):
+        self.base_url = base_url.rstrip("/")
+        self.results = results
+        self.session = requests.Session()
+
+    def call(self, name: str, method: str, path: str, expect: tuple = (200,), **kwargs) -> Optional[requests.Response]:
+        """Makes a request, recording it under name. Returns the response, or None if it failed."""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            ok = response.status_code in expect
+        except requests.RequestException:
+            response, ok = None, False
+        self.results.record(name, time.perf_counter() - start, ok)
+        return response if ok else None
+
+
+class LoadContext:
+    """State shared by every worker: the seeded songs, how they are split between workers and the
+    lock add and play flows take turns on."""
+
+    def __init__(self, songs: List[dict], playlist_size: int, concurrency: int):
+        self.playlist_songs = songs[:playlist_size]
+        self.playlist_lock = threading.Lock()
+        # Worker i owns every concurrency-th song after the ones added before the run
+        self.own_songs = [songs[playlist_size + i::concurrency] for i in range(concurrency)]
+
+
+class WorkerState:
+    """The songs one worker has added to the playlist, oldest first."""
+
+    def __init__(self, own_songs: List[dict], songs_per_worker: int):
+        self.available = list(own_songs)
+        self.in_playlist: List[dict] = []
+        self.songs_per_worker = songs_per_worker
+
+
+def random_song(index: int, rng: random.Random) -> dict:
+    return {
+        'artist': f"Artist {index % 500}",
+        'title': f"Song {index}",
+        'year': rng.randint(1950, 2024),
+        'genre': rng.choice(GENRES),
+        'duration': rng.randint(90, 420),
+    }
+
+
+def song_key(song: dict) -> dict:
+    return {'artist': song['artist'], 'title': song['title'], 'year': song['year']}
+
+
+##################################################
+# Scenarios
+##################################################
+
+def add(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    if not state.available:
+        return
+
+    song = state.available.pop(rng.randrange(len(state.available)))
+    with context.playlist_lock:
+        if not client.call("add-song-to-playlist", "POST", "/api/add-song-to-playlist", expect=(201,), json=song_key(song)):
+            state.available.append(song)
+            return
+        state.in_playlist.append(song)
+
+        # Removing after adding keeps the playlist from shrinking between turns
+        if len(state.in_playlist) > state.songs_per_worker:
+            oldest = state.in_playlist.pop(0)
+            if client.call("remove-song-from-playlist", "DELETE", "/api/remove-song-from-playlist", json=song_key(oldest)):
+                state.available.append(oldest)
+
+def play(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    with context.playlist_lock:
+        client.call("play-current-song", "POST", "/api/play-current-song")
+
+def play_all(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    client.call("play-entire-playlist", "POST", "/api/play-entire-playlist")
+
+def move(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    song = rng.choice(context.playlist_songs)
+    track_number = rng.randint(1, len(context.playlist_songs))
+    client.call("move-song-to-track-number", "POST", "/api/move-song-to-track-number",
+                json={**song_key(song), 'track_number': track_number})
+
+def get_random_song(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    client.call("get-random-song", "GET", "/api/get-random-song")
+
+def catalog(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    sort_by_play_count = rng.choice(("true", "false"))
+    client.call("get-all-songs-from-catalog", "GET",
+                f"/api/get-all-songs-from-catalog?sort_by_play_count={sort_by_play_count}&limit=100")
+
+def leaderboard(client: Client, context: LoadContext, state: WorkerState, rng: random.Random) -> None:
+    client.call("song-leaderboard", "GET", "/api/song-leaderboard?limit=10")
+
+
+SCENARIOS: Dict[str, Callable[[Client, LoadContext, WorkerState, random.Random], None]] = {
+    'add': add,
+    'play': play,
+    'play_all': play_all,
+    'move': move,
+    'random_song': get_random_song,
+    'catalog': catalog,
+    'leaderboard': leaderboard,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parses scenario weights written as "name=weight,name=weight"."""
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}. Must be one of {', '.join(SCENARIOS)}.")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+        if mix[name] < 0:
+            raise ValueError(f"Invalid weight for {name}: {weight}")
+    if not any(mix.values()):
+        raise ValueError("At least one scenario needs a positive weight.")
+    return mix
+
+
+##################################################
+# Running
+##################################################
+
+def seed_catalog(base_url: str, catalog_size: int, playlist_size: int, rng: random.Random) -> List[dict]:
+    """Imports the songs the scenarios use and starts the playlist with the first playlist_size of them."""
+    run_id = f"{rng.randrange(16 ** 6):06x}"
+    songs = [random_song(i, rng) for i in range(1, catalog_size + 1)]
+    for song in songs:
+        song['title'] = f"{song['title']} ({run_id})"
+
+    session = requests.Session()
+    body = "\n".join(json.dumps(song) for song in songs)
+    response = session.post(f"{base_url}/api/import-songs?format=ndjson", data=body.encode(), timeout=120,
+                            headers={'Content-Type': 'application/x-ndjson'})
+    response.raise_for_status()
+    if response.json()['errors']:
+        raise RuntimeError(f"Could not seed {len(response.json()['errors'])} songs: {response.json()['errors'][0]}")
+
+    session.post(f"{base_url}/api/clear-playlist", timeout=30).raise_for_status()
+    for song in songs[:playlist_size]:
+        session.post(f"{base_url}/api/add-song-to-playlist", json=song_key(song), timeout=30).raise_for_status()
+    return songs
+
+
+def run_load(base_url: str, mix: Dict[str, float], concurrency: int, duration: float, catalog_size: int,
+             playlist_size: int, songs_per_worker: int, seed: int) -> dict:
+    """Seeds the catalog, runs concurrency workers for duration seconds and summarizes the results."""
+    rng = random.Random(seed)
+    context = LoadContext(seed_catalog(base_url, catalog_size, playlist_size, rng), playlist_size, concurrency)
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    worker_results = [Results() for _ in range(concurrency)]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def worker(index: int) -> None:
+        worker_rng = random.Random(seed + index + 1)
+        client = Client(base_url, worker_results[index])
+        state = WorkerState(context.own_songs[index], songs_per_worker)
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[worker_rng.choices(names, weights)[0]]
+            scenario(client, context, state, worker_rng)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    results = Results()
+    for result in worker_results:
+        results.merge(result)
+    return summarize(results, elapsed)
+
+
+def start_local_server(seed: int, log_level: str, random_org_latency: float, random_org_error_rate: float):
+    """
+    Starts the app in a background thread on a free port, against a fresh temporary catalog.
+
+    random.org is replaced by a seeded music_collection.utils.random_org_stub server with the given
+    latency and error rate. The settings in .env are used, except for the database path, the log
+    level and the random.org URL. Returns the app server and the random.org server.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(HERE, ".env"))
+    directory = tempfile.mkdtemp(prefix="playlist_loadtest_")
+    db_path = os.path.join(directory, "song_catalog.db")
+    with open(os.path.join(HERE, "sql", "create_song_table.sql")) as f:
+        conn = sqlite3.connect(db_path)
+        conn.executescript(f.read())
+        conn.close()
+    os.environ["DB_PATH"] = db_path
+    os.environ["LOG_LEVEL"] = log_level
+
+    # Imported after the environment is set, since the modules read it at import time
+    from music_collection.utils.random_org_stub import start_server
+
+    random_org = start_server(seed=seed, latency=random_org_latency, error_rate=random_org_error_rate)
+    os.environ["RANDOM_ORG_BASE_URL"] = f"http://127.0.0.1:{random_org.server_port}"
+    from werkzeug.serving import make_server
+    import app
+
+    # werkzeug logs every request at INFO unless its logger has a level of its own
+    logging.getLogger("werkzeug").setLevel(log_level)
+
+    server = make_server("127.0.0.1", 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, random_org
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: start one in-process)")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of worker threads")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--catalog-size", type=int, default=1000, help="songs to import before the run")
+    parser.add_argument("--playlist-size", type=int, default=20, help="songs in the playlist before the run")
+    parser.add_argument("--songs-per-worker", type=int, default=25, help="most songs each worker keeps in the playlist")
+    parser.add_argument("--seed", type=int, default=411, help="seed for the scenario picks and the random.org stub")
+    parser.add_argument("--log-level", default="WARNING", help="log level of the in-process server")
+    parser.add_argument("--random-org-latency", type=float, default=0.0,
+                        help="seconds the random.org stand-in waits before each answer")
+    parser.add_argument("--random-org-error-rate", type=float, default=0.0,
+                        help="share of requests the random.org stand-in fails")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="fail if more requests than this fail")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.concurrency < 1 or args.duration <= 0 or args.playlist_size < 1 or args.songs_per_worker < 1:
+        print("error: --concurrency, --duration, --playlist-size and --songs-per-worker must be positive", file=sys.stderr)
+        return 2
+    if args.catalog_size < args.playlist_size:
+        print("error: --catalog-size must be at least --playlist-size", file=sys.stderr)
+        return 2
+
+    servers = []
+    base_url = args.url
+    if base_url is None:
+        try:
+            servers = start_local_server(args.seed, args.log_level, args.random_org_latency, args.random_org_error_rate)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        base_url = f"http://127.0.0.1:{servers[0].server_port}"
+
+    print(f"Load testing {base_url} with {args.concurrency} workers for {args.duration:g} seconds...")
+    try:
+        summary = run_load(base_url.rstrip("/"), mix, args.concurrency, args.duration, args.catalog_size,
+                           args.playlist_size, args.songs_per_worker, args.seed)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'url': base_url, 'concurrency': args.concurrency, 'mix': mix, **summary}, f, indent=2)
+
+    return 1 if summary['total']['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
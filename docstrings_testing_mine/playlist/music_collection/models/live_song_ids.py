@@ -0,0 +1,129 @@
+import threading
+from typing import Iterable, List, Optional
+
+
+class LiveSongIds:
+    """
+    A dense array of the IDs of every non-deleted song, for picking a random song in O(1).
+
+    IDs are kept in an unordered list with an id-to-position map. A new ID is appended and a
+    deleted one is overwritten by the last ID in the list, so adding, removing and picking by
+    position are all constant time and the list never has holes. The array only sees changes
+    made through this process, so it also records the catalog version it was loaded at: the
+    schema version and the highest song ID. IDs come from AUTOINCREMENT and are never reused,
+    so a song inserted by any connection raises the highest ID and recreating the table changes
+    the schema version. Callers compare the version with the database's through is_current().
+
+    Attributes:
+        loaded (bool): Whether the array has been filled from the database.
+        schema_version (int, optional): The database schema version when the array was loaded.
+        max_id (int, optional): The highest song ID known to exist, deleted or not.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty, unloaded array.
+        """
+        self._lock = threading.Lock()
+        self._ids: List[int] = []
+        self._positions: dict[int, int] = {}
+        self.loaded = False
+        self.schema_version: Optional[int] = None
+        self.max_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, song_ids: Iterable[int], schema_version: Optional[int] = None,
+             max_id: Optional[int] = None) -> None:
+        """
+        Replaces the contents of the array with the given song IDs.
+
+        Args:
+            song_ids (Iterable[int]): The IDs of every non-deleted song.
+            schema_version (int, optional): The schema version, read before the IDs.
+            max_id (int, optional): The highest song ID in the table, read before the IDs.
+        """
+        with self._lock:
+            self._ids = list(dict.fromkeys(song_ids))
+            self._positions = {song_id: position for position, song_id in enumerate(self._ids)}
+            self.schema_version = schema_version
+            self.max_id = max_id
+            self.loaded = True
+
+    def is_current(self, schema_version: int, max_id: Optional[int]) -> bool:
+        """
+        Checks whether the array is loaded and nothing has been inserted since, by any connection.
+
+        Deletes made elsewhere are not detected; get_random_song retries when it picks one.
+
+        Args:
+            schema_version (int): The database's current schema version.
+            max_id (int, optional): The highest song ID now in the table, or None if it is empty.
+
+        Returns:
+            bool: False if the array should be reloaded.
+        """
+        with self._lock:
+            return self.loaded and self.schema_version == schema_version and self.max_id == max_id
+
+    def invalidate(self) -> None:
+        """
+        Empties the array and marks it as unloaded.
+        """
+        with self._lock:
+            self._ids = []
+            self._positions = {}
+            self.loaded = False
+            self.schema_version = None
+            self.max_id = None
+
+    def add(self, song_id: int) -> None:
+        """
+        Adds a song ID, if it is not already present.
+
+        Args:
+            song_id (int): The ID of the new song.
+        """
+        with self._lock:
+            if song_id not in self._positions:
+                self._positions[song_id] = len(self._ids)
+                self._ids.append(song_id)
+            # Our own insert shouldn't make the array look stale
+            if self.max_id is not None and song_id > self.max_id:
+                self.max_id = song_id
+
+    def discard(self, song_id: int) -> None:
+        """
+        Removes a song ID, if it is present.
+
+        Args:
+            song_id (int): The ID of the deleted song.
+        """
+        with self._lock:
+            position = self._positions.pop(song_id, None)
+            if position is None:
+                return
+            # Fill the hole with the last ID
+            last_id = self._ids.pop()
+            if last_id != song_id:
+                self._ids[position] = last_id
+                self._positions[last_id] = position
+
+    def get(self, position: int) -> Optional[int]:
+        """
+        Returns the ID at the given 0-based position, or None if the position is out of range.
+
+        The array can shrink between reading its length and calling this, so callers should
+        treat None as a reason to try again.
+
+        Args:
+            position (int): The position to read.
+
+        Returns:
+            Optional[int]: The song ID.
+        """
+        with self._lock:
+            if 0 <= position < len(self._ids):
+                return self._ids[position]
+            return None
@@ -1,10 +1,14 @@
 import logging
+import time
 from typing import List
-from music_collection.models.song_model import Song, update_play_count
-from music_collection.utils.logger import configure_logger
+from music_collection.models.song_list import SongList
+from music_collection.models.song_model import Song, update_play_count, update_play_counts
+from music_collection.utils.logger import configure_logger, get_loop_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
+# Per-track messages are sampled and rate limited so long playlists don't flood the log
+loop_logger = get_loop_logger(__name__)
 
 
 class PlaylistModel:
@@ -13,7 +17,7 @@ class PlaylistModel:
 
     Attributes:
         current_track_number (int): The current track number being played.
-        playlist (List[Song]): The list of songs in the playlist.
+        playlist (SongList): The songs in the playlist, kept in an order-statistics tree and indexed by song ID.
 
     """
 
@@ -22,7 +26,7 @@ class PlaylistModel:
         Initializes the PlaylistModel with an empty playlist and the current track set to 1.
         """
         self.current_track_number = 1
-        self.playlist: List[Song] = []
+        self.playlist = SongList()
 
     ##################################################
     # Song Management Functions
@@ -45,7 +49,7 @@ class PlaylistModel:
             raise TypeError("Song is not a valid song")
 
         song_id = self.validate_song_id(song.id, check_in_playlist=False)
-        if song_id in [song_in_playlist.id for song_in_playlist in self.playlist]:
+        if self.playlist.contains_id(song_id):
             logger.error("Song with ID %d already exists in the playlist", song.id)
             raise ValueError(f"Song with ID {song.id} already exists in the playlist")
 
@@ -64,7 +68,7 @@ class PlaylistModel:
         logger.info("Removing song with id %d from playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        self.playlist = [song_in_playlist for song_in_playlist in self.playlist if song_in_playlist.id != song_id]
+        del self.playlist[self.playlist.position(song_id)]
         logger.info("Song with id %d has been removed", song_id)
 
     def remove_song_by_track_number(self, track_number: int) -> None:
@@ -103,7 +107,7 @@ class PlaylistModel:
         """
         self.check_if_empty()
         logger.info("Getting all songs in the playlist")
-        return self.playlist
+        return list(self.playlist)
 
     def get_song_by_song_id(self, song_id: int) -> Song:
         """
@@ -118,7 +122,7 @@ class PlaylistModel:
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
         logger.info("Getting song with id %d from playlist", song_id)
-        return next((song for song in self.playlist if song.id == song_id), None)
+        return self.playlist.get(song_id)
 
     def get_song_by_track_number(self, track_number: int) -> Song:
         """
@@ -181,9 +185,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the beginning of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(0, song)
+        self.playlist.move(song_id, 0)
         logger.info("Song with ID %d has been moved to the beginning", song_id)
 
     def move_song_to_end(self, song_id: int) -> None:
@@ -196,9 +198,7 @@ class PlaylistModel:
         logger.info("Moving song with ID %d to the end of the playlist", song_id)
         self.check_if_empty()
         song_id = self.validate_song_id(song_id)
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.append(song)
+        self.playlist.move(song_id, self.get_playlist_length() - 1)
         logger.info("Song with ID %d has been moved to the end", song_id)
 
     def move_song_to_track_number(self, song_id: int, track_number: int) -> None:
@@ -214,9 +214,7 @@ class PlaylistModel:
         song_id = self.validate_song_id(song_id)
         track_number = self.validate_track_number(track_number)
         playlist_index = track_number - 1
-        song = self.get_song_by_song_id(song_id)
-        self.playlist.remove(song)
-        self.playlist.insert(playlist_index, song)
+        self.playlist.move(song_id, playlist_index)
         logger.info("Song with ID %d has been moved to track number %d", song_id, track_number)
 
     def swap_songs_in_playlist(self, song1_id: int, song2_id: int) -> None:
@@ -239,11 +237,7 @@ class PlaylistModel:
             logger.error("Cannot swap a song with itself, both song IDs are the same: %d", song1_id)
             raise ValueError(f"Cannot swap a song with itself, both song IDs are the same: {song1_id}")
 
-        song1 = self.get_song_by_song_id(song1_id)
-        song2 = self.get_song_by_song_id(song2_id)
-        index1 = self.playlist.index(song1)
-        index2 = self.playlist.index(song2)
-        self.playlist[index1], self.playlist[index2] = self.playlist[index2], self.playlist[index1]
+        self.playlist.swap_ids(song1_id, song2_id)
         logger.info("Swapped songs with IDs %d and %d", song1_id, song2_id)
 
     ##################################################
@@ -274,14 +268,15 @@ class PlaylistModel:
         Side-effects:
             Resets the current track number to 1.
             Updates the play count for each song.
+
+        Raises:
+            ValueError: If the play count of one or more songs could not be updated.
         """
         self.check_if_empty()
         logger.info("Starting to play the entire playlist.")
         self.current_track_number = 1
         logger.info("Reset current track number to 1.")
-        for _ in range(self.get_playlist_length()):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        self._play_tracks_from(1)
         logger.info("Finished playing the entire playlist. Current track number reset to 1.")
 
     def play_rest_of_playlist(self) -> None:
@@ -291,14 +286,44 @@ class PlaylistModel:
         Side-effects:
             Updates the current track number back to 1.
             Updates the play count for each song in the rest of the playlist.
+
+        Raises:
+            ValueError: If the play count of one or more songs could not be updated.
         """
         self.check_if_empty()
         logger.info("Starting to play the rest of the playlist from track number: %d", self.current_track_number)
-        for _ in range(self.get_playlist_length() - self.current_track_number + 1):
-            logger.info("Playing track number: %d", self.current_track_number)
-            self.play_current_song()
+        self._play_tracks_from(self.current_track_number)
         logger.info("Finished playing the rest of the playlist. Current track number reset to 1.")
 
+    def _play_tracks_from(self, track_number: int) -> None:
+        """
+        Plays every track from the given track number to the end of the playlist.
+
+        The play counts are written in one batch, and the current track number wraps
+        back to 1 afterwards, as if each song had been played in turn.
+
+        Args:
+            track_number (int): The track number to start playing from.
+
+        Raises:
+            ValueError: If the play count of one or more songs could not be updated.
+        """
+        start = time.monotonic()
+        songs = self.playlist[track_number - 1:]
+        for offset, song in enumerate(songs):
+            loop_logger.info("Playing song: %s (ID: %d) at track number: %d", song.title, song.id, track_number + offset)
+
+        failures = update_play_counts([song.id for song in songs])
+        self.current_track_number = 1
+
+        if failures:
+            for song_id, error in failures.items():
+                logger.error("Failed to update play count for song with ID %d: %s", song_id, error)
+            raise ValueError(f"Failed to update play count for {len(failures)} song(s): " + "; ".join(failures.values()))
+
+        logger.info("Played %d songs from track number %d and updated their play counts in %.3f seconds",
+                    len(songs), track_number, time.monotonic() - start)
+
     def rewind_playlist(self) -> None:
         """
         Rewinds the playlist to the beginning.
@@ -333,7 +358,7 @@ class PlaylistModel:
             raise ValueError(f"Invalid song id: {song_id}")
 
         if check_in_playlist:
-            if song_id not in [song_in_playlist.id for song_in_playlist in self.playlist]:
+            if not self.playlist.contains_id(song_id):
                 logger.error("Song with id %d not found in playlist", song_id)
                 raise ValueError(f"Song with id {song_id} not found in playlist")
 
@@ -0,0 +1,260 @@
+import csv
+from dataclasses import dataclass, field
+import json
+import logging
+import sqlite3
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from music_collection.models import song_model
+from music_collection.utils.logger import configure_logger
+from music_collection.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_COLUMNS = ("artist", "title", "year", "genre", "duration")
+
+
+@dataclass
+class ImportReport:
+    """
+    The outcome of a bulk import.
+
+    Attributes:
+        imported (int): The number of songs added to the catalog.
+        errors (List[dict]): One {"line": int, "error": str} entry for each row that was skipped.
+        stopped_at (int, optional): The line at which the input became unreadable, if it did.
+                                    Rows before it were imported or reported; nothing after it was read.
+    """
+    imported: int = 0
+    errors: List[dict] = field(default_factory=list)
+    stopped_at: Optional[int] = None
+
+    def add_error(self, line: int, message: str) -> None:
+        self.errors.append({"line": line, "error": message})
+
+
+def read_songs(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Reads song records from a CSV or NDJSON stream one line at a time.
+
+    CSV input must have a header row naming the artist, title, year, genre and duration
+    columns. NDJSON input has one JSON object per line; blank lines are skipped.
+
+    Args:
+        stream (TextIO): The input.
+        fmt (str): "csv" or "ndjson".
+
+    Returns:
+        Iterator[Tuple[int, Any]]: (line number, record) pairs. A record is a dict, or the
+                                   ValueError raised while parsing that line.
+
+    Raises:
+        ValueError: If the format is unknown or the CSV header is missing columns.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        # Checked now rather than on the first read, so a bad header is rejected before anything is imported
+        missing = [column for column in IMPORT_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+        return _read_csv(reader)
+    if fmt == "ndjson":
+        return _read_ndjson(stream)
+    raise ValueError(f"Invalid import format: {fmt} (must be one of {', '.join(IMPORT_FORMATS)}).")
+
+
+def _read_csv(reader: csv.DictReader) -> Iterator[Tuple[int, Any]]:
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _read_ndjson(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError("Each line must be a JSON object")
+            continue
+        yield line_number, record
+
+
+def validate_song_record(record: dict) -> Tuple[str, str, int, str, int]:
+    """
+    Checks a song record and converts it into a row for the songs table.
+
+    A row must satisfy both the table's CHECK constraints and Song.__post_init__, so the year
+    must be after 1900 and the duration must be positive.
+
+    Args:
+        record (dict): The record, with string or integer values.
+
+    Returns:
+        Tuple[str, str, int, str, int]: The (artist, title, year, genre, duration) row.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    values = []
+    for column in ("artist", "title"):
+        value = record.get(column)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Invalid {column}: {value!r} (must be a non-empty string).")
+        values.append(value)
+
+    year = _to_int(record.get("year"))
+    if year is None or year <= 1900:
+        raise ValueError(f"Invalid year provided: {record.get('year')!r} (must be an integer greater than 1900).")
+
+    genre = record.get("genre")
+    if not isinstance(genre, str) or not genre.strip():
+        raise ValueError(f"Invalid genre: {genre!r} (must be a non-empty string).")
+
+    duration = _to_int(record.get("duration"))
+    if duration is None or duration <= 0:
+        raise ValueError(f"Invalid song duration: {record.get('duration')!r} (must be a positive integer).")
+
+    return values[0], values[1], year, genre, duration
+
+
+def _to_int(value: Any):
+    # CSV values arrive as strings; JSON numbers must already be integers
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return None
+
+
+def import_songs(records: Iterable[Tuple[int, Any]], batch_size: int = 1000) -> ImportReport:
+    """
+    Adds songs to the catalog in bulk.
+
+    Records are validated as they are read and inserted batch_size at a time, with one
+    executemany and one commit per batch. Invalid records and songs that clash with an
+    existing (artist, title, year) are reported and skipped without aborting the batch.
+    If the input itself becomes unreadable (bad UTF-8 or a malformed CSV), the rows read so
+    far are still imported, reading stops and the report's stopped_at is set.
+
+    Args:
+        records (Iterable[Tuple[int, Any]]): (line number, record) pairs, as produced by read_songs.
+        batch_size (int): How many songs to insert per transaction.
+
+    Returns:
+        ImportReport: How many songs were imported and why any rows were skipped.
+
+    Raises:
+        ValueError: If the batch size is invalid.
+        sqlite3.Error: If there is a database error other than a duplicate song.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size} (must be a positive integer).")
+
+    report = ImportReport()
+    batch: List[Tuple[int, tuple]] = []
+    records = iter(records)
+    line_number = 0
+
+    try:
+        while True:
+            try:
+                line_number, record = next(records)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as e:
+                # The stream can't be resumed, so stop at the first line we couldn't read
+                report.stopped_at = line_number + 1
+                report.add_error(report.stopped_at, f"Could not read the input: {e}")
+                logger.warning("Stopped importing songs at line %d: %s", report.stopped_at, str(e))
+                break
+
+            if isinstance(record, Exception):
+                report.add_error(line_number, str(record))
+                continue
+            try:
+                batch.append((line_number, validate_song_record(record)))
+            except ValueError as e:
+                report.add_error(line_number, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                _insert_batch(batch, report)
+                batch = []
+
+        if batch:
+            _insert_batch(batch, report)
+
+    finally:
+        if report.imported:
+            # The new IDs aren't known after executemany, so reload on the next random pick
+            song_model.live_song_ids.invalidate()
+
+    logger.info("Imported %d songs (%d rows skipped)", report.imported, len(report.errors))
+    return report
+
+
+def _insert_batch(batch: List[Tuple[int, tuple]], report: ImportReport) -> None:
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Find the songs that already exist with one indexed lookup
+            keys = json.dumps([row[:3] for _, row in batch])
+            cursor.execute("""
+                SELECT artist, title, year
+                FROM songs
+                WHERE (artist, title, year) IN (
+                    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+                    FROM json_each(?)
+                )
+            """, (keys,))
+            seen = set(cursor.fetchall())
+
+            rows = []
+            for line_number, row in batch:
+                if row[:3] in seen:
+                    artist, title, year = row[:3]
+                    report.add_error(line_number, f"Song with artist '{artist}', title '{title}', and year {year} already exists.")
+                    continue
+                seen.add(row[:3])
+                rows.append((line_number, row))
+
+            try:
+                cursor.executemany("""
+                    INSERT INTO songs (artist, title, year, genre, duration)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [row for _, row in rows])
+                conn.commit()
+                report.imported += len(rows)
+            except sqlite3.IntegrityError:
+                # Another writer added one of these songs since the check; fall back to row by row
+                conn.rollback()
+                _insert_rows(cursor, rows, report)
+                conn.commit()
+
+    except sqlite3.Error as e:
+        logger.error("Database error while importing songs: %s", str(e))
+        raise e
+
+
+def _insert_rows(cursor: sqlite3.Cursor, rows: List[Tuple[int, tuple]], report: ImportReport) -> None:
+    for line_number, row in rows:
+        try:
+            cursor.execute("""
+                INSERT INTO songs (artist, title, year, genre, duration)
+                VALUES (?, ?, ?, ?, ?)
+            """, row)
+            report.imported += 1
+        except sqlite3.IntegrityError:
+            artist, title, year = row[:3]
+            report.add_error(line_number, f"Song with artist '{artist}', title '{title}', and year {year} already exists.")
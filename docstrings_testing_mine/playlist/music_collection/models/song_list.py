@@ -0,0 +1,352 @@
+from itertools import islice
+import random
+from typing import Iterable, Iterator, List, Optional
+
+from music_collection.models.song_model import Song
+
+
+# Priorities only need to be random, not secure
+_priorities = random.Random()
+
+
+class _Node:
+    """
+    A node of the implicit treap backing SongList.
+
+    A node's position is not stored. It is the number of nodes before it in an in-order
+    walk, which is recovered from the subtree sizes.
+    """
+
+    __slots__ = ("song", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, song: Song):
+        self.song = song
+        self.priority = _priorities.random()
+        self.size = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.parent: Optional["_Node"] = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> None:
+    # Recompute the subtree size and repair the children's parent links
+    node.size = 1
+    if node.left is not None:
+        node.size += node.left.size
+        node.left.parent = node
+    if node.right is not None:
+        node.size += node.right.size
+        node.right.parent = node
+
+
+def _split(node: Optional[_Node], count: int):
+    """
+    Splits a treap into one holding its first count nodes and one holding the rest.
+    """
+    if node is None:
+        return None, None
+    if _size(node.left) < count:
+        left, right = _split(node.right, count - _size(node.left) - 1)
+        node.right = left
+        _update(node)
+        if right is not None:
+            right.parent = None
+        return node, right
+    left, right = _split(node.left, count)
+    node.left = right
+    _update(node)
+    if left is not None:
+        left.parent = None
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """
+    Concatenates two treaps, keeping every node of left before every node of right.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class SongList:
+    """
+    An ordered list of songs indexed by song ID.
+
+    Behaves like a list of Song objects. The order is kept in an implicit treap, a
+    randomized balanced binary tree keyed by position. Getting, inserting and removing a
+    song at a track position take O(log n) expected time instead of O(n), so moving a
+    song is O(log n). An id-to-node map gives constant-time membership checks and lookups
+    by ID, and a song's position is found in O(log n) by walking up from its node. Song
+    IDs must be unique within the list.
+
+    Attributes:
+        _root (_Node): The root of the treap, or None if the list is empty.
+        _nodes (dict[int, _Node]): Maps each song ID to the node holding it.
+
+    """
+
+    def __init__(self, songs: Optional[Iterable[Song]] = None):
+        """
+        Initializes the list, optionally with an initial sequence of songs.
+
+        Args:
+            songs (Iterable[Song], optional): The songs to add, in order.
+        """
+        self._root: Optional[_Node] = None
+        self._nodes: dict[int, _Node] = {}
+        if songs is not None:
+            self.extend(songs)
+
+    ##################################################
+    # List Interface
+    ##################################################
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[Song]:
+        return self._iter_from(0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            if not positions:
+                return []
+            # Walk only the span the slice covers, from its lowest position
+            first = min(positions[0], positions[-1])
+            songs = list(islice(self._iter_from(first), 0, len(positions) * abs(positions.step), abs(positions.step)))
+            return songs if positions.step > 0 else songs[::-1]
+        return self._node_at(self._normalize_index(index)).song
+
+    def __setitem__(self, index: int, song: Song) -> None:
+        node = self._node_at(self._normalize_index(index))
+        if song.id != node.song.id:
+            self._check_not_present(song.id)
+            del self._nodes[node.song.id]
+        node.song = song
+        self._nodes[song.id] = node
+
+    def __delitem__(self, index: int) -> None:
+        self.pop(index)
+
+    def __contains__(self, song: Song) -> bool:
+        node = self._nodes.get(song.id)
+        return node is not None and node.song == song
+
+    def __repr__(self) -> str:
+        return f"SongList({list(self)!r})"
+
+    def append(self, song: Song) -> None:
+        """
+        Adds a song to the end of the list.
+
+        Raises:
+            ValueError: If a song with the same ID is already in the list.
+        """
+        self.insert(len(self), song)
+
+    def extend(self, songs: Iterable[Song]) -> None:
+        """
+        Adds several songs to the end of the list, in order.
+
+        Raises:
+            ValueError: If a song with the same ID is already in the list.
+        """
+        for song in songs:
+            self.append(song)
+
+    def insert(self, index: int, song: Song) -> None:
+        """
+        Inserts a song before the given 0-based position.
+
+        Raises:
+            ValueError: If a song with the same ID is already in the list.
+        """
+        self._check_not_present(song.id)
+        length = len(self)
+        index = max(0, min(length, index if index >= 0 else length + index))
+
+        node = _Node(song)
+        self._nodes[song.id] = node
+        left, right = _split(self._root, index)
+        self._set_root(_merge(_merge(left, node), right))
+
+    def pop(self, index: int = -1) -> Song:
+        """
+        Removes and returns the song at the given 0-based position.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        index = self._normalize_index(index)
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._set_root(_merge(left, right))
+        del self._nodes[node.song.id]
+        return node.song
+
+    def remove(self, song: Song) -> None:
+        """
+        Removes the given song from the list.
+
+        Raises:
+            ValueError: If the song is not in the list.
+        """
+        self.pop(self.index(song))
+
+    def index(self, song: Song) -> int:
+        """
+        Returns the 0-based position of the given song.
+
+        Raises:
+            ValueError: If the song is not in the list.
+        """
+        if song not in self:
+            raise ValueError(f"Song with ID {song.id} is not in the list")
+        return self.position(song.id)
+
+    def clear(self) -> None:
+        """
+        Removes every song from the list.
+        """
+        self._root = None
+        self._nodes.clear()
+
+    ##################################################
+    # ID Lookups
+    ##################################################
+
+    def contains_id(self, song_id: int) -> bool:
+        """
+        Returns True if a song with the given ID is in the list.
+        """
+        return song_id in self._nodes
+
+    def get(self, song_id: int) -> Optional[Song]:
+        """
+        Returns the song with the given ID, or None if it is not in the list.
+        """
+        node = self._nodes.get(song_id)
+        return node.song if node is not None else None
+
+    def position(self, song_id: int) -> int:
+        """
+        Returns the 0-based position of the song with the given ID.
+
+        Raises:
+            KeyError: If no song with that ID is in the list.
+        """
+        node = self._nodes[song_id]
+        position = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                position += _size(node.parent.left) + 1
+            node = node.parent
+        return position
+
+    def move(self, song_id: int, index: int) -> None:
+        """
+        Moves the song with the given ID to a new 0-based position.
+
+        Raises:
+            KeyError: If no song with that ID is in the list.
+        """
+        song = self.pop(self.position(song_id))
+        self.insert(index, song)
+
+    def swap_ids(self, song1_id: int, song2_id: int) -> None:
+        """
+        Swaps the positions of the songs with the given IDs.
+
+        Raises:
+            KeyError: If no song with either ID is in the list.
+        """
+        node1 = self._nodes[song1_id]
+        node2 = self._nodes[song2_id]
+        node1.song, node2.song = node2.song, node1.song
+        self._nodes[node1.song.id] = node1
+        self._nodes[node2.song.id] = node2
+
+    def swap(self, index1: int, index2: int) -> None:
+        """
+        Swaps the songs at two 0-based positions.
+
+        Raises:
+            IndexError: If either position is out of range.
+        """
+        node1 = self._node_at(self._normalize_index(index1))
+        node2 = self._node_at(self._normalize_index(index2))
+        node1.song, node2.song = node2.song, node1.song
+        self._nodes[node1.song.id] = node1
+        self._nodes[node2.song.id] = node2
+
+    ##################################################
+    # Helpers
+    ##################################################
+
+    def _check_not_present(self, song_id: int) -> None:
+        if song_id in self._nodes:
+            raise ValueError(f"Song with ID {song_id} already exists in the list")
+
+    def _normalize_index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("SongList index out of range")
+        return index
+
+    def _iter_from(self, index: int) -> Iterator[Song]:
+        # In-order walk without recursion, starting at the given position. The stack starts
+        # as the path to that node, keeping only the nodes still to be visited.
+        stack: List[_Node] = []
+        node = self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if index <= left_size:
+                stack.append(node)
+                if index == left_size:
+                    break
+                node = node.left
+            else:
+                index -= left_size + 1
+                node = node.right
+        node = None
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.song
+            node = node.right
+
+    def _node_at(self, index: int) -> _Node:
+        # Descend using subtree sizes; index must already be in range
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def _set_root(self, root: Optional[_Node]) -> None:
+        if root is not None:
+            root.parent = None
+        self._root = root
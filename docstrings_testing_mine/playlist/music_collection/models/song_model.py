@@ -1,15 +1,27 @@
 from dataclasses import dataclass
+import json
 import logging
 import sqlite3
-from typing import Any
+from typing import Any, Iterator, List, Optional, Tuple
 
-from music_collection.utils.logger import configure_logger
+from music_collection.models.live_song_ids import LiveSongIds
+from music_collection.utils.logger import configure_logger, get_loop_logger
+from music_collection.utils.pagination import decode_cursor, encode_cursor, parse_fields
 from music_collection.utils.random_utils import get_random
 from music_collection.utils.sql_utils import get_db_connection
 
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
+# For messages logged on every play, which are sampled and rate limited
+loop_logger = get_loop_logger(__name__)
+
+
+# IDs of the non-deleted songs, for picking a random song without reading the whole catalog
+live_song_ids = LiveSongIds()
+
+# How many times get_random_song retries after picking a song deleted by another process
+RANDOM_SONG_ATTEMPTS = 3
 
 
 @dataclass
@@ -60,6 +72,9 @@ def create_song(artist: str, title: str, year: int, genre: str, duration: int) -
             """, (artist, title, year, genre, duration))
             conn.commit()
 
+            if live_song_ids.loaded:
+                live_song_ids.add(cursor.lastrowid)
+
             logger.info("Song created successfully: %s - %s (%d)", artist, title, year)
 
     except sqlite3.IntegrityError as e:
@@ -100,6 +115,8 @@ def delete_song(song_id: int) -> None:
             cursor.execute("UPDATE songs SET deleted = TRUE WHERE id = ?", (song_id,))
             conn.commit()
 
+            live_song_ids.discard(song_id)
+
             logger.info("Song with ID %s marked as deleted.", song_id)
 
     except sqlite3.Error as e:
@@ -184,12 +201,19 @@ def get_song_by_compound_key(artist: str, title: str, year: int) -> Song:
         logger.error("Database error while retrieving song by compound key (artist '%s', title '%s', year %d): %s", artist, title, year, str(e))
         raise e
 
-def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
+SONG_FIELDS = ('id', 'artist', 'title', 'year', 'genre', 'duration', 'play_count')
+
+
+def get_all_songs(sort_by_play_count: bool = False, limit: Optional[int] = None, after: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> list[dict]:
     """
     Retrieves all songs that are not marked as deleted from the catalog.
 
     Args:
         sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+        limit (int, optional): The maximum number of songs to return. Returns every song if None.
+        after (str, optional): A cursor from get_all_songs_page; only songs after it are returned.
+        fields (List[str], optional): The fields to include for each song. Includes every field if None.
 
     Returns:
         list[dict]: A list of dictionaries representing all non-deleted songs with play_count.
@@ -197,50 +221,196 @@ def get_all_songs(sort_by_play_count: bool = False) -> list[dict]:
     Logs:
         Warning: If the catalog is empty.
     """
+    songs, _ = get_all_songs_page(sort_by_play_count, limit, after, fields)
+    return songs
+
+def get_all_songs_page(sort_by_play_count: bool = False, limit: Optional[int] = None, after: Optional[str] = None,
+                       fields: Optional[List[str]] = None) -> Tuple[list[dict], Optional[str]]:
+    """
+    Retrieves one page of non-deleted songs using a keyset cursor instead of OFFSET.
+
+    Pages are ordered by ID, or by play count and then ID, so each page is a single
+    index range scan no matter how deep into the catalog it is.
+
+    Args:
+        sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+        limit (int, optional): The maximum number of songs on the page. Returns every remaining song if None.
+        after (str, optional): The next_cursor returned with the previous page, or None for the first page.
+        fields (List[str], optional): The fields to include for each song, as a list or comma-separated string.
+
+    Returns:
+        Tuple[list[dict], Optional[str]]: The songs on the page and the cursor for the next page,
+                                          which is None on the last page.
+
+    Raises:
+        ValueError: If the limit, cursor or fields are invalid.
+        sqlite3.Error: If there is a database error.
+    """
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+        raise ValueError(f"Invalid limit: {limit} (must be a positive integer).")
+
+    fields = parse_fields(fields, SONG_FIELDS)
+    sort = "play_count" if sort_by_play_count else "id"
+    paginate = limit is not None or after is not None
+    after_key = _decode_song_cursor(after, sort) if after is not None else None
+
+    columns = list(fields)
+    if paginate:
+        # The cursor needs the sort key of the last row even if it wasn't requested
+        columns += [column for column in (sort, "id") if column not in columns]
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             logger.info("Attempting to retrieve all non-deleted songs from the catalog")
 
             # Determine the sort order based on the 'sort_by_play_count' flag
-            query = """
-                SELECT id, artist, title, year, genre, duration, play_count
+            query = f"""
+                SELECT {', '.join(columns)}
                 FROM songs
                 WHERE deleted = FALSE
             """
+            params: list[Any] = []
+            if after_key is not None:
+                if sort_by_play_count:
+                    query += " AND (play_count < ? OR (play_count = ? AND id > ?))"
+                    params += [after_key[0], after_key[0], after_key[1]]
+                else:
+                    query += " AND id > ?"
+                    params.append(after_key[-1])
             if sort_by_play_count:
                 query += " ORDER BY play_count DESC"
-
-            cursor.execute(query)
+                if paginate:
+                    query += ", id ASC"
+            elif paginate:
+                query += " ORDER BY id ASC"
+            if limit is not None:
+                # Fetch one extra row to find out whether there is another page
+                query += " LIMIT ?"
+                params.append(limit + 1)
+
+            cursor.execute(query, params)
             rows = cursor.fetchall()
 
             if not rows:
-                logger.warning("The song catalog is empty.")
-                return []
-
-            songs = [
-                {
-                    "id": row[0],
-                    "artist": row[1],
-                    "title": row[2],
-                    "year": row[3],
-                    "genre": row[4],
-                    "duration": row[5],
-                    "play_count": row[6],
-                }
-                for row in rows
-            ]
+                if after_key is None:
+                    logger.warning("The song catalog is empty.")
+                return [], None
+
+            rows = [dict(zip(columns, row)) for row in rows]
+            next_cursor = None
+            if limit is not None and len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                values = [sort, last["play_count"], last["id"]] if sort_by_play_count else [sort, last["id"]]
+                next_cursor = encode_cursor(values)
+
+            songs = [{field: row[field] for field in fields} for row in rows]
             logger.info("Retrieved %d songs from the catalog", len(songs))
-            return songs
+            return songs, next_cursor
 
     except sqlite3.Error as e:
         logger.error("Database error while retrieving all songs: %s", str(e))
         raise e
 
+def iter_songs(sort_by_play_count: bool = False, fields: Optional[List[str]] = None,
+               batch_size: int = 500) -> Iterator[dict]:
+    """
+    Streams every non-deleted song from the catalog without loading the whole catalog into memory.
+
+    Songs are read batch_size at a time with the same keyset ordering as get_all_songs_page,
+    by ID or by play count and then ID. Each batch checks a pooled connection out and returns
+    it before any of its songs are yielded, so a slow reader never holds a connection. The
+    arguments are checked straight away, but the first query runs when iteration starts.
+    Batches are separate reads, so a song whose play count changes while the catalog is being
+    streamed by play count can be skipped or repeated.
+
+    Args:
+        sort_by_play_count (bool): If True, sort the songs by play count in descending order.
+        fields (List[str], optional): The fields to include for each song. Includes every field if None.
+        batch_size (int): How many songs to read per query.
+
+    Returns:
+        Iterator[dict]: The songs, one dictionary at a time.
+
+    Raises:
+        ValueError: If the fields or batch size are invalid.
+    """
+    fields = parse_fields(fields, SONG_FIELDS)
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size} (must be a positive integer).")
+    return _iter_songs(sort_by_play_count, fields, batch_size)
+
+def _iter_songs(sort_by_play_count: bool, fields: List[str], batch_size: int) -> Iterator[dict]:
+    sort_columns = ["play_count", "id"] if sort_by_play_count else ["id"]
+    # The next batch starts after the sort key of the last row, even if it wasn't requested
+    columns = list(fields) + [column for column in sort_columns if column not in fields]
+    order_by = "play_count DESC, id ASC" if sort_by_play_count else "id ASC"
+
+    logger.info("Streaming all non-deleted songs from the catalog")
+    last_key = None
+    count = 0
+    while True:
+        query = f"""
+            SELECT {', '.join(columns)}
+            FROM songs
+            WHERE deleted = FALSE
+        """
+        params: list[Any] = []
+        if last_key is not None:
+            if sort_by_play_count:
+                query += " AND (play_count < ? OR (play_count = ? AND id > ?))"
+                params += [last_key[0], last_key[0], last_key[1]]
+            else:
+                query += " AND id > ?"
+                params.append(last_key[0])
+        query += f" ORDER BY {order_by} LIMIT ?"
+        params.append(batch_size)
+
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Database error while streaming songs: %s", str(e))
+            raise e
+
+        for row in rows:
+            song = dict(zip(columns, row))
+            yield {field: song[field] for field in fields}
+        count += len(rows)
+        if len(rows) < batch_size:
+            break
+        last_row = dict(zip(columns, rows[-1]))
+        last_key = [last_row[column] for column in sort_columns]
+
+    logger.info("Streamed %d songs from the catalog", count)
+
+def _decode_song_cursor(after: str, sort: str) -> list:
+    """
+    Turns a catalog cursor back into its sort key, checking it belongs to the same ordering.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a different ordering.
+    """
+    values = decode_cursor(after)
+    expected_length = 3 if sort == "play_count" else 2
+    if (len(values) != expected_length or values[0] != sort
+            or any(isinstance(value, bool) or not isinstance(value, int) for value in values[1:])):
+        raise ValueError(f"Invalid cursor: {after}")
+    return values[1:]
+
 def get_random_song() -> Song:
     """
     Retrieves a random song from the catalog.
 
+    The song is picked from the in-memory array of live song IDs, so only the chosen row is
+    read from the database. The array is loaded on first use and kept up to date by
+    create_song and delete_song. Each pick first reads the catalog version, two constant-time
+    lookups, and reloads the array if songs were inserted elsewhere (by import_songs.py,
+    another worker or a recreated table) since it was loaded.
+
     Returns:
         Song: A randomly selected Song object.
 
@@ -248,31 +418,78 @@ def get_random_song() -> Song:
         ValueError: If the catalog is empty.
     """
     try:
-        all_songs = get_all_songs()
-
-        if not all_songs:
-            logger.info("Cannot retrieve random song because the song catalog is empty.")
-            raise ValueError("The song catalog is empty.")
-
-        # Get a random index using the random.org API
-        random_index = get_random(len(all_songs))
-        logger.info("Random index selected: %d (total songs: %d)", random_index, len(all_songs))
-
-        # Return the song at the random index, adjust for 0-based indexing
-        song_data = all_songs[random_index - 1]
-        return Song(
-            id=song_data["id"],
-            artist=song_data["artist"],
-            title=song_data["title"],
-            year=song_data["year"],
-            genre=song_data["genre"],
-            duration=song_data["duration"]
-        )
+        for _ in range(RANDOM_SONG_ATTEMPTS):
+            if not live_song_ids.is_current(*_catalog_version()):
+                load_live_song_ids()
+
+            num_songs = len(live_song_ids)
+            if not num_songs:
+                logger.info("Cannot retrieve random song because the song catalog is empty.")
+                raise ValueError("The song catalog is empty.")
+
+            # Get a random index using the random.org API
+            random_index = get_random(num_songs)
+            logger.info("Random index selected: %d (total songs: %d)", random_index, num_songs)
+
+            # Look up the song at the random index, adjust for 0-based indexing
+            song_id = live_song_ids.get(random_index - 1)
+            song = _get_live_song(song_id) if song_id is not None else None
+            if song is not None:
+                return song
+
+            # The catalog was changed behind our back; start again from the database
+            logger.warning("Random song pick was stale, reloading the live song IDs")
+            live_song_ids.invalidate()
+
+        raise ValueError("Could not pick a random song: the catalog changed during every attempt.")
 
     except Exception as e:
         logger.error("Error while retrieving random song: %s", str(e))
         raise e
 
+def load_live_song_ids() -> None:
+    """
+    Fills the array of live song IDs used by get_random_song from the database.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    try:
+        # The version is read first, so an insert racing the load only causes another reload
+        schema_version, max_id = _catalog_version()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM songs WHERE deleted = FALSE")
+            live_song_ids.load((row[0] for row in cursor.fetchall()), schema_version, max_id)
+            logger.info("Loaded %d live song IDs", len(live_song_ids))
+
+    except sqlite3.Error as e:
+        logger.error("Database error while loading live song IDs: %s", str(e))
+        raise e
+
+def _catalog_version() -> Tuple[int, Optional[int]]:
+    # Both are constant time: the schema version is in the file header and MAX(id) reads the end of the rowid index
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT (SELECT schema_version FROM pragma_schema_version), MAX(id) FROM songs")
+        schema_version, max_id = cursor.fetchone()
+    return schema_version, max_id
+
+def _get_live_song(song_id: int) -> Optional[Song]:
+    # Returns None rather than raising if the song is gone, so the caller can retry
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, artist, title, year, genre, duration
+            FROM songs
+            WHERE id = ? AND deleted = FALSE
+        """, (song_id,))
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    return Song(id=row[0], artist=row[1], title=row[2], year=row[3], genre=row[4], duration=row[5])
+
 def update_play_count(song_id: int) -> None:
     """
     Increments the play count of a song by song ID.
@@ -287,7 +504,7 @@ def update_play_count(song_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            logger.info("Attempting to update play count for song with ID %d", song_id)
+            loop_logger.info("Attempting to update play count for song with ID %d", song_id)
 
             # Check if the song exists and if it's deleted
             cursor.execute("SELECT deleted FROM songs WHERE id = ?", (song_id,))
@@ -304,8 +521,64 @@ def update_play_count(song_id: int) -> None:
             cursor.execute("UPDATE songs SET play_count = play_count + 1 WHERE id = ?", (song_id,))
             conn.commit()
 
-            logger.info("Play count incremented for song with ID: %d", song_id)
+            loop_logger.info("Play count incremented for song with ID: %d", song_id)
 
     except sqlite3.Error as e:
         logger.error("Database error while updating play count for song with ID %d: %s", song_id, str(e))
         raise e
+
+def update_play_counts(song_ids: list[int]) -> dict[int, str]:
+    """
+    Increments the play count of several songs in a single transaction.
+
+    Every ID is validated with one query and the valid ones are incremented with a single
+    executemany. Songs that are missing or deleted are skipped and reported instead of
+    aborting the batch.
+
+    Args:
+        song_ids (list[int]): The IDs of the songs to increment. An ID that appears more
+                              than once is incremented once per occurrence.
+
+    Returns:
+        dict[int, str]: An error message for each song ID that could not be updated.
+                        Empty if every play count was updated.
+
+    Raises:
+        sqlite3.Error: If there is a database error.
+    """
+    if not song_ids:
+        return {}
+
+    unique_ids = list(dict.fromkeys(song_ids))
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            logger.info("Attempting to update play counts for %d songs", len(song_ids))
+
+            # Check which songs exist and which are deleted in one round trip
+            cursor.execute("""
+                SELECT id, deleted
+                FROM songs
+                WHERE id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(unique_ids),))
+            deleted_by_id = dict(cursor.fetchall())
+
+            failures = {}
+            for song_id in unique_ids:
+                if song_id not in deleted_by_id:
+                    failures[song_id] = f"Song with ID {song_id} not found"
+                elif deleted_by_id[song_id]:
+                    failures[song_id] = f"Song with ID {song_id} has been deleted"
+
+            # Increment the play counts
+            params = [(song_id,) for song_id in song_ids if song_id not in failures]
+            cursor.executemany("UPDATE songs SET play_count = play_count + 1 WHERE id = ?", params)
+            conn.commit()
+
+            logger.info("Play counts incremented for %d songs (%d failed)", len(params), len(failures))
+            return failures
+
+    except sqlite3.Error as e:
+        logger.error("Database error while updating play counts: %s", str(e))
+        raise e
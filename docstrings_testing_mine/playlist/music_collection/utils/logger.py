@@ -1,26 +1,287 @@
+import atexit
+from datetime import datetime, timezone
+import json
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+import threading
+import time
+from typing import Callable, Optional
 
-from flask import current_app, has_request_context
 
+# Messages below this level are dropped before their arguments are formatted
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+# Per-logger levels that override LOG_LEVEL, as "name=LEVEL,name=LEVEL"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# "text" for human-readable lines, or "json" for one JSON object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Whether to hand records to a background thread instead of writing to stderr on the caller's thread
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+# Loop loggers let through 1 in every LOG_LOOP_SAMPLE_RATE records per message template
+LOG_LOOP_SAMPLE_RATE = int(os.getenv("LOG_LOOP_SAMPLE_RATE", "1"))
+# and at most LOG_LOOP_RATE_LIMIT records per message template per second (0 for no limit)
+LOG_LOOP_RATE_LIMIT = int(os.getenv("LOG_LOOP_RATE_LIMIT", "10"))
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# The attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+
+_configured = False
+_handler = None
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one line of JSON.
+
+    Every line has the time, level, logger name and message, followed by any fields passed
+    through extra= and the traceback, if there is one.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formats each record as a line of text, noting how many similar records were dropped.
+
+    A record let through by the loop logging filters ends with "(N suppressed)", so the text log
+    shows that records were dropped just as the JSON log does.
+    """
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            line += f" ({suppressed} suppressed)"
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through one in every rate records with the same message template.
+
+    Records at WARNING and above always pass. A record that passes after others were dropped
+    carries the number dropped as its suppressed attribute.
+    """
+
+    def __init__(self, rate: int):
+        super().__init__()
+        if rate < 1:
+            raise ValueError(f"Invalid sample rate: {rate}. Must be a positive integer.")
+        self.rate = rate
+        self._counts: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.rate:
+            return False
+        if count:
+            record.suppressed = getattr(record, 'suppressed', 0) + self.rate - 1
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most max_per_second records with the same message template each second.
+
+    Records at WARNING and above always pass. A record that passes after others were dropped
+    carries the number dropped as its suppressed attribute.
+    """
+
+    def __init__(self, max_per_second: int, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        if max_per_second < 1:
+            raise ValueError(f"Invalid rate limit: {max_per_second}. Must be a positive integer.")
+        self.max_per_second = max_per_second
+        self.clock = clock
+        # (window start, records passed in the window, records dropped since the last one passed)
+        self._windows: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1:
+                window = self._windows[key] = [now, 0, window[2] if window else 0]
+            if window[1] >= self.max_per_second:
+                # A sampled record stands for the records sampled away before it, too
+                window[2] += 1 + getattr(record, 'suppressed', 0)
+                return False
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+        if suppressed:
+            # Add to any count a sampling filter set, rather than overwriting it
+            record.suppressed = getattr(record, 'suppressed', 0) + suppressed
+        return True
+
+
+def parse_level(name: str) -> Optional[int]:
+    """
+    Turns a level name such as "INFO" into a logging level.
+
+    Args:
+        name (str): The level name, in any case.
+
+    Returns:
+        Optional[int]: The level, or None if the name isn't a level.
+    """
+    level = logging.getLevelName(str(name).strip().upper())
+    return level if isinstance(level, int) else None
+
+
+def get_log_level() -> int:
+    """
+    Returns the level set by LOG_LEVEL.
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
+    Returns:
+        int: The logging level. Falls back to DEBUG if LOG_LEVEL isn't a level name.
+    """
+    level = parse_level(LOG_LEVEL)
+    return level if level is not None else logging.DEBUG
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
+def parse_level_overrides(spec: str) -> dict[str, int]:
+    """
+    Parses per-logger levels written as "name=LEVEL,name=LEVEL".
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+    Args:
+        spec (str): The overrides, such as "werkzeug=WARNING,music_collection.models.song_model=DEBUG".
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    Returns:
+        dict[str, int]: The level for each logger name. Entries that can't be parsed are skipped.
+    """
+    overrides = {}
+    for entry in spec.split(","):
+        name, _, level_name = entry.partition("=")
+        level = parse_level(level_name)
+        if name.strip() and level is not None:
+            overrides[name.strip()] = level
+    return overrides
+
+
+def setup_logging(level: Optional[int] = None, fmt: Optional[str] = None,
+                  overrides: Optional[dict[str, int]] = None, force: bool = False) -> None:
+    """
+    Configures logging for the whole process, once.
+
+    A single handler is attached to the root logger, so every logger, including app.logger and
+    those of third-party libraries, writes each record exactly once. Calling this again does
+    nothing unless force is set, in which case the handler is replaced.
+
+    Args:
+        level (Optional[int]): The root level. Defaults to LOG_LEVEL.
+        fmt (Optional[str]): "text" or "json". Defaults to LOG_FORMAT.
+        overrides (Optional[dict[str, int]]): Levels for individual loggers. Defaults to LOG_LEVELS.
+        force (bool): Whether to reconfigure logging that is already set up.
+
+    """
+    global _configured, _handler
+    with _lock:
+        if _configured and not force:
+            return
+
+        root = logging.getLogger()
+        if _handler is not None:
+            root.removeHandler(_handler)
+            _stop_listener()
+
+        _handler = _build_handler(fmt if fmt is not None else LOG_FORMAT)
+        root.addHandler(_handler)
+        root.setLevel(level if level is not None else get_log_level())
+
+        overrides = overrides if overrides is not None else parse_level_overrides(LOG_LEVELS)
+        for name, logger_level in overrides.items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        _configured = True
+
+
+def _build_handler(fmt: str) -> logging.Handler:
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter(TEXT_FORMAT))
+    if not LOG_ASYNC:
+        return stream_handler
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return QueueHandler(log_queue)
+
+
+def stop_log_listener() -> None:
+    """
+    Writes out any queued records and stops the background writer thread, if there is one.
+
+    """
+    with _lock:
+        _stop_listener()
+
+
+def _stop_listener() -> None:
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+# Write out anything still queued when the process exits
+atexit.register(stop_log_listener)
+
+
+def get_loop_logger(name: str) -> logging.Logger:
+    """
+    Returns the logger for per-item messages inside loops that can run many times.
+
+    This is the child logger "<name>.loop", filtered by LOG_LOOP_SAMPLE_RATE and
+    LOG_LOOP_RATE_LIMIT so that a long loop can't flood the log. Loops should end with a summary
+    on the regular logger. Its level can be set on its own through LOG_LEVELS.
+
+    Args:
+        name (str): The name of the module's logger.
+
+    Returns:
+        logging.Logger: The loop logger.
+    """
+    setup_logging()
+    loop_logger = logging.getLogger(f"{name}.loop")
+    with _lock:
+        if not any(isinstance(f, (SamplingFilter, RateLimitFilter)) for f in loop_logger.filters):
+            if LOG_LOOP_SAMPLE_RATE > 1:
+                loop_logger.addFilter(SamplingFilter(LOG_LOOP_SAMPLE_RATE))
+            if LOG_LOOP_RATE_LIMIT > 0:
+                loop_logger.addFilter(RateLimitFilter(LOG_LOOP_RATE_LIMIT))
+    return loop_logger
+
+
+def configure_logger(logger):
+    # Records reach the root logger's handler by propagation, so the logger itself needs no handler
+    setup_logging()
@@ -0,0 +1,278 @@
+import cProfile
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import hmac
+import io
+import itertools
+import logging
+import marshal
+import os
+import pstats
+import threading
+import time
+from typing import Any, List, Mapping, Optional
+
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Requests are only profiled when this is on
+PROFILING = os.getenv("PROFILING", "false").lower() == "true"
+# If set, the X-Profile header or profile query flag must carry this token instead of "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# How many recent profiles to keep
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "20"))
+
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# cProfile can only be active once per process, so profiled requests take turns
+_profiler_lock = threading.Lock()
+
+
+@dataclass
+class RequestProfile:
+    """
+    The cProfile output for one request.
+
+    Attributes:
+        id (int): The profile id.
+        method (str): The HTTP method.
+        path (str): The request path.
+        status (int): The response status code.
+        duration (float): Seconds spent handling the request while profiled.
+        started_at (float): When the request started, as a Unix timestamp.
+    """
+    id: int
+    method: str
+    path: str
+    status: int
+    duration: float
+    started_at: float
+    profiler: cProfile.Profile = field(repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Returns the profile's summary as a JSON-serializable dict.
+
+        Returns:
+            dict[str, Any]: Everything but the profile data itself.
+        """
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 3),
+            'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec='milliseconds'),
+        }
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        """
+        Returns the profile as a pstats table.
+
+        Args:
+            sort (str): "cumulative", "tottime" or "calls".
+            limit (int): The number of functions to list.
+
+        Returns:
+            str: The table.
+
+        Raises:
+            ValueError: If the sort key is unknown or the limit is below 1.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort: {sort}. Must be one of {', '.join(SORT_KEYS)}.")
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit}. Must be a positive integer.")
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """
+        Returns the profile in the binary format written by pstats.Stats.dump_stats.
+
+        Returns:
+            bytes: Data that pstats, snakeviz and similar tools can load.
+        """
+        return marshal.dumps(pstats.Stats(self.profiler).stats)
+
+
+@dataclass
+class ActiveProfile:
+    """
+    A profiler running for one request.
+
+    Attributes:
+        profiler (cProfile.Profile): The profiler.
+        started_at (float): When profiling started, as a Unix timestamp.
+        started (float): When profiling started, on the performance counter.
+    """
+    profiler: cProfile.Profile
+    started_at: float
+    started: float
+
+
+class ProfileStore:
+    """
+    Keeps the most recent request profiles, dropping the oldest once full.
+    """
+
+    def __init__(self, capacity: int = PROFILE_HISTORY):
+        """
+        Initializes an empty store.
+
+        Args:
+            capacity (int): The number of profiles to keep.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError(f"Invalid profile history: {capacity}. Must be at least 1.")
+        self._profiles: deque = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, method: str, path: str, status: int, duration: float, started_at: float,
+            profiler: cProfile.Profile) -> RequestProfile:
+        """
+        Stores a finished profile under a new id.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path.
+            status (int): The response status code.
+            duration (float): Seconds spent handling the request while profiled.
+            started_at (float): When the request started, as a Unix timestamp.
+            profiler (cProfile.Profile): The stopped profiler.
+
+        Returns:
+            RequestProfile: The stored profile.
+        """
+        with self._lock:
+            profile = RequestProfile(next(self._ids), method, path, status, duration, started_at, profiler)
+            self._profiles.append(profile)
+        return profile
+
+    def get(self, profile_id: int) -> RequestProfile:
+        """
+        Retrieves a stored profile.
+
+        Args:
+            profile_id (int): The id returned in the X-Profile-Id header.
+
+        Returns:
+            RequestProfile: The profile.
+
+        Raises:
+            ValueError: If the profile is unknown or has been dropped.
+        """
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        raise ValueError(f"Profile with ID {profile_id} not found")
+
+    def list(self) -> List[RequestProfile]:
+        """
+        Returns the stored profiles, newest first.
+        """
+        with self._lock:
+            return list(reversed(self._profiles))
+
+
+profile_store = ProfileStore()
+
+
+def wants_profile(headers: Mapping[str, str], args: Mapping[str, str]) -> bool:
+    """
+    Decides whether a request asked to be profiled.
+
+    A request asks with an X-Profile header or a profile query parameter. The value must be
+    PROFILING_TOKEN if one is set, and "1" or "true" otherwise. Nothing is profiled unless
+    PROFILING is on.
+
+    Args:
+        headers (Mapping[str, str]): The request headers.
+        args (Mapping[str, str]): The query parameters.
+
+    Returns:
+        bool: True if the request should be profiled.
+    """
+    if not PROFILING:
+        return False
+    flag = headers.get("X-Profile") or args.get("profile")
+    if not flag:
+        return False
+    if PROFILING_TOKEN:
+        return hmac.compare_digest(flag.encode(), PROFILING_TOKEN.encode())
+    return flag.lower() in ("1", "true")
+
+
+def is_authorized(headers: Mapping[str, str], args: Mapping[str, str]) -> bool:
+    """
+    Decides whether a caller may read stored profiles.
+
+    Args:
+        headers (Mapping[str, str]): The request headers.
+        args (Mapping[str, str]): The query parameters.
+
+    Returns:
+        bool: True if PROFILING is on and, when PROFILING_TOKEN is set, the caller sent it.
+    """
+    if not PROFILING:
+        return False
+    if not PROFILING_TOKEN:
+        return True
+    flag = headers.get("X-Profile") or args.get("profile") or ""
+    return hmac.compare_digest(flag.encode(), PROFILING_TOKEN.encode())
+
+
+def start_profile() -> Optional[ActiveProfile]:
+    """
+    Starts profiling the current thread.
+
+    Returns:
+        Optional[ActiveProfile]: The running profiler, or None if another request is being
+        profiled.
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        logger.warning("Skipping profile: another request is being profiled")
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiling tool already holds the interpreter's profiling hook
+        _profiler_lock.release()
+        logger.warning("Skipping profile: %s", e)
+        return None
+    return ActiveProfile(profiler, time.time(), time.perf_counter())
+
+
+def stop_profile(active: ActiveProfile, method: str, path: str, status: int) -> RequestProfile:
+    """
+    Stops a profiler started by start_profile and stores its profile.
+
+    Args:
+        active (ActiveProfile): The running profiler.
+        method (str): The HTTP method.
+        path (str): The request path.
+        status (int): The response status code.
+
+    Returns:
+        RequestProfile: The stored profile.
+    """
+    try:
+        active.profiler.disable()
+    finally:
+        _profiler_lock.release()
+    duration = time.perf_counter() - active.started
+    profile = profile_store.add(method, path, status, duration, active.started_at, active.profiler)
+    logger.info("Stored profile %d for %s %s (%.3f seconds)", profile.id, method, path, duration)
+    return profile
@@ -0,0 +1,188 @@
+"""
+A local stand-in for random.org, for offline, fast and repeatable runs.
+
+It serves the plain-text /decimal-fractions/ and /integers/ endpoints that random_utils uses,
+from a seedable generator, and can add latency and fail a share of requests to exercise the
+timeout and error handling. Point RANDOM_ORG_BASE_URL at it:
+
+    python -m music_collection.utils.random_org_stub --port 8001 --seed 42 --latency 0.05
+    RANDOM_ORG_BASE_URL=http://127.0.0.1:8001 python app.py
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from typing import Optional, Union
+
+from flask import Flask, Response, request
+from werkzeug.serving import BaseWSGIServer, make_server
+
+from music_collection.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# random.org's limits on the arguments
+MAX_NUM = 10000
+MAX_DEC = 20
+MAX_INT = 10 ** 9
+
+
+class BadRequest(Exception):
+    """Raised for arguments that random.org would reject."""
+
+
+def create_app(seed: Union[int, str, None] = None, latency: float = 0.0, error_rate: float = 0.0) -> Flask:
+    """
+    Creates the stand-in service.
+
+    Args:
+        seed (int | str | None): Seeds the generator, so the same requests get the same numbers.
+            None seeds it from the operating system.
+        latency (float): Seconds to wait before answering each request.
+        error_rate (float): The share of requests, between 0 and 1, answered with a 503 instead.
+
+    Returns:
+        Flask: The app.
+
+    Raises:
+        ValueError: If the latency or the error rate is out of range.
+    """
+    if latency < 0:
+        raise ValueError("Invalid latency: %s. Must not be negative." % latency)
+    if not 0 <= error_rate <= 1:
+        raise ValueError("Invalid error rate: %s. Must be between 0 and 1." % error_rate)
+
+    app = Flask(__name__)
+    rng = random.Random(seed)
+    # Faults are drawn separately so the numbers served don't depend on the error rate
+    faults = random.Random(None if seed is None else "faults-%s" % seed)
+    lock = threading.Lock()
+
+    def plain(text: str, status: int = 200) -> Response:
+        return Response(text, status=status, mimetype="text/plain")
+
+    @app.errorhandler(BadRequest)
+    def bad_request(error: BadRequest) -> Response:
+        return plain("Error: %s\n" % error, 400)
+
+    @app.before_request
+    def inject_faults() -> Optional[Response]:
+        if latency:
+            time.sleep(latency)
+        if error_rate:
+            with lock:
+                failed = faults.random() < error_rate
+            if failed:
+                logger.info("Injecting an error for %s", request.full_path)
+                return plain("Error: The service is temporarily unavailable (injected)\n", 503)
+        return None
+
+    @app.route("/decimal-fractions/")
+    def decimal_fractions() -> Response:
+        num = _int_arg("num", 1, MAX_NUM)
+        dec = _int_arg("dec", 1, MAX_DEC)
+        col = _int_arg("col", 1, MAX_NUM, default=1)
+        _check_format()
+        with lock:
+            values = ["0.%0*d" % (dec, rng.randrange(10 ** dec)) for _ in range(num)]
+        return plain(_layout(values, col))
+
+    @app.route("/integers/")
+    def integers() -> Response:
+        num = _int_arg("num", 1, MAX_NUM)
+        low = _int_arg("min", -MAX_INT, MAX_INT)
+        high = _int_arg("max", -MAX_INT, MAX_INT)
+        col = _int_arg("col", 1, MAX_NUM, default=1)
+        if request.args.get("base", "10") != "10":
+            raise BadRequest("Only base 10 is supported")
+        if low > high:
+            raise BadRequest("The minimum value must be less than or equal to the maximum value")
+        _check_format()
+        with lock:
+            values = [str(rng.randint(low, high)) for _ in range(num)]
+        return plain(_layout(values, col))
+
+    return app
+
+
+def _int_arg(name: str, low: int, high: int, default: Optional[int] = None) -> int:
+    """
+    Reads an integer query argument and checks its range.
+
+    Args:
+        name (str): The argument name.
+        low (int): The smallest value allowed.
+        high (int): The largest value allowed.
+        default (int, optional): The value if the argument is missing, or None if it is required.
+
+    Returns:
+        int: The value.
+
+    Raises:
+        BadRequest: If the argument is missing, not an integer or out of range.
+    """
+    value = request.args.get(name)
+    if value is None:
+        if default is None:
+            raise BadRequest("The %s parameter is required" % name)
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest("The %s parameter must be an integer" % name)
+    if not low <= number <= high:
+        raise BadRequest("The %s parameter must be between %d and %d" % (name, low, high))
+    return number
+
+
+def _check_format() -> None:
+    if request.args.get("format", "plain") != "plain":
+        raise BadRequest("Only the plain format is supported")
+
+
+def _layout(values: list, col: int) -> str:
+    # Like random.org, values are tab-separated within a row and rows end with a newline
+    return "".join("\t".join(values[i:i + col]) + "\n" for i in range(0, len(values), col))
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **kwargs) -> BaseWSGIServer:
+    """
+    Starts the stand-in service in a background thread.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on, or 0 for a free one.
+        **kwargs: Passed on to create_app().
+
+    Returns:
+        BaseWSGIServer: The running server. Its URL is http://host:server_port; call
+        shutdown() to stop it.
+    """
+    server = make_server(host, port, create_app(**kwargs), threaded=True)
+    threading.Thread(target=server.serve_forever, name="random-org-stub", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for random.org.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8001, help="port to listen on")
+    parser.add_argument("--seed", type=int, help="seed for the generator (default: unseeded)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each answer")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests to fail with a 503")
+    args = parser.parse_args()
+
+    try:
+        app = create_app(args.seed, args.latency, args.error_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info("Serving the random.org stand-in on http://%s:%d", args.host, args.port)
+    make_server(args.host, args.port, app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,58 @@
 import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
 import requests
 
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.metrics import Counter, Gauge, Histogram
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# prefetch settings
+RANDOM_PREFETCH = os.getenv("RANDOM_PREFETCH", "false").lower() == "true"
+RANDOM_PREFETCH_SIZE = int(os.getenv("RANDOM_PREFETCH_SIZE", "1000"))
+
+# Where random.org is; point this at random_org_stub for offline or repeatable runs
+RANDOM_ORG_BASE_URL = os.getenv("RANDOM_ORG_BASE_URL", "https://www.random.org").rstrip("/")
+
+# Each raw value fetched from random.org carries this many uniform bits
+WORD_BITS = 16
+# random.org returns at most this many integers per request
+MAX_BATCH = 10000
+
+RANDOM_ORG_REQUESTS = Counter("random_org_requests_total", "Requests made to random.org, by outcome.", ["outcome"])
+RANDOM_ORG_SECONDS = Histogram("random_org_request_duration_seconds", "Time taken by requests to random.org.")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session for random.org, so connections are kept alive between calls.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
 def get_random(num_songs: int) -> int:
     """
     Fetches a random int between 1 and the number of songs in the catalog from random.org.
 
+    If prefetching is enabled the number is drawn from raw random bits fetched in bulk, so most
+    calls make no request and a change in the catalog size doesn't waste what was fetched.
+
     Returns:
         int: The random number fetched from random.org.
 
@@ -18,31 +60,170 @@ def get_random(num_songs: int) -> int:
         RuntimeError: If the request to random.org fails or returns an invalid response.
         ValueError: If the response from random.org is not a valid float.
     """
-    url = f"https://www.random.org/integers/?num=1&min=1&max={num_songs}&col=1&base=10&format=plain&rnd=new"
+    if RANDOM_PREFETCH:
+        return get_random_bit_pool().randint(num_songs)
+
+    url = f"{RANDOM_ORG_BASE_URL}/integers/?num=1&min=1&max={num_songs}&col=1&base=10&format=plain&rnd=new"
+    return _fetch_integers(url)[0]
 
+
+def fetch_random_words(num: int) -> List[int]:
+    """
+    Fetches raw uniform 16-bit values from random.org in a single request.
+
+    Args:
+        num (int): How many values to fetch, between 1 and 10000.
+
+    Returns:
+        List[int]: The values, each between 0 and 65535.
+
+    Raises:
+        RuntimeError: If the request to random.org fails.
+        ValueError: If the response from random.org is not a list of integers.
+    """
+    url = f"{RANDOM_ORG_BASE_URL}/integers/?num={num}&min=0&max={2 ** WORD_BITS - 1}&col=1&base=10&format=plain&rnd=new"
+    return _fetch_integers(url)
+
+
+def _fetch_integers(url: str) -> List[int]:
+    start = time.perf_counter()
+    outcome = "error"
     try:
         # Log the request to random.org
         logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+        response = get_session().get(url, timeout=5)
 
         # Check if the request was successful
         response.raise_for_status()
 
-        random_number_str = response.text.strip()
+        random_number_strs = response.text.split()
 
+        outcome = "invalid"
         try:
-            random_number = int(random_number_str)
+            random_numbers = [int(random_number_str) for random_number_str in random_number_strs]
         except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        if not random_numbers:
+            raise ValueError("Invalid response from random.org: %s" % response.text.strip())
+        outcome = "success"
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        if len(random_numbers) == 1:
+            logger.info("Received random number: %d", random_numbers[0])
+        else:
+            logger.info("Received %d random numbers", len(random_numbers))
+        return random_numbers
 
     except requests.exceptions.Timeout:
+        outcome = "timeout"
         logger.error("Request to random.org timed out.")
         raise RuntimeError("Request to random.org timed out.")
 
     except requests.exceptions.RequestException as e:
         logger.error("Request to random.org failed: %s", e)
         raise RuntimeError("Request to random.org failed: %s" % e)
+
+    finally:
+        RANDOM_ORG_SECONDS.observe(time.perf_counter() - start)
+        RANDOM_ORG_REQUESTS.inc(outcome=outcome)
+
+
+class RandomBitPool:
+    """
+    A buffer of uniform random bits, fetched from random.org in bulk, that serves integers in any range.
+
+    The raw values don't depend on the range being asked for, so songs can be added or deleted
+    without invalidating what has been fetched. An integer in [1, n] is drawn by taking just
+    enough bits to cover n values and retrying if the result is too big. Unlike taking the bits
+    modulo n this is unbiased, and each draw needs fewer than two tries on average.
+
+    Attributes:
+        batch_size (int): How many 16-bit values to fetch when the pool runs out.
+        fetch (Callable[[int], List[int]]): Fetches the given number of 16-bit values.
+    """
+
+    def __init__(self, batch_size: int = 1000, fetch: Callable[[int], List[int]] = fetch_random_words):
+        """
+        Initializes an empty pool. Bits are fetched on first use.
+
+        Args:
+            batch_size (int): How many 16-bit values to fetch at a time.
+            fetch (Callable[[int], List[int]]): Fetches the given number of 16-bit values.
+
+        Raises:
+            ValueError: If the batch size is out of range.
+        """
+        if batch_size < 1 or batch_size > MAX_BATCH:
+            raise ValueError(f"Invalid batch size: {batch_size} (must be between 1 and {MAX_BATCH}).")
+        self.batch_size = batch_size
+        self.fetch = fetch
+        self._bits = 0
+        self._bit_count = 0
+        self._lock = threading.Lock()
+
+    def randint(self, n: int) -> int:
+        """
+        Returns a uniformly distributed random integer between 1 and n.
+
+        Args:
+            n (int): The largest value to return.
+
+        Returns:
+            int: The random integer.
+
+        Raises:
+            ValueError: If n is less than 1, or random.org returns an invalid response.
+            RuntimeError: If more bits are needed and the request to random.org fails.
+        """
+        if n < 1:
+            raise ValueError(f"Invalid range: {n} (must be at least 1).")
+        if n == 1:
+            return 1
+
+        bits = (n - 1).bit_length()
+        with self._lock:
+            while True:
+                value = self._take_bits(bits)
+                if value < n:
+                    return value + 1
+
+    def available_bits(self) -> int:
+        """
+        Returns the number of random bits left in the pool.
+        """
+        return self._bit_count
+
+    def _take_bits(self, bits: int) -> int:
+        while self._bit_count < bits:
+            words = self.fetch(self.batch_size)
+            for word in words:
+                if word < 0 or word >= 2 ** WORD_BITS:
+                    raise ValueError(f"Invalid response from random.org: {word}")
+                self._bits = (self._bits << WORD_BITS) | word
+            self._bit_count += WORD_BITS * len(words)
+
+        # Take the lowest bits and keep the rest for later draws
+        self._bit_count -= bits
+        value = self._bits & ((1 << bits) - 1)
+        self._bits >>= bits
+        return value
+
+
+_bit_pool: Optional[RandomBitPool] = None
+
+RANDOM_POOL_BITS = Gauge("random_pool_bits", "Random bits waiting in the prefetch pool.",
+                         lambda: _bit_pool.available_bits() if _bit_pool is not None else 0)
+
+
+def get_random_bit_pool() -> RandomBitPool:
+    """
+    Returns the process-wide pool of random bits used by get_random, creating it on first use.
+
+    Returns:
+        RandomBitPool: The shared pool.
+    """
+    global _bit_pool
+    with _session_lock:
+        if _bit_pool is None:
+            _bit_pool = RandomBitPool(RANDOM_PREFETCH_SIZE)
+        return _bit_pool
@@ -1,9 +1,13 @@
+from collections import deque
 from contextlib import contextmanager
 import logging
 import os
 import sqlite3
+import threading
+import time
 
 from music_collection.utils.logger import configure_logger
+from music_collection.utils.metrics import Counter, Gauge, Histogram
 
 
 logger = logging.getLogger(__name__)
@@ -13,6 +17,37 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/song_catalog.db")
 
+# connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10"))
+
+# PRAGMAs applied once to every new connection
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-65536"))  # negative values are KiB
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Statements are labelled by their first keyword; anything else counts as OTHER
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH", "BEGIN", "COMMIT",
+                   "ROLLBACK", "PRAGMA", "CREATE", "DROP", "ALTER"}
+
+DB_QUERIES = Counter("db_queries_total", "SQLite statements executed through pooled connections.",
+                     ["statement", "outcome"])
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Time spent executing SQLite statements.",
+                             ["statement"])
+DB_CONNECTIONS_OPENED = Counter("db_connections_opened_total", "SQLite connections opened by the pool.")
+DB_CONNECTIONS_CLOSED = Counter("db_connections_closed_total", "SQLite connections closed by the pool.")
+DB_CHECKOUT_WAIT_SECONDS = Histogram("db_connection_wait_seconds",
+                                     "Time spent waiting to check out a pooled connection.")
+DB_CHECKOUT_HOLD_SECONDS = Histogram("db_connection_hold_seconds",
+                                     "Time a pooled connection is held by get_db_connection.")
+DB_POOL_IDLE = Gauge("db_pool_idle_connections", "Idle connections held by the pool.",
+                     lambda: _pool.idle_count() if _pool is not None else 0)
+
 
 def check_database_connection():
     """Check the database connection
@@ -50,22 +85,329 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
+def statement_kind(sql: str) -> str:
+    """
+    Returns the first keyword of a SQL statement, for labelling metrics.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        str: The keyword in upper case, or "OTHER" if it isn't a known kind of statement.
+    """
+    words = sql.split(None, 1)
+    kind = words[0].rstrip(";").upper() if words else ""
+    return kind if kind in STATEMENT_KINDS else "OTHER"
+
+
+class MeteredCursor(sqlite3.Cursor):
+    """
+    A cursor that counts and times every statement it executes.
+    """
+
+    def execute(self, sql, parameters=()):
+        with _metered(sql):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with _metered(sql):
+            return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        with _metered(sql_script):
+            return super().executescript(sql_script)
+
+
+class MeteredConnection(sqlite3.Connection):
+    """
+    A connection whose cursors, including those behind its execute shortcuts, are metered.
+    """
+
+    def cursor(self, factory=MeteredCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+@contextmanager
+def _metered(sql: str):
+    kind = statement_kind(sql)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement=kind)
+        DB_QUERIES.inc(statement=kind, outcome=outcome)
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of long-lived SQLite connections.
+
+    At most max_size connections are checked out at once. Idle connections are kept for
+    reuse and closed once they have been idle for longer than idle_timeout seconds. Every
+    connection is tuned with the configured PRAGMAs when it is opened and health checked
+    before it is handed out.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DB_POOL_SIZE,
+                 idle_timeout: float = DB_POOL_IDLE_TIMEOUT,
+                 checkout_timeout: float = DB_POOL_CHECKOUT_TIMEOUT):
+        """
+        Initializes an empty pool for the given database.
+
+        Args:
+            db_path (str): The path of the SQLite database.
+            max_size (int): The maximum number of connections open at once.
+            idle_timeout (float): Seconds after which an idle connection is closed.
+            checkout_timeout (float): Seconds to wait for a free connection before giving up.
+
+        Raises:
+            ValueError: If max_size is not positive or the configured PRAGMAs are not recognized.
+        """
+        if max_size < 1:
+            raise ValueError(f"Invalid pool size: {max_size}. Must be at least 1.")
+        # Fail once here rather than on every checkout
+        check_pragma_settings()
+
+        self.db_path = db_path
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle: deque = deque()  # (connection, time it was returned)
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Checks out a healthy connection, opening a new one if none are idle.
+
+        Returns:
+            sqlite3.Connection: A connection reserved for the caller until release().
+
+        Raises:
+            sqlite3.OperationalError: If no connection frees up within checkout_timeout.
+        """
+        with DB_CHECKOUT_WAIT_SECONDS.time():
+            acquired = self._slots.acquire(timeout=self.checkout_timeout)
+        if not acquired:
+            logger.error("Timed out waiting for a database connection from the pool")
+            raise sqlite3.OperationalError("Timed out waiting for a database connection from the pool")
+
+        try:
+            while True:
+                conn = self._pop_idle()
+                if conn is None:
+                    return self._connect()
+                if self._is_healthy(conn):
+                    return conn
+                self._close(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """
+        Returns a connection to the pool.
+
+        Args:
+            conn (sqlite3.Connection): The connection obtained from acquire().
+            discard (bool, optional): If True, the connection is closed instead of being reused.
+        """
+        try:
+            if not discard and not self._closed:
+                try:
+                    # Never hand the next caller a half-finished transaction
+                    if conn.in_transaction:
+                        conn.rollback()
+                except sqlite3.Error:
+                    discard = True
+
+            if discard or self._closed:
+                self._close(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Closes every idle connection. Connections still checked out are closed on release.
+        """
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def idle_count(self) -> int:
+        """
+        Returns the number of idle connections currently held by the pool.
+        """
+        with self._lock:
+            return len(self._idle)
+
+    def _pop_idle(self):
+        """
+        Evicts expired idle connections and returns the most recently used one, if any.
+        """
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            # The oldest connections sit at the left, so they expire first
+            while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+            if self._idle:
+                conn = self._idle.pop()[0]
+        for stale in expired:
+            logger.info("Closing database connection idle for more than %.0f seconds", self.idle_timeout)
+            self._close(stale)
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a new connection and applies the configured PRAGMAs to it.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=MeteredConnection)
+        DB_CONNECTIONS_OPENED.inc()
+        try:
+            apply_pragmas(conn)
+        except Exception:
+            conn.close()
+            raise
+        logger.info("Database connection opened.")
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """
+        Checks that a pooled connection still answers a trivial query.
+        """
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Discarding unhealthy database connection: %s", str(e))
+            return False
+
+    @staticmethod
+    def _close(conn: sqlite3.Connection) -> None:
+        """
+        Closes a connection, ignoring errors from connections that are already broken.
+        """
+        try:
+            conn.close()
+            DB_CONNECTIONS_CLOSED.inc()
+            logger.info("Database connection closed.")
+        except sqlite3.Error as e:
+            logger.warning("Error closing database connection: %s", str(e))
+
+
+def check_pragma_settings() -> None:
+    """
+    Checks that the configured journal mode and synchronous level are ones SQLite knows.
+
+    They are interpolated into the PRAGMA statements, so anything else is rejected.
+
+    Raises:
+        ValueError: If the configured journal mode or synchronous level is not recognized.
+    """
+    if DB_JOURNAL_MODE.upper() not in JOURNAL_MODES:
+        raise ValueError(f"Invalid journal mode: {DB_JOURNAL_MODE}. Must be one of {sorted(JOURNAL_MODES)}.")
+    if DB_SYNCHRONOUS.upper() not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid synchronous level: {DB_SYNCHRONOUS}. Must be one of {sorted(SYNCHRONOUS_LEVELS)}.")
+
+
+def apply_pragmas(conn: sqlite3.Connection) -> None:
+    """
+    Applies the configured journal mode, synchronous level, mmap size and cache size.
+
+    WAL lets readers run alongside a writer, and synchronous=NORMAL only syncs the WAL at
+    checkpoints rather than on every commit.
+
+    Args:
+        conn (sqlite3.Connection): The connection to tune.
+
+    Raises:
+        ValueError: If the configured journal mode or synchronous level is not recognized.
+        sqlite3.Error: If a PRAGMA cannot be applied.
+    """
+    check_pragma_settings()
+
+    cursor = conn.cursor()
+    journal_mode = cursor.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE};").fetchone()[0]
+    cursor.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS};")
+    cursor.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE:d};")
+    cursor.execute(f"PRAGMA cache_size = {DB_CACHE_SIZE:d};")
+    logger.info("Applied PRAGMAs: journal_mode=%s, synchronous=%s, mmap_size=%d, cache_size=%d",
+                journal_mode, DB_SYNCHRONOUS, DB_MMAP_SIZE, DB_CACHE_SIZE)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    The pool is rebuilt if DB_PATH has changed since it was created.
+
+    Returns:
+        ConnectionPool: The pool for the current DB_PATH.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_path != DB_PATH:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+def close_connection_pool() -> None:
+    """
+    Closes the process-wide connection pool, if one has been created.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
 @contextmanager
 def get_db_connection():
     """
-    Context manager for SQLite database connection.
+    Context manager for a pooled SQLite database connection.
 
     Yields:
-        sqlite3.Connection: The SQLite connection object.
+        sqlite3.Connection: The SQLite connection object, returned to the pool on exit.
     """
+    pool = get_connection_pool()
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = pool.acquire()
+        acquired_at = time.perf_counter()
         yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
     finally:
         if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+            # Uncommitted work is rolled back and broken connections are
+            # caught by the health check on the next checkout
+            pool.release(conn)
+            DB_CHECKOUT_HOLD_SECONDS.observe(time.perf_counter() - acquired_at)
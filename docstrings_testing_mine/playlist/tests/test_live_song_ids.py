@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from music_collection.models.live_song_ids import LiveSongIds
+
+
+@pytest.fixture
+def live_ids():
+    """Fixture providing an array loaded with five song IDs."""
+    ids = LiveSongIds()
+    ids.load([10, 20, 30, 40, 50])
+    return ids
+
+
+def contents(ids):
+    return sorted(ids.get(position) for position in range(len(ids)))
+
+
+def test_load(live_ids):
+    """Test loading the array, ignoring duplicate IDs."""
+    assert live_ids.loaded
+    assert contents(live_ids) == [10, 20, 30, 40, 50]
+
+    live_ids.load([1, 1, 2])
+    assert contents(live_ids) == [1, 2]
+
+def test_add(live_ids):
+    """Test that new IDs are appended once."""
+    live_ids.add(60)
+    live_ids.add(60)
+    assert contents(live_ids) == [10, 20, 30, 40, 50, 60]
+
+def test_discard_fills_hole(live_ids):
+    """Test that a removed ID is replaced by the last one, leaving no holes."""
+    live_ids.discard(20)
+    assert [live_ids.get(position) for position in range(len(live_ids))] == [10, 50, 30, 40]
+
+    live_ids.discard(40)
+    live_ids.discard(99)
+    assert contents(live_ids) == [10, 30, 50]
+
+def test_get_out_of_range(live_ids):
+    """Test that reading past the end returns None."""
+    assert live_ids.get(5) is None
+    assert live_ids.get(-1) is None
+
+def test_invalidate(live_ids):
+    """Test that invalidating empties the array."""
+    live_ids.invalidate()
+    assert not live_ids.loaded
+    assert len(live_ids) == 0
+
+def test_random_operations_stay_consistent():
+    """Test the array against a plain set over many random adds and removes."""
+    rng = random.Random(7)
+    ids = LiveSongIds()
+    ids.load([])
+    expected = set()
+
+    for _ in range(2000):
+        song_id = rng.randrange(200)
+        if rng.random() < 0.5:
+            ids.add(song_id)
+            expected.add(song_id)
+        else:
+            ids.discard(song_id)
+            expected.discard(song_id)
+        assert len(ids) == len(expected)
+
+    assert contents(ids) == sorted(expected)
@@ -0,0 +1,92 @@
+import pytest
+
+from music_collection.utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+@pytest.fixture
+def registry():
+    """Fixture to provide an empty registry, so test metrics don't show up on /metrics."""
+    return Registry()
+
+
+##################################################
+# Metric Test Cases
+##################################################
+
+
+def test_counter(registry):
+    """Test counting per label set and rendering the samples."""
+    requests = Counter("requests_total", "Requests served.", ["route", "status"], registry=registry)
+    requests.inc(route="/api/song-leaderboard", status=200)
+    requests.inc(2, route="/api/song-leaderboard", status=200)
+    requests.inc(route="/api/song-leaderboard", status=500)
+
+    assert requests.value(route="/api/song-leaderboard", status=200) == 3
+    assert registry.render() == (
+        "# HELP requests_total Requests served.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/api/song-leaderboard",status="200"} 3\n'
+        'requests_total{route="/api/song-leaderboard",status="500"} 1\n'
+    )
+
+
+def test_counter_without_labels_starts_at_zero(registry):
+    """Test that an unlabelled counter is reported before it is first incremented."""
+    Counter("closed_total", "Connections closed.", registry=registry)
+    assert "closed_total 0\n" in registry.render()
+
+
+def test_counter_rejects_wrong_labels(registry):
+    """Test error when a sample doesn't set exactly the declared labels."""
+    requests = Counter("requests_total", "Requests served.", ["route"], registry=registry)
+    with pytest.raises(ValueError, match="takes labels route"):
+        requests.inc(path="/api/health")
+
+
+def test_histogram(registry):
+    """Test that observations land in cumulative buckets with a sum and count."""
+    latency = Histogram("latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="/api/play-entire-playlist")
+
+    assert latency.count(route="/api/play-entire-playlist") == 4
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/api/play-entire-playlist",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/api/play-entire-playlist",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/api/play-entire-playlist",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/api/play-entire-playlist"} 3.65' in lines
+    assert 'latency_seconds_count{route="/api/play-entire-playlist"} 4' in lines
+
+
+def test_histogram_time(registry):
+    """Test timing a block, including one that raises."""
+    latency = Histogram("latency_seconds", "Latency.", registry=registry)
+    with latency.time():
+        pass
+    with pytest.raises(RuntimeError):
+        with latency.time():
+            raise RuntimeError("Boom")
+
+    assert latency.count() == 2
+
+
+def test_gauge(registry):
+    """Test that a gauge reads its value when rendered."""
+    idle = [3]
+    Gauge("idle_connections", "Idle connections.", lambda: idle[0], registry=registry)
+    idle[0] = 5
+    assert "idle_connections 5\n" in registry.render()
+
+
+def test_label_values_are_escaped(registry):
+    """Test escaping quotes, backslashes and newlines in label values."""
+    requests = Counter("requests_total", "Requests served.", ["route"], registry=registry)
+    requests.inc(route='a"b\\c\nd')
+    assert 'requests_total{route="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_registry_rejects_duplicate_names(registry):
+    """Test error when two metrics share a name."""
+    Counter("requests_total", "Requests served.", registry=registry)
+    with pytest.raises(ValueError, match="already registered"):
+        Counter("requests_total", "Requests served again.", registry=registry)
@@ -1,3 +1,5 @@
+import logging
+
 import pytest
 
 from music_collection.models.playlist_model import PlaylistModel
@@ -14,6 +16,11 @@ def mock_update_play_count(mocker):
     """Mock the update_play_count function for testing purposes."""
     return mocker.patch("music_collection.models.playlist_model.update_play_count")
 
+@pytest.fixture
+def mock_update_play_counts(mocker):
+    """Mock the bulk update_play_counts function for testing purposes."""
+    return mocker.patch("music_collection.models.playlist_model.update_play_counts", return_value={})
+
 """Fixtures providing sample songs for the tests."""
 @pytest.fixture
 def sample_song1():
@@ -283,21 +290,19 @@ def test_go_to_track_number(playlist_model, sample_playlist):
     playlist_model.go_to_track_number(2)
     assert playlist_model.current_track_number == 2, "Expected to be at track 2 after moving song"
 
-def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_entire_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing the entire playlist."""
     playlist_model.playlist.extend(sample_playlist)
 
     playlist_model.play_entire_playlist()
 
-    # Check that all play counts were updated
-    mock_update_play_count.assert_any_call(1)
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == len(playlist_model.playlist)
+    # Check that all play counts were updated in a single batch
+    mock_update_play_counts.assert_called_once_with([1, 2])
 
     # Check that the current track number was updated back to the first song
     assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
 
-def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_count):
+def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play_counts):
     """Test playing from the current position to the end of the playlist."""
     playlist_model.playlist.extend(sample_playlist)
     playlist_model.current_track_number = 2
@@ -305,7 +310,29 @@ def test_play_rest_of_playlist(playlist_model, sample_playlist, mock_update_play
     playlist_model.play_rest_of_playlist()
 
     # Check that play counts were updated for the remaining songs
-    mock_update_play_count.assert_any_call(2)
-    assert mock_update_play_count.call_count == 1
+    mock_update_play_counts.assert_called_once_with([2])
+
+    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
+
+def test_play_entire_playlist_reports_failures(playlist_model, sample_playlist, mock_update_play_counts):
+    """Test that songs whose play count could not be updated are reported."""
+    playlist_model.playlist.extend(sample_playlist)
+    mock_update_play_counts.return_value = {2: "Song with ID 2 has been deleted"}
+
+    with pytest.raises(ValueError, match="Failed to update play count for 1 song\\(s\\): Song with ID 2 has been deleted"):
+        playlist_model.play_entire_playlist()
+
+    # The remaining songs were still played
+    mock_update_play_counts.assert_called_once_with([1, 2])
+    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
+
+def test_play_entire_playlist_limits_per_track_logging(playlist_model, mock_update_play_counts, caplog):
+    """Test that a long play-through logs a bounded number of per-track lines and one summary."""
+    playlist_model.playlist.extend([Song(i, f'Artist {i}', f'Song {i}', 2000, 'Pop', 180) for i in range(1, 201)])
+
+    with caplog.at_level(logging.INFO):
+        playlist_model.play_entire_playlist()
 
-    assert playlist_model.current_track_number == 1, "Expected to loop back to the beginning of the playlist"
\ No newline at end of file
+    per_track = [record for record in caplog.records if record.msg.startswith("Playing song")]
+    assert len(per_track) <= 10, "Expected per-track lines to be rate limited"
+    assert any(record.getMessage().startswith("Played 200 songs") for record in caplog.records)
@@ -0,0 +1,112 @@
+import pytest
+
+from music_collection.utils import random_org_stub, random_utils
+from music_collection.utils.random_org_stub import create_app, start_server
+
+
+INTEGERS = "/integers/?num=20&min=1&max=100&col=1&base=10&format=plain&rnd=new"
+
+@pytest.fixture
+def client():
+    return create_app(seed=42).test_client()
+
+@pytest.fixture
+def stub_server(mocker):
+    # Point random_utils at a real stand-in server on a free port
+    server = start_server(seed=42)
+    mocker.patch("music_collection.utils.random_utils.RANDOM_ORG_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    mocker.patch("music_collection.utils.random_utils.RANDOM_PREFETCH", False)
+    yield server
+    server.shutdown()
+
+
+def test_integers_format(client):
+    """Test that integers are served one per line, in plain text and in range."""
+    response = client.get("/integers/?num=500&min=-2&max=2&col=1&base=10&format=plain&rnd=new")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    values = [int(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(values) == 500
+    assert set(values) == {-2, -1, 0, 1, 2}
+
+def test_decimal_fractions_format(client):
+    """Test that fractions are served with the requested number of decimal places."""
+    response = client.get("/decimal-fractions/?num=10&dec=3&col=1&format=plain&rnd=new")
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 10
+    assert all(len(line) == 5 and 0 <= float(line) < 1 for line in lines)
+
+def test_same_seed_same_numbers(client):
+    """Test that two services with the same seed serve the same numbers."""
+    same = create_app(seed=42).test_client()
+    other = create_app(seed=7).test_client()
+
+    first = client.get(INTEGERS).get_data()
+    assert first == same.get(INTEGERS).get_data()
+    assert first != other.get(INTEGERS).get_data()
+
+@pytest.mark.parametrize("path", [
+    "/integers/?min=1&max=10",
+    "/integers/?num=1&min=10&max=1",
+    "/integers/?num=1&min=1&max=ten",
+    "/integers/?num=1&min=1&max=10&base=2",
+    "/integers/?num=1&min=1&max=10&format=html",
+    "/decimal-fractions/?num=1&dec=21",
+])
+def test_invalid_arguments(client, path):
+    """Test that arguments random.org would reject get a plain-text 400."""
+    response = client.get(path)
+
+    assert response.status_code == 400
+    assert response.get_data(as_text=True).startswith("Error: ")
+
+def test_injected_errors():
+    """Test that an error rate of 1 fails every request with a 503."""
+    client = create_app(seed=42, error_rate=1).test_client()
+
+    assert [client.get(INTEGERS).status_code for _ in range(3)] == [503] * 3
+
+def test_injected_latency(mocker):
+    """Test that each request waits for the configured latency."""
+    mock_sleep = mocker.patch("music_collection.utils.random_org_stub.time.sleep")
+
+    create_app(seed=42, latency=0.1).test_client().get(INTEGERS)
+    mock_sleep.assert_called_once_with(0.1)
+
+def test_create_app_invalid_settings():
+    """Test that a negative latency or an error rate above 1 is rejected."""
+    with pytest.raises(ValueError, match="Invalid latency"):
+        create_app(latency=-0.5)
+    with pytest.raises(ValueError, match="Invalid error rate"):
+        create_app(error_rate=-0.1)
+
+def test_main_seeds_like_create_app(mocker):
+    """Test that --seed 42 on the command line serves the same numbers as create_app(seed=42)."""
+    mocker.patch("sys.argv", ["random_org_stub", "--seed", "42"])
+    mock_make_server = mocker.patch("music_collection.utils.random_org_stub.make_server")
+
+    random_org_stub.main()
+
+    served = mock_make_server.call_args[0][2].test_client().get(INTEGERS).get_data()
+    assert served == create_app(seed=42).test_client().get(INTEGERS).get_data()
+
+def test_get_random_against_stub(stub_server):
+    """Test that get_random and fetch_random_words work against the stand-in."""
+    assert 1 <= random_utils.get_random(100) <= 100
+
+    words = random_utils.fetch_random_words(50)
+    assert len(words) == 50
+    assert all(0 <= word < 2 ** random_utils.WORD_BITS for word in words)
+
+def test_get_random_against_failing_stub(mocker):
+    """Test that an injected error surfaces as a failed request."""
+    server = start_server(seed=42, error_rate=1)
+    try:
+        mocker.patch("music_collection.utils.random_utils.RANDOM_ORG_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+        mocker.patch("music_collection.utils.random_utils.RANDOM_PREFETCH", False)
+        with pytest.raises(RuntimeError, match="Request to random.org failed: 503"):
+            random_utils.get_random(100)
+    finally:
+        server.shutdown()
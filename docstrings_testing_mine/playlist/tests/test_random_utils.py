@@ -1,7 +1,10 @@
+from contextlib import nullcontext
+
 import pytest
 import requests
 
-from music_collection.utils.random_utils import get_random
+from music_collection.utils import random_utils
+from music_collection.utils.random_utils import RandomBitPool, fetch_random_words, get_random
 
 
 RANDOM_NUMBER = 42
@@ -9,12 +12,12 @@ NUM_SONGS = 100
 
 @pytest.fixture
 def mock_random_org(mocker):
-    # Patch the requests.get call
-    # requests.get returns an object, which we have replaced with a mock object
+    # Patch the shared session's get call
+    # Session.get returns an object, which we have replaced with a mock object
     mock_response = mocker.Mock()
     # We are giving that object a text attribute
     mock_response.text = f"{RANDOM_NUMBER}"
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("requests.Session.get", return_value=mock_response)
     return mock_response
 
 
@@ -26,18 +29,18 @@ def test_get_random(mock_random_org):
     assert result == RANDOM_NUMBER, f"Expected random number {RANDOM_NUMBER}, but got {result}"
 
     # Ensure that the correct URL was called
-    requests.get.assert_called_once_with("https://www.random.org/integers/?num=1&min=1&max=100&col=1&base=10&format=plain&rnd=new", timeout=5)
+    requests.Session.get.assert_called_once_with("https://www.random.org/integers/?num=1&min=1&max=100&col=1&base=10&format=plain&rnd=new", timeout=5)
 
 def test_get_random_request_failure(mocker):
     """Simulate  a request failure."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.RequestException("Connection error"))
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.RequestException("Connection error"))
 
     with pytest.raises(RuntimeError, match="Request to random.org failed: Connection error"):
         get_random(NUM_SONGS)
 
 def test_get_random_timeout(mocker):
     """Simulate  a timeout."""
-    mocker.patch("requests.get", side_effect=requests.exceptions.Timeout)
+    mocker.patch("requests.Session.get", side_effect=requests.exceptions.Timeout)
 
     with pytest.raises(RuntimeError, match="Request to random.org timed out."):
         get_random(NUM_SONGS)
@@ -47,4 +50,90 @@ def test_get_random_invalid_response(mock_random_org):
     mock_random_org.text = "invalid_response"
 
     with pytest.raises(ValueError, match="Invalid response from random.org: invalid_response"):
-        get_random(NUM_SONGS)
\ No newline at end of file
+        get_random(NUM_SONGS)
+
+def test_get_random_reuses_session(mock_random_org):
+    """Test that repeated calls share one session."""
+    first = random_utils.get_session()
+    get_random(NUM_SONGS)
+    get_random(NUM_SONGS)
+
+    assert random_utils.get_session() is first
+    assert requests.Session.get.call_count == 2
+
+def test_fetch_random_words(mock_random_org):
+    """Test fetching raw 16-bit values in bulk."""
+    mock_random_org.text = "1\n65535\n300\n"
+
+    assert fetch_random_words(3) == [1, 65535, 300]
+    requests.Session.get.assert_called_once_with("https://www.random.org/integers/?num=3&min=0&max=65535&col=1&base=10&format=plain&rnd=new", timeout=5)
+
+def test_get_random_from_bit_pool(mocker):
+    """Test that prefetching draws from the bit pool instead of making a request."""
+    mocker.patch("music_collection.utils.random_utils.RANDOM_PREFETCH", True)
+    mocker.patch("music_collection.utils.random_utils._bit_pool", RandomBitPool(fetch=lambda num: [5] * num))
+    mock_get = mocker.patch("requests.Session.get")
+
+    assert get_random(8) == 6
+    mock_get.assert_not_called()
+
+def test_bit_pool_fetches_in_bulk():
+    """Test that a single batch serves many draws, whatever the range."""
+    batches = []
+
+    def fetch(num):
+        batches.append(num)
+        return [0xFFFF] * num
+
+    pool = RandomBitPool(batch_size=4, fetch=fetch)
+
+    # 64 bits: four draws of 16 bits, or sixteen of 4 bits
+    assert [pool.randint(65536) for _ in range(4)] == [65536] * 4
+    assert [pool.randint(16) for _ in range(16)] == [16] * 16
+    assert batches == [4, 4]
+
+def test_bit_pool_rejects_out_of_range_values():
+    """Test that values past the range are redrawn rather than wrapped around."""
+    # 0b101 = 5 is too big for n = 5 and is skipped; 0b011 = 3 maps to 4
+    pool = RandomBitPool(batch_size=1, fetch=lambda num: [0b011101])
+
+    assert pool.randint(5) == 4
+    assert pool.available_bits() == 10
+
+def test_bit_pool_is_unbiased():
+    """Test that every value in a range that isn't a power of two is equally likely."""
+    # A draw for n = 6 takes 3 bits; each accepted pattern must map to a different value
+    results = []
+    for pattern in range(6):
+        pool = RandomBitPool(batch_size=1, fetch=lambda num, pattern=pattern: [pattern])
+        results.append(pool.randint(6))
+
+    assert sorted(results) == [1, 2, 3, 4, 5, 6]
+
+def test_bit_pool_invalid_arguments():
+    """Test errors for bad ranges and batch sizes."""
+    with pytest.raises(ValueError, match="Invalid batch size"):
+        RandomBitPool(batch_size=0)
+    with pytest.raises(ValueError, match="Invalid range"):
+        RandomBitPool(fetch=lambda num: [0]).randint(0)
+    with pytest.raises(ValueError, match="Invalid response from random.org"):
+        RandomBitPool(fetch=lambda num: [70000]).randint(10)
+
+@pytest.mark.parametrize("side_effect, text, outcome", [
+    (None, "42", "success"),
+    (None, "invalid_response", "invalid"),
+    (requests.exceptions.Timeout, None, "timeout"),
+    (requests.exceptions.RequestException("Connection error"), None, "error"),
+])
+def test_random_org_requests_are_metered(mocker, side_effect, text, outcome):
+    """Test that every request to random.org is counted by outcome and timed."""
+    before = random_utils.RANDOM_ORG_REQUESTS.value(outcome=outcome)
+    timed = random_utils.RANDOM_ORG_SECONDS.count()
+    mock_get = mocker.patch("requests.Session.get", side_effect=side_effect)
+    mock_get.return_value.text = text
+
+    with pytest.raises((ValueError, RuntimeError)) if outcome != "success" else nullcontext():
+        fetch_random_words(1)
+
+    assert random_utils.RANDOM_ORG_REQUESTS.value(outcome=outcome) == before + 1
+    assert random_utils.RANDOM_ORG_SECONDS.count() == timed + 1
@@ -0,0 +1,143 @@
+import io
+import os
+import sqlite3
+
+import pytest
+
+from music_collection.models import song_model
+from music_collection.models.song_import import import_songs, read_songs, validate_song_record
+from music_collection.utils import sql_utils
+
+
+SQL_CREATE_TABLE = os.path.join(os.path.dirname(__file__), "..", "sql", "create_song_table.sql")
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    """Point sql_utils at a fresh catalog database and reset the shared pool."""
+    path = str(tmp_path / "song_catalog.db")
+    with open(SQL_CREATE_TABLE) as f:
+        conn = sqlite3.connect(path)
+        conn.executescript(f.read())
+        conn.execute("INSERT INTO songs (artist, title, year, genre, duration) VALUES ('Artist A', 'Song A', 2020, 'Rock', 210)")
+        conn.commit()
+        conn.close()
+
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    yield path
+    sql_utils.close_connection_pool()
+
+def catalog(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT artist, title, year, genre, duration FROM songs ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+######################################################
+#
+#    Parsing and validation
+#
+######################################################
+
+def test_read_songs_csv():
+    """Test reading CSV rows with their line numbers."""
+    stream = io.StringIO("artist,title,year,genre,duration\nArtist B,Song B,2021,Pop,180\n")
+
+    assert list(read_songs(stream, "csv")) == [
+        (2, {"artist": "Artist B", "title": "Song B", "year": "2021", "genre": "Pop", "duration": "180"})
+    ]
+
+def test_read_songs_csv_missing_columns():
+    """Test that a CSV header without the required columns is rejected."""
+    with pytest.raises(ValueError, match="CSV header is missing columns: genre, duration"):
+        list(read_songs(io.StringIO("artist,title,year\n"), "csv"))
+
+def test_read_songs_ndjson():
+    """Test that NDJSON lines are parsed and bad lines are reported in place."""
+    stream = io.StringIO('{"artist": "Artist B"}\n\nnot json\n[1, 2]\n')
+
+    records = list(read_songs(stream, "ndjson"))
+
+    assert records[0] == (1, {"artist": "Artist B"})
+    assert [line for line, _ in records] == [1, 3, 4]
+    assert isinstance(records[1][1], ValueError) and isinstance(records[2][1], ValueError)
+
+def test_read_songs_invalid_format():
+    """Test error for an unknown format."""
+    with pytest.raises(ValueError, match="Invalid import format: xml"):
+        read_songs(io.StringIO(""), "xml")
+
+@pytest.mark.parametrize("record, message", [
+    ({"title": "Song", "year": 2020, "genre": "Pop", "duration": 100}, "Invalid artist"),
+    ({"artist": "A", "title": "Song", "year": 1900, "genre": "Pop", "duration": 100}, "Invalid year"),
+    ({"artist": "A", "title": "Song", "year": "20x0", "genre": "Pop", "duration": 100}, "Invalid year"),
+    ({"artist": "A", "title": "Song", "year": 2020, "genre": "", "duration": 100}, "Invalid genre"),
+    ({"artist": "A", "title": "Song", "year": 2020, "genre": "Pop", "duration": 0}, "Invalid song duration"),
+    ({"artist": "A", "title": "Song", "year": 2020, "genre": "Pop", "duration": 1.5}, "Invalid song duration"),
+])
+def test_validate_song_record_invalid(record, message):
+    """Test that records are held to the same rules as Song and the songs table."""
+    with pytest.raises(ValueError, match=message):
+        validate_song_record(record)
+
+
+######################################################
+#
+#    Import
+#
+######################################################
+
+def test_import_songs(db_path):
+    """Test importing across several batches, skipping bad rows and duplicates."""
+    stream = io.StringIO(
+        "artist,title,year,genre,duration\n"
+        "Artist B,Song B,2021,Pop,180\n"
+        "Artist A,Song A,2020,Rock,210\n"   # already in the catalog
+        "Artist C,Song C,1800,Jazz,200\n"   # invalid year
+        "Artist D,Song D,2022,Jazz,200\n"
+        "Artist B,Song B,2021,Pop,180\n"    # repeated within the file
+        "Artist E,Song E,2023,Folk,240\n"
+    )
+
+    report = import_songs(read_songs(stream, "csv"), batch_size=2)
+
+    assert report.imported == 3
+    assert [error["line"] for error in report.errors] == [3, 4, 6]
+    assert "already exists" in report.errors[0]["error"]
+    assert catalog(db_path)[1:] == [
+        ("Artist B", "Song B", 2021, "Pop", 180),
+        ("Artist D", "Song D", 2022, "Jazz", 200),
+        ("Artist E", "Song E", 2023, "Folk", 240),
+    ]
+
+def test_import_songs_invalidates_live_ids(db_path):
+    """Test that a successful import forces the live song IDs to be reloaded."""
+    song_model.live_song_ids.load([1])
+
+    import_songs(read_songs(io.StringIO('{"artist": "B", "title": "S", "year": 2021, "genre": "Pop", "duration": 100}\n'), "ndjson"))
+
+    assert not song_model.live_song_ids.loaded
+
+def test_import_songs_stops_at_unreadable_input(db_path):
+    """Test that bad UTF-8 partway through keeps the earlier rows and reports where it stopped."""
+    lines = [f'{{"artist": "Artist {i}", "title": "Song {i}", "year": 2000, "genre": "Pop", "duration": 100}}\n'
+             for i in range(500)]
+    # Past the first read buffer, so some batches are committed before the bad bytes are decoded
+    stream = io.TextIOWrapper(io.BytesIO("".join(lines).encode() + b"\xff\xfe\n"), encoding="utf-8")
+    song_model.live_song_ids.load([1])
+
+    report = import_songs(read_songs(stream, "ndjson"), batch_size=10)
+
+    assert 1 < report.stopped_at <= len(lines) + 1
+    assert report.imported == report.stopped_at - 1
+    assert report.errors == [{"line": report.stopped_at, "error": report.errors[0]["error"]}]
+    assert report.errors[0]["error"].startswith("Could not read the input")
+    assert len(catalog(db_path)) == report.imported + 1
+    assert not song_model.live_song_ids.loaded
+
+def test_import_songs_invalid_batch_size(db_path):
+    """Test error for a bad batch size."""
+    with pytest.raises(ValueError, match="Invalid batch size"):
+        import_songs([], batch_size=0)
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from music_collection.models.song_list import SongList
+from music_collection.models.song_model import Song
+
+
+@pytest.fixture
+def songs():
+    """Fixture providing five sample songs."""
+    return [Song(i, f'Artist {i}', f'Song {i}', 2000 + i, 'Pop', 100 + i) for i in range(1, 6)]
+
+@pytest.fixture
+def song_list(songs):
+    """Fixture providing a SongList of the five sample songs."""
+    return SongList(songs)
+
+
+def assert_index_consistent(song_list):
+    """Check that every song's indexed position matches its place in the order."""
+    for position, song in enumerate(song_list):
+        assert song_list.position(song.id) == position, f"Song {song.id} indexed at the wrong position"
+        assert song_list.get(song.id) is song
+
+
+##################################################
+# Index Maintenance Test Cases
+##################################################
+
+def test_lookup_by_id(song_list, songs):
+    """Test constant-time lookups by song ID."""
+    assert song_list.contains_id(3)
+    assert not song_list.contains_id(99)
+    assert song_list.get(3) is songs[2]
+    assert song_list.get(99) is None
+    assert song_list.position(3) == 2
+
+def test_duplicate_id_rejected(song_list, songs):
+    """Test that a song ID can only appear once."""
+    with pytest.raises(ValueError, match="Song with ID 1 already exists in the list"):
+        song_list.append(songs[0])
+
+def test_insert_and_pop_keep_index(song_list):
+    """Test that inserting and removing songs keeps positions in step."""
+    song = song_list.pop(1)
+    assert song.id == 2
+    assert not song_list.contains_id(2)
+    assert_index_consistent(song_list)
+
+    song_list.insert(0, song)
+    assert [s.id for s in song_list] == [2, 1, 3, 4, 5]
+    assert_index_consistent(song_list)
+
+def test_swap_keeps_index(song_list):
+    """Test that swapping songs updates both positions."""
+    song_list.swap(0, 4)
+    assert [s.id for s in song_list] == [5, 2, 3, 4, 1]
+    assert_index_consistent(song_list)
+
+def test_swap_ids_keeps_index(song_list):
+    """Test that swapping songs by ID updates both positions."""
+    song_list.swap_ids(2, 5)
+    assert [s.id for s in song_list] == [1, 5, 3, 4, 2]
+    assert_index_consistent(song_list)
+
+    with pytest.raises(KeyError):
+        song_list.swap_ids(1, 99)
+
+@pytest.mark.parametrize("index", [
+    slice(None), slice(1, 4), slice(2, None), slice(None, -2), slice(-3, -1),
+    slice(None, None, 2), slice(1, None, 3), slice(None, None, -1), slice(4, 0, -2),
+    slice(3, 3), slice(10, 20), slice(-20, 2),
+])
+def test_getitem_slice(song_list, songs, index):
+    """Test that slicing matches slicing a plain list."""
+    assert song_list[index] == songs[index]
+
+def test_getitem_slice_walks_only_range(mocker):
+    """Test that a slice visits the songs it returns, not the whole list."""
+    song_list = SongList(Song(i, 'Artist', f'Song {i}', 2000, 'Pop', 100) for i in range(1, 1001))
+    mocker.patch.object(SongList, "__iter__", side_effect=AssertionError("walked the whole list"))
+
+    assert [s.id for s in song_list[500:503]] == [501, 502, 503]
+
+def test_setitem_replaces_song(song_list):
+    """Test that replacing a song drops the old ID from the index."""
+    song_list[0] = Song(10, 'Artist 10', 'Song 10', 2010, 'Rock', 200)
+    assert not song_list.contains_id(1)
+    assert song_list.position(10) == 0
+    assert_index_consistent(song_list)
+
+def test_clear(song_list):
+    """Test that clearing the list empties the index."""
+    song_list.clear()
+    assert len(song_list) == 0
+    assert not song_list.contains_id(1)
+
+def test_random_operations_match_list():
+    """Test the tree against a plain list over a long run of random edits."""
+    rng = random.Random(411)
+    song_list = SongList()
+    expected = []
+    next_id = 1
+
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.4 or not expected:
+            index = rng.randint(0, len(expected))
+            song = Song(next_id, 'Artist', f'Song {next_id}', 2000, 'Pop', 100)
+            next_id += 1
+            song_list.insert(index, song)
+            expected.insert(index, song)
+        elif action < 0.6:
+            index = rng.randrange(len(expected))
+            assert song_list.pop(index) is expected.pop(index)
+        elif action < 0.8:
+            song = rng.choice(expected)
+            index = rng.randrange(len(expected))
+            song_list.move(song.id, index)
+            expected.remove(song)
+            expected.insert(index, song)
+        else:
+            index1, index2 = rng.randrange(len(expected)), rng.randrange(len(expected))
+            song_list.swap(index1, index2)
+            expected[index1], expected[index2] = expected[index2], expected[index1]
+
+    assert list(song_list) == expected
+    assert_index_consistent(song_list)
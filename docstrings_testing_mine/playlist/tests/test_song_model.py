@@ -4,6 +4,9 @@ import sqlite3
 
 import pytest
 
+from music_collection.utils import sql_utils
+from music_collection.utils.pagination import decode_cursor, encode_cursor
+from music_collection.models.live_song_ids import LiveSongIds
 from music_collection.models.song_model import (
     Song,
     create_song,
@@ -11,8 +14,11 @@ from music_collection.models.song_model import (
     get_song_by_id,
     get_song_by_compound_key,
     get_all_songs,
+    get_all_songs_page,
     get_random_song,
-    update_play_count
+    iter_songs,
+    update_play_count,
+    update_play_counts
 )
 
 ######################################################
@@ -45,6 +51,13 @@ def mock_cursor(mocker):
 
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
+@pytest.fixture(autouse=True)
+def live_song_ids(mocker):
+    """Give each test its own unloaded array of live song IDs."""
+    ids = LiveSongIds()
+    mocker.patch("music_collection.models.song_model.live_song_ids", ids)
+    return ids
+
 ######################################################
 #
 #    Add and delete
@@ -312,15 +325,128 @@ def test_get_all_songs_ordered_by_play_count(mock_cursor):
 
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
+def test_get_all_songs_page(mock_cursor):
+    """Test that a page by ID uses a keyset condition and returns a cursor for the next page."""
+
+    mock_cursor.fetchall.return_value = [(11, "Song K"), (12, "Song L"), (13, "Song M")]
+
+    songs, next_cursor = get_all_songs_page(limit=2, after=encode_cursor(["id", 10]), fields="id,title")
+
+    assert songs == [{"id": 11, "title": "Song K"}, {"id": 12, "title": "Song L"}]
+    assert decode_cursor(next_cursor) == ["id", 12]
+
+    expected_query = normalize_whitespace("""
+        SELECT id, title FROM songs WHERE deleted = FALSE AND id > ? ORDER BY id ASC LIMIT ?
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [10, 3]
+
+def test_get_all_songs_page_by_play_count(mock_cursor):
+    """Test paging songs by play count, with ties broken by ID."""
+
+    mock_cursor.fetchall.return_value = [("Song B", 20, 2), ("Song A", 10, 1)]
+
+    songs, next_cursor = get_all_songs_page(True, limit=1, after=encode_cursor(["play_count", 30, 4]), fields=["title"])
+
+    assert songs == [{"title": "Song B"}]
+    assert decode_cursor(next_cursor) == ["play_count", 20, 2]
+
+    expected_query = normalize_whitespace("""
+        SELECT title, play_count, id FROM songs WHERE deleted = FALSE
+        AND (play_count < ? OR (play_count = ? AND id > ?))
+        ORDER BY play_count DESC, id ASC LIMIT ?
+    """)
+    assert normalize_whitespace(mock_cursor.execute.call_args[0][0]) == expected_query
+    assert mock_cursor.execute.call_args[0][1] == [30, 30, 4, 2]
+
+def test_get_all_songs_page_invalid_arguments(mock_cursor):
+    """Test errors for bad limits, fields and cursors."""
+
+    with pytest.raises(ValueError, match="Invalid limit"):
+        get_all_songs_page(limit=-1)
+    with pytest.raises(ValueError, match="Invalid fields: rating"):
+        get_all_songs_page(fields="title,rating")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        get_all_songs_page(after="@@@")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        # Cursors from one sort order can't be used with another
+        get_all_songs_page(True, after=encode_cursor(["id", 10]))
+
+    mock_cursor.execute.assert_not_called()
+
+def test_iter_songs(mock_cursor):
+    """Test streaming songs a batch at a time, each batch starting after the last one's sort key."""
+
+    mock_cursor.fetchall.side_effect = [
+        [(2, "Song B", 20), (1, "Song A", 20)],
+        [(3, "Song C", 5)],
+    ]
+
+    songs = iter_songs(sort_by_play_count=True, fields="id,title,play_count", batch_size=2)
+
+    # Nothing is queried until iteration starts
+    mock_cursor.execute.assert_not_called()
+
+    assert list(songs) == [
+        {"id": 2, "title": "Song B", "play_count": 20},
+        {"id": 1, "title": "Song A", "play_count": 20},
+        {"id": 3, "title": "Song C", "play_count": 5},
+    ]
+
+    # A short batch is the last one
+    assert mock_cursor.execute.call_count == 2
+    first_query, first_params = mock_cursor.execute.call_args_list[0][0]
+    assert normalize_whitespace(first_query) == normalize_whitespace("""
+        SELECT id, title, play_count FROM songs WHERE deleted = FALSE ORDER BY play_count DESC, id ASC LIMIT ?
+    """)
+    assert first_params == [2]
+    second_query, second_params = mock_cursor.execute.call_args_list[1][0]
+    assert "AND (play_count < ? OR (play_count = ? AND id > ?))" in normalize_whitespace(second_query)
+    assert second_params == [20, 20, 1, 2]
+
+def test_iter_songs_fetches_sort_key_without_returning_it(mock_cursor):
+    """Test that the ID is read to find the next batch even if it wasn't asked for."""
+
+    mock_cursor.fetchall.side_effect = [[("Song A", 1)], []]
+
+    assert list(iter_songs(fields="title", batch_size=1)) == [{"title": "Song A"}]
+    assert normalize_whitespace(mock_cursor.execute.call_args_list[0][0][0]).startswith("SELECT title, id FROM songs")
+    assert mock_cursor.execute.call_args_list[1][0][1] == [1, 1]
+
+def test_iter_songs_releases_connection_between_batches(mocker):
+    """Test that no connection is checked out while the reader handles a batch."""
+    checked_out = []
+
+    @contextmanager
+    def mock_get_db_connection():
+        conn = mocker.Mock()
+        conn.cursor.return_value.fetchall.return_value = [(1,)] if not checked_out else []
+        checked_out.append(True)
+        yield conn
+        checked_out[-1] = False
+
+    mocker.patch("music_collection.models.song_model.get_db_connection", mock_get_db_connection)
+
+    songs = iter_songs(fields="id", batch_size=1)
+    assert next(songs) == {"id": 1}
+    assert checked_out == [False]
+    assert list(songs) == []
+    assert checked_out == [False, False]
+
+def test_iter_songs_invalid_arguments(mock_cursor):
+    """Test that bad arguments are rejected before streaming starts."""
+
+    with pytest.raises(ValueError, match="Invalid fields: rating"):
+        iter_songs(fields="rating")
+    with pytest.raises(ValueError, match="Invalid batch size"):
+        iter_songs(batch_size=0)
+
 def test_get_random_song(mock_cursor, mocker):
     """Test retrieving a random song from the catalog."""
 
     # Simulate that there are multiple songs in the database
-    mock_cursor.fetchall.return_value = [
-        (1, "Artist A", "Song A", 2020, "Rock", 210, 10),
-        (2, "Artist B", "Song B", 2021, "Pop", 180, 20),
-        (3, "Artist C", "Song C", 2022, "Jazz", 200, 5)
-    ]
+    mock_cursor.fetchall.return_value = [(1,), (2,), (3,)]
+    mock_cursor.fetchone.side_effect = [(1, 3), (1, 3), (2, "Artist B", "Song B", 2021, "Pop", 180)]
 
     # Mock random number generation to return the 2nd song
     mock_random = mocker.patch("music_collection.models.song_model.get_random", return_value=2)
@@ -337,33 +463,134 @@ def test_get_random_song(mock_cursor, mocker):
     # Ensure that the random number was called with the correct number of songs
     mock_random.assert_called_once_with(3)
 
-    # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
-    actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    # Ensure the SQL queries were executed correctly: check the catalog version, load the IDs
+    # (reading the version they were loaded at), then fetch only the chosen row
+    version_query = normalize_whitespace("SELECT (SELECT schema_version FROM pragma_schema_version), MAX(id) FROM songs")
+    expected_queries = [
+        version_query,
+        version_query,
+        normalize_whitespace("SELECT id FROM songs WHERE deleted = FALSE"),
+        normalize_whitespace("SELECT id, artist, title, year, genre, duration FROM songs WHERE id = ? AND deleted = FALSE"),
+    ]
+    actual_queries = [normalize_whitespace(call[0][0]) for call in mock_cursor.execute.call_args_list]
 
-    # Assert that the SQL query was correct
-    assert actual_query == expected_query, "The SQL query did not match the expected structure."
+    assert actual_queries == expected_queries, "The SQL queries did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == (2,)
+
+def test_get_random_song_reuses_live_ids(mock_cursor, mocker, live_song_ids):
+    """Test that later picks don't reload the song IDs while the catalog version is unchanged."""
+
+    live_song_ids.load([1, 2, 3], schema_version=1, max_id=3)
+    mock_cursor.fetchone.side_effect = [(1, 3), (3, "Artist C", "Song C", 2022, "Jazz", 200)]
+    mocker.patch("music_collection.models.song_model.get_random", return_value=3)
+
+    assert get_random_song().id == 3
+    # Only the version check and the chosen row
+    assert mock_cursor.execute.call_count == 2
+    mock_cursor.fetchall.assert_not_called()
+
+def test_get_random_song_stale_id(mock_cursor, mocker, live_song_ids):
+    """Test that a song deleted by another process causes a reload and a second pick."""
+
+    live_song_ids.load([1, 2, 3], schema_version=1, max_id=3)
+    mock_cursor.fetchall.return_value = [(1,), (3,)]
+    # Version check, stale pick, version check and reload, then the second pick
+    mock_cursor.fetchone.side_effect = [(1, 3), None, (1, 3), (1, 3), (3, "Artist C", "Song C", 2022, "Jazz", 200)]
+    mock_random = mocker.patch("music_collection.models.song_model.get_random", side_effect=[2, 2])
+
+    assert get_random_song().id == 3
+    assert mock_random.call_args_list == [mocker.call(3), mocker.call(2)]
+    assert len(live_song_ids) == 2
 
 def test_get_random_song_empty_catalog(mock_cursor, mocker):
     """Test retrieving a random song when the catalog is empty."""
 
     # Simulate that the catalog is empty
     mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchone.return_value = (1, None)
+    mock_random = mocker.patch("music_collection.models.song_model.get_random")
 
     # Expect a ValueError to be raised when calling get_random_song with an empty catalog
     with pytest.raises(ValueError, match="The song catalog is empty"):
         get_random_song()
 
     # Ensure that the random number was not called since there are no songs
-    mocker.patch("music_collection.models.song_model.get_random").assert_not_called()
+    mock_random.assert_not_called()
 
     # Ensure the SQL query was executed correctly
-    expected_query = normalize_whitespace("SELECT id, artist, title, year, genre, duration, play_count FROM songs WHERE deleted = FALSE")
+    expected_query = normalize_whitespace("SELECT id FROM songs WHERE deleted = FALSE")
     actual_query = normalize_whitespace(mock_cursor.execute.call_args[0][0])
 
     # Assert that the SQL query was correct
     assert actual_query == expected_query, "The SQL query did not match the expected structure."
 
+def test_get_random_song_sees_songs_inserted_elsewhere(tmp_path, mocker, live_song_ids):
+    """Test that a song inserted through another connection is picked up without invalidating."""
+    path = str(tmp_path / "song_catalog.db")
+    with open("sql/create_song_table.sql") as f:
+        conn = sqlite3.connect(path)
+        conn.executescript(f.read())
+        conn.execute("INSERT INTO songs (artist, title, year, genre, duration) VALUES ('Artist A', 'Song A', 2020, 'Rock', 210)")
+        conn.commit()
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    mocker.patch("music_collection.models.song_model.get_random", side_effect=lambda num_songs: num_songs)
+
+    try:
+        assert get_random_song().title == "Song A"
+
+        # Like import_songs.py or another worker: a different connection, unseen by this process
+        conn.execute("INSERT INTO songs (artist, title, year, genre, duration) VALUES ('Artist B', 'Song B', 2021, 'Pop', 180)")
+        conn.commit()
+        conn.close()
+
+        assert get_random_song().title == "Song B"
+        assert len(live_song_ids) == 2
+    finally:
+        sql_utils.close_connection_pool()
+
+def test_get_random_song_after_table_recreated(tmp_path, mocker, live_song_ids):
+    """Test that recreating the table reloads the IDs even though the highest ID is the same."""
+    path = str(tmp_path / "song_catalog.db")
+    with open("sql/create_song_table.sql") as f:
+        schema = f.read()
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, 'Song', 2020, 'Rock', 210)",
+                     [("Artist A",), ("Artist B",)])
+    conn.execute("UPDATE songs SET deleted = TRUE WHERE id = 1")
+    conn.commit()
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    mocker.patch("music_collection.models.song_model.get_random", return_value=1)
+
+    try:
+        assert get_random_song().id == 2
+
+        # Like re-running create_db.sh: the same IDs, but song 1 is live again
+        conn.executescript(schema)
+        conn.executemany("INSERT INTO songs (artist, title, year, genre, duration) VALUES (?, 'Song', 2020, 'Rock', 210)",
+                         [("Artist A",), ("Artist B",)])
+        conn.commit()
+        conn.close()
+
+        get_random_song()
+        assert len(live_song_ids) == 2
+    finally:
+        sql_utils.close_connection_pool()
+
+def test_create_and_delete_song_update_live_ids(mock_cursor, live_song_ids):
+    """Test that created and deleted songs are reflected in a loaded array of live song IDs."""
+
+    live_song_ids.load([1, 2])
+    mock_cursor.lastrowid = 3
+    create_song(artist="Artist C", title="Song C", year=2022, genre="Jazz", duration=200)
+    assert len(live_song_ids) == 3
+
+    mock_cursor.fetchone.return_value = [False]
+    delete_song(1)
+    assert sorted(live_song_ids.get(i) for i in range(len(live_song_ids))) == [2, 3]
+
 def test_update_play_count(mock_cursor):
     """Test updating the play count of a song."""
 
@@ -405,3 +632,30 @@ def test_update_play_count_deleted_song(mock_cursor):
 
     # Ensure that no SQL query for updating play count was executed
     mock_cursor.execute.assert_called_once_with("SELECT deleted FROM songs WHERE id = ?", (1,))
+
+def test_update_play_counts(mock_cursor):
+    """Test incrementing the play counts of several songs in one transaction."""
+
+    # Simulate that songs 1 and 2 exist, song 3 is deleted and song 4 does not exist
+    mock_cursor.fetchall.return_value = [(1, False), (2, False), (3, True)]
+
+    failures = update_play_counts([1, 2, 3, 4])
+
+    assert failures == {3: "Song with ID 3 has been deleted", 4: "Song with ID 4 not found"}
+
+    # Ensure the IDs were validated with a single query
+    expected_select = normalize_whitespace("SELECT id, deleted FROM songs WHERE id IN (SELECT value FROM json_each(?))")
+    actual_select = normalize_whitespace(mock_cursor.execute.call_args[0][0])
+    assert actual_select == expected_select, "The SELECT query did not match the expected structure."
+    assert mock_cursor.execute.call_args[0][1] == ("[1, 2, 3, 4]",)
+
+    # Ensure only the valid songs were incremented with executemany
+    expected_update = normalize_whitespace("UPDATE songs SET play_count = play_count + 1 WHERE id = ?")
+    actual_update = normalize_whitespace(mock_cursor.executemany.call_args[0][0])
+    assert actual_update == expected_update, "The UPDATE query did not match the expected structure."
+    assert mock_cursor.executemany.call_args[0][1] == [(1,), (2,)]
+
+def test_update_play_counts_empty(mock_cursor):
+    """Test that an empty batch does not touch the database."""
+    assert update_play_counts([]) == {}
+    mock_cursor.execute.assert_not_called()
@@ -0,0 +1,153 @@
+import sqlite3
+
+import pytest
+
+from music_collection.utils import sql_utils
+from music_collection.utils.sql_utils import ConnectionPool, apply_pragmas, get_db_connection
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    """Point sql_utils at a fresh database file and reset the shared pool."""
+    path = str(tmp_path / "song_catalog.db")
+    mocker.patch("music_collection.utils.sql_utils.DB_PATH", path)
+    sql_utils.close_connection_pool()
+    yield path
+    sql_utils.close_connection_pool()
+
+
+######################################################
+#
+#    Connection pool
+#
+######################################################
+
+def test_connection_is_reused(db_path):
+    """Test that consecutive checkouts reuse the same connection."""
+    pool = ConnectionPool(db_path, max_size=2)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_2 = pool.acquire()
+    assert conn_1 is conn_2, "Expected the idle connection to be reused"
+    pool.release(conn_2)
+    pool.close()
+
+def test_checkout_timeout_when_exhausted(db_path):
+    """Test that checking out from an exhausted pool times out."""
+    pool = ConnectionPool(db_path, max_size=1, checkout_timeout=0.01)
+    conn = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError, match="Timed out waiting for a database connection"):
+        pool.acquire()
+    pool.release(conn)
+    pool.close()
+
+def test_idle_connections_are_evicted(db_path):
+    """Test that connections idle past the timeout are closed instead of reused."""
+    pool = ConnectionPool(db_path, max_size=2, idle_timeout=0)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_2 = pool.acquire()
+    assert conn_1 is not conn_2, "Expected the expired connection to be replaced"
+    pool.release(conn_2)
+    pool.close()
+
+def test_unhealthy_connection_is_replaced(db_path):
+    """Test that a connection failing the health check is replaced on checkout."""
+    pool = ConnectionPool(db_path, max_size=2)
+    conn_1 = pool.acquire()
+    pool.release(conn_1)
+    conn_1.close()
+    conn_2 = pool.acquire()
+    assert conn_1 is not conn_2, "Expected the closed connection to be replaced"
+    pool.release(conn_2)
+    pool.close()
+
+def test_get_db_connection_uses_pool(db_path):
+    """Test that the context manager hands out pooled connections."""
+    with get_db_connection() as conn_1:
+        pass
+    with get_db_connection() as conn_2:
+        pass
+    assert conn_1 is conn_2, "Expected get_db_connection to reuse the pooled connection"
+
+######################################################
+#
+#    PRAGMAs
+#
+######################################################
+
+def test_pragmas_applied_to_new_connections(db_path):
+    """Test that new connections use WAL and synchronous=NORMAL."""
+    with get_db_connection() as conn:
+        journal_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous;").fetchone()[0]
+        cache_size = conn.execute("PRAGMA cache_size;").fetchone()[0]
+
+    assert journal_mode == "wal", f"Expected WAL journal mode, got {journal_mode}"
+    assert synchronous == 1, f"Expected synchronous=NORMAL (1), got {synchronous}"
+    assert cache_size == sql_utils.DB_CACHE_SIZE, f"Expected cache_size {sql_utils.DB_CACHE_SIZE}, got {cache_size}"
+
+def test_pragmas_reject_invalid_journal_mode(db_path, mocker):
+    """Test that an unknown journal mode from the environment is rejected."""
+    mocker.patch("music_collection.utils.sql_utils.DB_JOURNAL_MODE", "WAL; DROP TABLE songs")
+    conn = sqlite3.connect(db_path)
+    with pytest.raises(ValueError, match="Invalid journal mode"):
+        apply_pragmas(conn)
+    conn.close()
+
+def test_pool_rejects_invalid_synchronous_level(db_path, mocker):
+    """Test that a bad PRAGMA setting fails when the pool is built, not on every checkout."""
+    mocker.patch("music_collection.utils.sql_utils.DB_SYNCHRONOUS", "SOMETIMES")
+    with pytest.raises(ValueError, match="Invalid synchronous level"):
+        ConnectionPool(db_path)
+
+def test_connect_closes_connection_on_pragma_error(db_path, mocker):
+    """Test that a connection is closed and its slot freed if its PRAGMAs fail."""
+    pool = ConnectionPool(db_path, max_size=1)
+    connections = []
+
+    def fail(conn):
+        connections.append(conn)
+        raise ValueError("bad PRAGMA")
+
+    mock_apply = mocker.patch("music_collection.utils.sql_utils.apply_pragmas", side_effect=fail)
+    for _ in range(2):
+        with pytest.raises(ValueError, match="bad PRAGMA"):
+            pool.acquire()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            conn.execute("SELECT 1;")
+
+    # The slot was given back each time, so a healthy checkout still succeeds
+    mocker.stop(mock_apply)
+    pool.release(pool.acquire())
+    pool.close()
+
+def test_queries_are_metered(db_path):
+    """Test that statements run on pooled connections are counted and timed by kind."""
+    selects = sql_utils.DB_QUERIES.value(statement="SELECT", outcome="success")
+    errors = sql_utils.DB_QUERIES.value(statement="SELECT", outcome="error")
+    opened = sql_utils.DB_CONNECTIONS_OPENED.value()
+    holds = sql_utils.DB_CHECKOUT_HOLD_SECONDS.count()
+
+    with get_db_connection() as conn:
+        conn.cursor().execute("SELECT 1;")
+        conn.execute("select 2")
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("SELECT * FROM missing_table")
+
+    assert sql_utils.DB_QUERIES.value(statement="SELECT", outcome="success") == selects + 2
+    assert sql_utils.DB_QUERIES.value(statement="SELECT", outcome="error") == errors + 1
+    assert sql_utils.DB_CONNECTIONS_OPENED.value() == opened + 1
+    assert sql_utils.DB_CHECKOUT_HOLD_SECONDS.count() == holds + 1
+
+@pytest.mark.parametrize("sql, kind", [
+    ("  SELECT 1", "SELECT"),
+    ("insert into t values (1)", "INSERT"),
+    ("COMMIT;", "COMMIT"),
+    ("VACUUM", "OTHER"),
+    ("", "OTHER"),
+])
+def test_statement_kind(sql, kind):
+    """Test labelling statements by their first keyword."""
+    assert sql_utils.statement_kind(sql) == kind